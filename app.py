@@ -4,6 +4,9 @@ from flask_cors import CORS
 from flask_mongoengine import MongoEngine
 from models import User, Resume, Job, PasswordReset
 from config import Config
+import metrics
+import mongo_monitoring
+import profiling
 from routes.auth import auth_bp
 from routes.user import user_bp
 from routes.resume import resume_bp
@@ -16,10 +19,16 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # Pool/command listeners must be registered before the client is created
+    mongo_monitoring.install()
+    
     # Initialize extensions
     db.init_app(app)
+    mongo_monitoring.warm_up_in_background(app, app.config['MONGODB_WARMUP_CONNECTIONS'])
     jwt = JWTManager(app)
     CORS(app)
+    metrics.instrument_flask(app)  # Request metrics, served at /internal/metrics
+    profiling.init_app(app)  # Opt-in with PROFILE_ENABLED=1
     
     # Add current_user context processor for templates
     @app.context_processor
@@ -2,58 +2,139 @@ import os
 from flask import Flask, render_template, jsonify, request, session
 from flask_cors import CORS
 import bcrypt
-import uuid
+import time
+import threading
 from datetime import datetime
 from dotenv import load_dotenv
+from seed_data import seed_jobs
+from storage import InMemoryStorage, MongoStorage, instrument_storage
+from app_logging import get_logger
+import json_provider
+import metrics
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+log = get_logger(__name__)
 app.secret_key = 'your-secret-key-change-in-production'  # Required for sessions
 CORS(app)
+metrics.instrument_flask(app)  # Request metrics, served at /internal/metrics
+json_provider.init_app(app)  # orjson-backed jsonify (see json_provider.py)
 
 # Check for MongoDB URL
 MONGODB_URL = os.environ.get('DATABASE_URL') or os.environ.get('MONGODB_URI') or os.environ.get('MONGO_URL')
-USE_MONGODB = False
 
-# Try to import and initialize MongoDB if URL is present
-if MONGODB_URL:
+# Storage starts in-memory and is switched to MongoDB by a background probe
+# once the database is reachable, so workers serve immediately instead of
+# blocking at import while Atlas is slow or down.
+DB_PROBE_TIMEOUT_MS = int(os.environ.get('DB_PROBE_TIMEOUT_MS', 2000))
+DB_PROBE_MAX_INTERVAL = 30  # seconds between retries, after backoff
+db_state = {
+    'status': 'connecting' if MONGODB_URL else 'disabled',
+    'attempts': 0,
+    'last_error': None,
+    'connected_at': None
+}
+_probe_lock = threading.Lock()
+_probe_pid = None
+
+# Simple in-memory storage - used until (and unless) MongoDB becomes reachable
+memory_storage = instrument_storage(InMemoryStorage())
+seed_jobs(memory_storage)
+storage = memory_storage
+
+def _configure_mongodb():
+    """Set up MongoEngine without connecting (connect=False never blocks)"""
+    from flask_mongoengine import MongoEngine
+    from config import MONGODB_POOL_SETTINGS
+    import mongo_monitoring
+    
+    app.config['MONGODB_SETTINGS'] = {
+        'host': MONGODB_URL,
+        'connect': False,
+        'ssl': True,
+        'ssl_cert_reqs': None,
+        'tlsAllowInvalidCertificates': True,
+        'serverSelectionTimeoutMS': 10000,
+        **MONGODB_POOL_SETTINGS
+    }
+    
+    mongo_monitoring.install()
+    db = MongoEngine()
+    db.init_app(app)
+
+def _migrate_memory_users(mongo_storage):
+    """Copy users registered while running in-memory into MongoDB"""
+    for user in memory_storage.list_users():
+        mongo_storage.create_user(user['name'], user['email'], user['password'])  # No-op if taken
+
+def _probe_database():
+    """Background loop: ping MongoDB with a short timeout until it answers, then switch over"""
+    global storage
+    from pymongo import MongoClient
+    
+    try:
+        _configure_mongodb()
+    except Exception as e:
+        db_state['status'] = 'unavailable'
+        db_state['last_error'] = str(e)
+        log.error('MongoDB setup failed, staying on in-memory storage', error=str(e))
+        return
+    
+    delay = 1
+    while True:
+        db_state['attempts'] += 1
+        probe = MongoClient(MONGODB_URL, serverSelectionTimeoutMS=DB_PROBE_TIMEOUT_MS,
+                            connectTimeoutMS=DB_PROBE_TIMEOUT_MS, tlsAllowInvalidCertificates=True)
+        try:
+            probe.admin.command('ping')
+            mongo_storage = instrument_storage(MongoStorage())
+            with app.app_context():
+                seed_jobs(mongo_storage)  # Idempotent upsert of the demo job catalogue
+            break
+        except Exception as e:
+            # A failed seed is retried with the ping rather than ending the probe
+            db_state['status'] = 'unavailable'
+            db_state['last_error'] = str(e)
+            log.warning('MongoDB not ready, retrying', attempt=db_state['attempts'], error=str(e),
+                        retry_in_s=delay)
+        finally:
+            probe.close()
+        time.sleep(delay)
+        delay = min(delay * 2, DB_PROBE_MAX_INTERVAL)
+    
+    # Single assignment - each request reads `storage` once, so the switch
+    # is atomic from the point of view of a request
+    storage = mongo_storage
+    db_state['status'] = 'connected'
+    db_state['last_error'] = None
+    db_state['connected_at'] = datetime.utcnow().isoformat()
+    log.info('MongoDB connected, switched to database storage', attempts=db_state['attempts'])
+    
     try:
-        from flask_mongoengine import MongoEngine
-        from models import User, Resume, Job
-        
-        # Configure MongoDB
-        app.config['MONGODB_SETTINGS'] = {
-            'host': MONGODB_URL,
-            'connect': False,
-            'ssl': True,
-            'ssl_cert_reqs': None,
-            'tlsAllowInvalidCertificates': True,
-            'serverSelectionTimeoutMS': 10000
-        }
-        
-        db = MongoEngine()
-        db.init_app(app)
-        
-        # Test MongoDB connection
         with app.app_context():
-            User.objects.count()  # Test query
-        
-        USE_MONGODB = True
-        print("✅ MongoDB connection successful - using database storage")
-        
+            _migrate_memory_users(mongo_storage)
     except Exception as e:
-        print(f"❌ MongoDB connection failed: {str(e)}")
-        print("🔄 Falling back to in-memory storage")
-        USE_MONGODB = False
+        log.warning('could not copy in-memory users to MongoDB', error=str(e))
+    
+    import mongo_monitoring
+    from config import MONGODB_POOL_SETTINGS
+    mongo_monitoring.warm_up_in_background(app, MONGODB_POOL_SETTINGS['minPoolSize'])
+
+def start_storage_detection():
+    """Start the background MongoDB probe (once per process, fork-safe)"""
+    global _probe_pid
+    if not MONGODB_URL:
+        return
+    with _probe_lock:
+        if _probe_pid == os.getpid():
+            return
+        _probe_pid = os.getpid()
+    threading.Thread(target=_probe_database, name='mongodb-probe', daemon=True).start()
 
-if not USE_MONGODB:
-    print("📝 Using in-memory storage (no MongoDB URL found or connection failed)")
-    # Simple in-memory storage for testing
-    users = []
-    resumes = []
-    jobs = []
+log.info('serving from in-memory storage', mongodb_probe='background' if MONGODB_URL else 'no MongoDB URL found')
+start_storage_detection()
 
 # Session management
 def get_current_user_id():
@@ -62,6 +143,9 @@ def get_current_user_id():
 def is_logged_in():
     return 'user_id' in session
 
+def storage_mode(store):
+    return "MongoDB" if store.name == 'mongodb' else "In-Memory"
+
 @app.route('/')
 def home():
     return render_template('index.html')
@@ -92,13 +176,13 @@ def profile_page():
 
 @app.route('/api/status')
 def api_status():
-    storage_mode = "MongoDB" if USE_MONGODB else "In-Memory"
+    store = storage
     return jsonify({
         "message": "Smart Resume API is running!",
         "status": "success",
-        "storage_mode": storage_mode,
+        "storage_mode": storage_mode(store),
         "mongodb_url_present": MONGODB_URL is not None,
-        "database": "MongoDB Atlas" if USE_MONGODB else "in-memory (testing mode)",
+        "database": "MongoDB Atlas" if store.name == 'mongodb' else "in-memory (testing mode)",
         "endpoints": {
             "home": "/",
             "login": "/login",
@@ -112,54 +196,38 @@ def api_status():
 
 @app.route('/health')
 def health():
-    storage_mode = "MongoDB" if USE_MONGODB else "In-Memory"
+    store = storage
     return jsonify({
         "status": "healthy",
-        "storage_mode": storage_mode,
-        "database": "MongoDB connected" if USE_MONGODB else "in-memory (testing mode)"
+        "storage_mode": storage_mode(store),
+        "database": "MongoDB connected" if store.name == 'mongodb' else "in-memory (testing mode)",
+        "database_state": db_state['status'],
+        "database_probe_attempts": db_state['attempts'],
+        "database_last_error": db_state['last_error'],
+        "database_connected_at": db_state['connected_at']
     })
 
 @app.route('/test-db')
 def test_db():
-    if USE_MONGODB:
-        try:
-            from models import User, Resume, Job, PasswordReset
-            
-            # Check collections by counting documents
-            user_count = User.objects.count()
-            resume_count = Resume.objects.count()
-            job_count = Job.objects.count()
-            password_reset_count = PasswordReset.objects.count()
-
-            return jsonify({
-                "database_status": "working",
-                "storage_mode": "MongoDB",
-                "mongodb_url": MONGODB_URL[:50] + "..." if MONGODB_URL else None,
-                "collections": {
-                    "users": f"{user_count} documents",
-                    "resumes": f"{resume_count} documents",
-                    "jobs": f"{job_count} documents",
-                    "password_resets": f"{password_reset_count} documents"
-                },
-                "message": "MongoDB database is working fine!"
-            })
-        except Exception as e:
-            return jsonify({
-                "database_status": "error",
-                "storage_mode": "MongoDB",
-                "error": str(e)
-            }), 500
-    else:
+    store = storage
+    try:
+        counts = store.counts()
+    except Exception as e:
         return jsonify({
-            "database_status": "working",
-            "storage_mode": "In-Memory",
-            "collections": {
-                "users": f"{len(users)} documents",
-                "resumes": f"{len(resumes)} documents",
-                "jobs": f"{len(jobs)} documents"
-            },
-            "message": "In-memory database is working fine!"
-        })
+            "database_status": "error",
+            "storage_mode": storage_mode(store),
+            "error": str(e)
+        }), 500
+    
+    response = {
+        "database_status": "working",
+        "storage_mode": storage_mode(store),
+        "collections": {name: f"{count} documents" for name, count in counts.items()},
+        "message": f"{'MongoDB' if store.name == 'mongodb' else 'In-memory'} database is working fine!"
+    }
+    if store.name == 'mongodb':
+        response["mongodb_url"] = MONGODB_URL[:50] + "..."
+    return jsonify(response)
 
 # Authentication endpoints
 @app.route('/api/auth/login', methods=['POST'])
@@ -168,10 +236,7 @@ def login():
         data = request.get_json()
         email = data.get('email', '').strip().lower()
         password = data.get('password', '')
-        
-        print(f"=== LOGIN ATTEMPT ===")
-        print(f"Email: {email}")
-        print(f"Storage mode: {'MongoDB' if USE_MONGODB else 'In-Memory'}")
+        store = storage  # Read once - storage may switch mid-request
         
         # Validate input
         if not email or not password:
@@ -179,33 +244,15 @@ def login():
         
         user = None
         
-        if USE_MONGODB:
-            from models import User
-            try:
-                user_obj = User.objects(email=email).first()
-                if user_obj and user_obj.check_password(password):
-                    user = {
-                        'id': str(user_obj.id),
-                        'name': user_obj.name,
-                        'email': user_obj.email
-                    }
-            except Exception as e:
-                print(f"MongoDB login error: {str(e)}")
-        else:
-            # In-memory storage
-            print(f"Total users in system: {len(users)}")
-            for u in users:
-                if u['email'].lower() == email:
-                    # Verify password
-                    try:
-                        password_bytes = password.encode('utf-8')
-                        hashed_password = u['password'].encode('utf-8')
-                        
-                        if bcrypt.checkpw(password_bytes, hashed_password):
-                            user = u
-                            break
-                    except Exception as password_error:
-                        print(f"Password verification error: {password_error}")
+        try:
+            candidate = store.get_user_by_email(email)
+            if candidate:
+                with metrics.timed('bcrypt'):
+                    password_ok = bcrypt.checkpw(password.encode('utf-8'), candidate['password'].encode('utf-8'))
+                if password_ok:
+                    user = candidate
+        except Exception as e:
+            log.warning('login lookup error', storage=store.name, error=str(e))
         
         if user:
             # Login successful - create session
@@ -213,9 +260,7 @@ def login():
             session['user_email'] = user['email']
             session['user_name'] = user['name']
             
-            print(f"Login successful for user: {user['name']}")
-            print(f"Session created with user_id: {user['id']}")
-            print("=====================")
+            log.info('login succeeded', user_id=user['id'], storage=store.name)
             
             return jsonify({
                 'message': 'Login successful',
@@ -227,11 +272,11 @@ def login():
                 }
             }), 200
         else:
-            print("User not found or invalid credentials")
+            log.info('login failed', storage=store.name)
             return jsonify({'message': 'Invalid email or password'}), 401
             
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        log.exception('login error')
         return jsonify({'message': 'Login failed. Please try again.'}), 500
 
 @app.route('/api/auth/register', methods=['POST'])
@@ -241,11 +286,7 @@ def register():
         name = data.get('name', '').strip()
         email = data.get('email', '').strip().lower()
         password = data.get('password', '')
-        
-        print(f"=== REGISTRATION ATTEMPT ===")
-        print(f"Name: {name}")
-        print(f"Email: {email}")
-        print(f"Storage mode: {'MongoDB' if USE_MONGODB else 'In-Memory'}")
+        store = storage  # Read once - storage may switch mid-request
         
         # Validate input
         if not name or not email or not password:
@@ -255,62 +296,22 @@ def register():
             return jsonify({'message': 'Password must be at least 6 characters long'}), 400
         
         # Check if user already exists
-        user_exists = False
-        
-        if USE_MONGODB:
-            from models import User
-            try:
-                existing_user = User.objects(email=email).first()
-                if existing_user:
-                    user_exists = True
-            except Exception as e:
-                print(f"MongoDB user check error: {str(e)}")
-        else:
-            # In-memory storage
-            for user in users:
-                if user['email'].lower() == email:
-                    user_exists = True
-                    break
-        
-        if user_exists:
-            print(f"User already exists with email: {email}")
+        if store.get_user_by_email(email):
+            log.info('registration rejected, email taken', storage=store.name)
             return jsonify({'message': 'User with this email already exists'}), 409
         
         # Create new user
-        if USE_MONGODB:
-            from models import User
-            try:
-                new_user = User(name=name, email=email)
-                new_user.set_password(password)
-                new_user.save()
-                
-                print(f"User registered successfully in MongoDB: {name} ({email})")
-            except Exception as e:
-                print(f"MongoDB user creation error: {str(e)}")
-                return jsonify({'message': 'Registration failed. Please try again.'}), 500
-        else:
-            # In-memory storage
-            try:
-                password_bytes = password.encode('utf-8')
-                salt = bcrypt.gensalt()
-                hashed_password = bcrypt.hashpw(password_bytes, salt)
-                
-                new_user = {
-                    'id': str(uuid.uuid4()),
-                    'name': name,
-                    'email': email,
-                    'password': hashed_password.decode('utf-8'),  # Store as string
-                    'created_at': datetime.utcnow().isoformat()
-                }
-                
-                users.append(new_user)
-                print(f"User registered successfully in memory: {name} ({email})")
-                print(f"Total users now: {len(users)}")
-            except Exception as e:
-                print(f"In-memory user creation error: {str(e)}")
-                return jsonify({'message': 'Registration failed. Please try again.'}), 500
-        
-        print("=========================")
+        try:
+            with metrics.timed('bcrypt'):
+                hashed_password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+            new_user = store.create_user(name, email, hashed_password.decode('utf-8'))
+            if not new_user:
+                return jsonify({'message': 'User with this email already exists'}), 409
+            
+            log.info('user registered', user_id=new_user['id'], storage=store.name)
+        except Exception as e:
+            log.exception('user creation error', storage=store.name)
+            return jsonify({'message': 'Registration failed. Please try again.'}), 500
         
         return jsonify({
             'message': 'Registration successful! You can now login.',
@@ -318,7 +319,7 @@ def register():
         }), 201
         
     except Exception as e:
-        print(f"Registration error: {str(e)}")
+        log.exception('registration error')
         return jsonify({'message': 'Registration failed. Please try again.'}), 500
 
 @app.route('/api/auth/logout', methods=['POST'])
@@ -326,89 +327,15 @@ def logout():
     session.clear()
     return jsonify({'message': 'Logged out successfully'}), 200
 
-# Jobs endpoints (simplified for both storage modes)
+# Jobs endpoints (same code for both storage modes)
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
-    # Create some sample jobs for demo
-    sample_jobs = []
-    
-    if USE_MONGODB:
-        try:
-            from models import Job
-            jobs_data = Job.objects()
-            if jobs_data.count() == 0:
-                # Create sample jobs in MongoDB
-                sample_jobs_data = [
-                    {
-                        'job_title': 'Frontend Developer',
-                        'company': 'TechCorp Inc.',
-                        'required_skills': ['JavaScript', 'React', 'HTML', 'CSS']
-                    },
-                    {
-                        'job_title': 'Python Developer', 
-                        'company': 'DataSoft Solutions',
-                        'required_skills': ['Python', 'Django', 'PostgreSQL', 'API Development']
-                    },
-                    {
-                        'job_title': 'Full Stack Developer',
-                        'company': 'Innovation Labs', 
-                        'required_skills': ['JavaScript', 'Python', 'React', 'Node.js', 'MongoDB']
-                    }
-                ]
-                
-                for job_data in sample_jobs_data:
-                    job = Job(**job_data)
-                    job.save()
-                
-                jobs_data = Job.objects()
-            
-            sample_jobs = []
-            for job in jobs_data:
-                sample_jobs.append({
-                    'id': str(job.id),
-                    'job_title': job.job_title,
-                    'company': job.company,
-                    'required_skills': job.required_skills,
-                    'created_at': job.created_at.isoformat() if job.created_at else datetime.utcnow().isoformat(),
-                    'updated_at': job.updated_at.isoformat() if job.updated_at else datetime.utcnow().isoformat()
-                })
-        except Exception as e:
-            print(f"MongoDB jobs error: {str(e)}")
-    else:
-        # In-memory storage
-        if not jobs:  # Only add sample data if jobs list is empty
-            from datetime import datetime, timedelta
-            
-            sample_jobs_data = [
-                {
-                    'id': str(uuid.uuid4()),
-                    'job_title': 'Frontend Developer',
-                    'company': 'TechCorp Inc.',
-                    'required_skills': ['JavaScript', 'React', 'HTML', 'CSS'],
-                    'created_at': (datetime.utcnow() - timedelta(days=2)).isoformat(),
-                    'updated_at': (datetime.utcnow() - timedelta(days=2)).isoformat()
-                },
-                {
-                    'id': str(uuid.uuid4()),
-                    'job_title': 'Python Developer',
-                    'company': 'DataSoft Solutions',
-                    'required_skills': ['Python', 'Django', 'PostgreSQL', 'API Development'],
-                    'created_at': (datetime.utcnow() - timedelta(days=1)).isoformat(),
-                    'updated_at': (datetime.utcnow() - timedelta(days=1)).isoformat()
-                },
-                {
-                    'id': str(uuid.uuid4()),
-                    'job_title': 'Full Stack Developer',
-                    'company': 'Innovation Labs',
-                    'required_skills': ['JavaScript', 'Python', 'React', 'Node.js', 'MongoDB'],
-                    'created_at': datetime.utcnow().isoformat(),
-                    'updated_at': datetime.utcnow().isoformat()
-                }
-            ]
-            
-            jobs.extend(sample_jobs_data)
-        
-        sample_jobs = jobs
+    # Sample jobs are seeded once at startup (see seed_data.py)
+    try:
+        sample_jobs = storage.list_jobs()
+    except Exception as e:
+        log.warning('jobs lookup error', error=str(e))
+        sample_jobs = []
     
     return jsonify({'jobs': sample_jobs}), 200
 
@@ -416,25 +343,10 @@ def get_jobs():
 def get_job(job_id):
     job = None
     
-    if USE_MONGODB:
-        try:
-            from models import Job
-            from bson import ObjectId
-            job_obj = Job.objects(id=ObjectId(job_id)).first()
-            if job_obj:
-                job = {
-                    'id': str(job_obj.id),
-                    'job_title': job_obj.job_title,
-                    'company': job_obj.company,
-                    'required_skills': job_obj.required_skills,
-                    'created_at': job_obj.created_at.isoformat() if job_obj.created_at else datetime.utcnow().isoformat(),
-                    'updated_at': job_obj.updated_at.isoformat() if job_obj.updated_at else datetime.utcnow().isoformat()
-                }
-        except Exception as e:
-            print(f"MongoDB get job error: {str(e)}")
-    else:
-        # In-memory storage
-        job = next((j for j in jobs if j['id'] == job_id), None)
+    try:
+        job = storage.get_job(job_id)
+    except Exception as e:
+        log.warning('job lookup error', job_id=job_id, error=str(e))
     
     if not job:
         return jsonify({'message': 'Job not found'}), 404
@@ -444,7 +356,7 @@ def get_job(job_id):
 if __name__ == '__main__':
     print("Starting Smart Resume Auto-Detection Mode...")
     print(f"MongoDB URL present: {MONGODB_URL is not None}")
-    print(f"Using storage mode: {'MongoDB' if USE_MONGODB else 'In-Memory'}")
+    print(f"Initial storage mode: {storage_mode(storage)} (see /health for MongoDB state)")
     print("Access the application at: http://localhost:5000")
     print("Or from other devices at: http://0.0.0.0:5000")
     try:
@@ -0,0 +1,204 @@
+"""
+Structured logging for Smart Resume
+
+Request handlers used to print multi-line debug banners with full request
+bodies and resume objects. That meant synchronous stdout writes on every
+request, and the banners leaked personal data. Handlers now log one
+compact line through get_logger():
+
+    log = get_logger(__name__)
+    log.info('resume created', resume_id=resume_id, user_id=user_id)
+
+Keyword arguments become structured fields. Records go through a
+QueueHandler, so the request thread only enqueues them, and a
+QueueListener thread formats and writes them. Sensitive fields and
+anything that looks like an email address or token are redacted. DEBUG
+and INFO records can be sampled, and disabled levels cost one
+isEnabledFor() check.
+
+Environment:
+    LOG_LEVEL        DEBUG | INFO | WARNING | ERROR (default INFO)
+    LOG_FORMAT       text | json (default text)
+    LOG_SAMPLE_RATE  fraction of DEBUG/INFO records kept (default 1.0)
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+
+ROOT_LOGGER = 'smart_resume'
+
+REDACTED = '[redacted]'
+
+# Field names whose values are never written to the log
+SENSITIVE_FIELDS = {
+    'password', 'new_password', 'otp', 'token', 'access_token', 'secret',
+    'email', 'phone', 'address', 'linkedin', 'full_name', 'name',
+    'summary', 'education', 'experience', 'projects', 'body', 'data'
+}
+
+_SENSITIVE_PATTERNS = [
+    re.compile(r'[\w.+-]+@[\w-]+\.[\w.-]+'),                       # email addresses
+    re.compile(r'(?i)\b(bearer|session_token_)\s*[\w.-]+'),          # tokens
+    re.compile(r'\$2[aby]\$\d\d\$[./A-Za-z0-9]{53}'),                # bcrypt hashes
+]
+
+
+def redact_text(text):
+    for pattern in _SENSITIVE_PATTERNS:
+        text = pattern.sub(REDACTED, text)
+    return text
+
+
+class RedactingFilter(logging.Filter):
+    """Masks sensitive fields and email/token-like substrings"""
+
+    def filter(self, record):
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        record.msg = redact_text(str(record.msg))
+        fields = getattr(record, 'fields', None)
+        if fields:
+            record.fields = {
+                key: REDACTED if key in SENSITIVE_FIELDS
+                else redact_text(value) if isinstance(value, str) else value
+                for key, value in fields.items()
+            }
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps `rate` of the records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or self.rate >= 1.0 or random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        entry = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """`time LEVEL logger message key=value ...` on a single line"""
+
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    def format(self, record):
+        record.message = record.getMessage()
+        record.asctime = self.formatTime(record)
+        line = self.formatMessage(record)
+        fields = getattr(record, 'fields', None)
+        if fields:
+            line += ' ' + ' '.join(f'{key}={value}' for key, value in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback apart from the message"""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_exception_formatter = logging.Formatter()
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """Logger adapter that turns keyword arguments into structured fields"""
+
+    def __init__(self, logger):
+        super().__init__(logger, {})
+
+    def process(self, msg, kwargs):
+        passthrough = {key: kwargs.pop(key) for key in ('exc_info', 'stack_info', 'stacklevel', 'extra')
+                       if key in kwargs}
+        if kwargs:
+            passthrough.setdefault('extra', {})['fields'] = kwargs
+        return msg, passthrough
+
+
+_configure_lock = threading.Lock()
+_listener = None
+_queue = None
+
+
+def _start_listener(handler):
+    global _listener
+    _listener = logging.handlers.QueueListener(_queue, handler, respect_handler_level=False)
+    _listener.start()
+
+
+def configure_logging(level=None, fmt=None, sample_rate=None, stream=None):
+    """Attach the queue handler to the smart_resume logger (once per process)"""
+    global _queue
+    with _configure_lock:
+        logger = logging.getLogger(ROOT_LOGGER)
+        if _queue is not None:
+            return logger
+
+        level = (level or os.environ.get('LOG_LEVEL', 'INFO')).upper()
+        fmt = (fmt or os.environ.get('LOG_FORMAT', 'text')).lower()
+        sample_rate = float(os.environ.get('LOG_SAMPLE_RATE', 1.0) if sample_rate is None else sample_rate)
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == 'json' else TextFormatter())
+
+        _queue = queue.SimpleQueue()
+        queue_handler = _QueueHandler(_queue)
+        # Filters run on the calling thread before enqueueing, so dropped
+        # records cost nothing further and payloads are redacted early
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+        queue_handler.addFilter(RedactingFilter())
+
+        logger.setLevel(level)
+        logger.addHandler(queue_handler)
+        logger.propagate = False
+
+        _start_listener(output)
+        atexit.register(lambda: _listener and _listener.stop())
+        # The listener thread does not survive fork(); restart it in
+        # pre-forked workers so their queues keep draining
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=lambda: _start_listener(output))
+        return logger
+
+
+def get_logger(name):
+    """Return a StructuredLogger under the smart_resume namespace"""
+    configure_logging()
+    short_name = name.rsplit('.', 1)[-1]
+    return StructuredLogger(logging.getLogger(f'{ROOT_LOGGER}.{short_name}'))
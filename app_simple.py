@@ -55,12 +55,14 @@ def authenticate_user(email, password):
 
 # Mock data for testing login and PDF functionality
 # Note: In production, use a proper database
+# Password hashes are precomputed: generate_password_hash() (PBKDF2, 600k rounds)
+# took ~1.4 s at import for these four users
 mock_users = {
     'test@example.com': {
         'id': '1',
         'name': 'Test User',
         'email': 'test@example.com',
-        'password_hash': generate_password_hash('password123'),
+        'password_hash': 'pbkdf2:sha256:600000$6NsqjeL5k1TgUYDc$c9756babcb8c99e2630c2968a73586ac8174ffb0810322b093a21939ec14c6cf',  # password123
         'created_at': '2024-01-01T00:00:00Z',
         'is_active': True
     },
@@ -68,7 +70,7 @@ mock_users = {
         'id': '2',
         'name': 'Demo User', 
         'email': 'demo@smartresume.com',
-        'password_hash': generate_password_hash('demo123'),
+        'password_hash': 'pbkdf2:sha256:600000$0H4hj5Y3twSSrW4h$572948f6988b3783d5d495b417f5f2c161052ef2ce8317a53ecadb93f9dd9584',  # demo123
         'created_at': '2024-01-01T00:00:00Z',
         'is_active': True
     },
@@ -76,7 +78,7 @@ mock_users = {
         'id': '3',
         'name': 'Sweety VP',
         'email': 'sweetyvp1611@gmail.com',
-        'password_hash': generate_password_hash('sweety123'),
+        'password_hash': 'pbkdf2:sha256:600000$5JWyZ1QwPZdc42E5$6602649afd0aaaba5aaec51ee00a88ff24e8f841896636606f768696915e9246',  # sweety123
         'created_at': '2024-01-01T00:00:00Z',
         'is_active': True
     },
@@ -84,7 +86,7 @@ mock_users = {
         'id': '4',
         'name': 'Sweety KP',
         'email': 'sweetykp23hcs@student.mes.ac.in',
-        'password_hash': generate_password_hash('student123'),
+        'password_hash': 'pbkdf2:sha256:600000$st7OaOMXZDyl4z3P$84e193b01f06fc12e377defd791779cea2f69aa5aa368d147d0b7eb97d446b1a',  # student123
         'created_at': '2024-01-01T00:00:00Z',
         'is_active': True
     }
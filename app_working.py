@@ -8,8 +8,10 @@ from flask_cors import CORS
 import os
 import json
 from datetime import datetime
+from app_logging import get_logger
 
 app = Flask(__name__)
+log = get_logger(__name__)
 app.config['SECRET_KEY'] = 'working-app-secret-key'
 
 # Enable CORS for API calls
@@ -117,24 +119,20 @@ def health_check():
 def login_api():
     """Login API endpoint"""
     try:
-        print("Login endpoint called")  # Debug log
-        
         data = request.get_json()
         if not data:
-            print("No JSON data received")  # Debug log
+            log.info('login rejected', reason='no json body')
             return jsonify({'message': 'No data provided'}), 400
             
         email = data.get('email')
         password = data.get('password')
         
-        print(f"Login attempt for email: {email}")  # Debug log
-        
         if not email or not password:
             return jsonify({'message': 'Email and password are required'}), 400
         
         user = mock_users.get(email)
         if user and user['password'] == password:
-            print(f"Login successful for: {email}")  # Debug log
+            log.info('login succeeded', user_id=user['id'])
             return jsonify({
                 'message': 'Login successful',
                 'access_token': f'mock-token-{user["id"]}-{datetime.now().timestamp()}',
@@ -147,11 +145,11 @@ def login_api():
                 }
             }), 200
         else:
-            print(f"Invalid credentials for: {email}")  # Debug log
+            log.info('login failed')
             return jsonify({'message': 'Invalid credentials'}), 401
             
     except Exception as e:
-        print(f"Login error: {e}")  # Debug log
+        log.exception('login error')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
 @app.route('/api/auth/register', methods=['POST'])
@@ -187,7 +185,7 @@ def register_api():
         }), 201
             
     except Exception as e:
-        print(f"Registration error: {e}")  # Debug log
+        log.exception('registration error')
         return jsonify({'message': f'Server error: {str(e)}'}), 500
 
 # ==================== RESUME ROUTES ====================
@@ -197,18 +195,15 @@ def handle_resumes():
     """Handle both GET (list resumes) and POST (create resume)"""
     if request.method == 'GET':
         try:
-            print("Get resumes endpoint called")  # Debug log
             return jsonify({
                 'resumes': list(mock_resumes.values())
             }), 200
         except Exception as e:
-            print(f"Get resumes error: {e}")  # Debug log
+            log.exception('list resumes error')
             return jsonify({'message': str(e)}), 500
     
     elif request.method == 'POST':
         try:
-            print("Create resume endpoint called")  # Debug log
-            
             data = request.get_json()
             if not data:
                 return jsonify({'message': 'No data provided'}), 400
@@ -230,7 +225,7 @@ def handle_resumes():
             # Add to mock data
             mock_resumes[new_id] = new_resume
             
-            print(f"Resume created with ID: {new_id}")  # Debug log
+            log.info('resume created', resume_id=new_id)
             
             return jsonify({
                 'message': 'Resume created successfully',
@@ -238,29 +233,26 @@ def handle_resumes():
             }), 201
             
         except Exception as e:
-            print(f"Create resume error: {e}")  # Debug log
+            log.exception('create resume error')
             return jsonify({'message': f'Server error: {str(e)}'}), 500
 
 @app.route('/api/resumes/<resume_id>', methods=['GET'])
 def get_resume(resume_id):
     """Get specific resume"""
     try:
-        print(f"Get resume endpoint called for ID: {resume_id}")  # Debug log
         resume = mock_resumes.get(resume_id)
         if resume:
             return jsonify({'resume': resume}), 200
         else:
             return jsonify({'message': 'Resume not found'}), 404
     except Exception as e:
-        print(f"Get resume error: {e}")  # Debug log
+        log.exception('get resume error', resume_id=resume_id)
         return jsonify({'message': str(e)}), 500
 
 @app.route('/api/resumes/<resume_id>', methods=['PUT'])
 def update_resume(resume_id):
     """Update existing resume"""
     try:
-        print(f"Update resume endpoint called for ID: {resume_id}")  # Debug log
-        
         resume = mock_resumes.get(resume_id)
         if not resume:
             return jsonify({'message': 'Resume not found'}), 404
@@ -281,39 +273,35 @@ def update_resume(resume_id):
         
         resume['updated_at'] = datetime.now().isoformat()
         
-        print(f"Resume {resume_id} updated successfully")  # Debug log
+        log.info('resume updated', resume_id=resume_id)
         
         return jsonify({'message': 'Resume updated successfully'}), 200
         
     except Exception as e:
-        print(f"Update resume error: {e}")  # Debug log
+        log.exception('update resume error', resume_id=resume_id)
         return jsonify({'message': str(e)}), 500
 
 @app.route('/api/resumes/<resume_id>', methods=['DELETE'])
 def delete_resume(resume_id):
     """Delete resume"""
     try:
-        print(f"Delete resume endpoint called for ID: {resume_id}")  # Debug log
-        
         if resume_id not in mock_resumes:
             return jsonify({'message': 'Resume not found'}), 404
         
         del mock_resumes[resume_id]
         
-        print(f"Resume {resume_id} deleted successfully")  # Debug log
+        log.info('resume deleted', resume_id=resume_id)
         
         return jsonify({'message': 'Resume deleted successfully'}), 200
         
     except Exception as e:
-        print(f"Delete resume error: {e}")  # Debug log
+        log.exception('delete resume error', resume_id=resume_id)
         return jsonify({'message': str(e)}), 500
 
 @app.route('/api/resumes/<resume_id>/download', methods=['GET'])
 def download_resume_pdf(resume_id):
     """Download resume as PDF"""
     try:
-        print(f"PDF download requested for resume: {resume_id}")  # Debug log
-        
         # Import PDF generation library
         try:
             from xhtml2pdf import pisa
@@ -430,10 +418,10 @@ def download_resume_pdf(resume_id):
         pdf = pisa.pisaDocument(BytesIO(html_template.encode("utf-8")), result)
         
         if pdf.err:
-            print(f"PDF generation errors: {pdf.err}")  # Debug log
+            log.error('pdf generation failed', resume_id=resume_id, errors=pdf.err)
             return jsonify({'message': 'Error generating PDF'}), 500
         
-        print(f"PDF generated successfully, size: {len(result.getvalue())} bytes")  # Debug log
+        log.info('pdf generated', resume_id=resume_id, size=len(result.getvalue()))
         
         # Create response
         response = make_response(result.getvalue())
@@ -443,26 +431,26 @@ def download_resume_pdf(resume_id):
         return response
         
     except Exception as e:
-        print(f"Download error: {e}")  # Debug log
+        log.exception('download error', resume_id=resume_id)
         return jsonify({'message': f'Download error: {str(e)}'}), 500
 
 # ==================== ERROR HANDLERS ====================
 
 @app.errorhandler(404)
 def not_found(error):
-    print(f"404 Error: {request.url}")  # Debug log
+    log.info('not found', method=request.method, path=request.path)
     if request.path.startswith('/api/'):
         return jsonify({'message': f'API endpoint not found: {request.path}'}), 404
     return render_template('index.html'), 404
 
 @app.errorhandler(500)
 def internal_error(error):
-    print(f"500 Error: {error}")  # Debug log
+    log.error('internal server error', error=str(error))
     return jsonify({'message': 'Internal server error'}), 500
 
 @app.errorhandler(405)
 def method_not_allowed(error):
-    print(f"405 Error: {request.method} {request.path}")  # Debug log
+    log.info('method not allowed', method=request.method, path=request.path)
     return jsonify({'message': f'Method {request.method} not allowed for {request.path}'}), 405
 
 # ==================== DEBUG ROUTES ====================
@@ -512,10 +500,8 @@ def test_pdf_generation():
 
 @app.before_request
 def log_request_info():
-    """Log all incoming requests for debugging"""
-    print(f"[{datetime.now()}] {request.method} {request.path} from {request.remote_addr}")
-    if request.is_json:
-        print(f"Request data: {request.get_json()}")
+    """Log one line per request; bodies are never logged (they carry PII)"""
+    log.debug('request', method=request.method, path=request.path, remote_addr=request.remote_addr)
 
 if __name__ == '__main__':
     print("=" * 80)
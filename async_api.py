@@ -0,0 +1,419 @@
+"""
+Asyncio JSON API for Smart Resume
+
+The JSON routes of simple_app.py mostly wait on storage, and under the
+threaded WSGI server every waiting request (or idle keep-alive client)
+holds a thread. This module serves the same routes from one event loop
+with aiohttp, so a process can keep thousands of slow clients open:
+
+    GET  /api/jobs, /api/jobs/{job_id}
+    GET  /api/resumes          POST /api/resumes
+    GET  /api/resumes/{id}     PUT /api/resumes/{id}     DELETE /api/resumes/{id}
+    PATCH /api/resumes/{id}    (partial update, see resume_patch.py)
+    GET  /api/resumes/{id}/download
+    GET  /api/user/profile, /test-db, /health, /internal/metrics
+    POST /api/auth/login, /api/auth/logout
+
+It shares simple_app's storage engine, cache and session cookie, so a user
+logged in on either server is logged in on both. Put it behind the same
+host and route these paths to it. Storage calls go through async_storage.py
+(Motor for MongoDB). bcrypt runs on a thread pool because it releases the
+GIL. PDF rendering holds the GIL, so it runs in a pool of PDF_WORKERS
+processes (default: one per core).
+
+    python async_api.py                      # port ASYNC_PORT (default 8001)
+    gunicorn async_api:create_app --bind 0.0.0.0:8001 --worker-class aiohttp.GunicornWebWorker
+"""
+import asyncio
+import functools
+import multiprocessing
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from aiohttp import web
+from itsdangerous import BadSignature
+
+import compression
+import metrics
+import resume_patch
+from app_logging import get_logger
+from async_storage import create_async_storage
+from json_provider import dumps_str, loads
+from pdf_render import PdfRenderError, render_resume_pdf
+from shared_cache import SharedSessionInterface
+from storage import ResumeConflict
+from simple_app import (app as flask_app, storage as sync_storage, cache, picture_store, database_label,
+                        PROFILE_CACHE_TTL)
+
+log = get_logger(__name__)
+
+STORAGE = web.AppKey('storage', object)
+SESSIONS = web.AppKey('sessions', object)
+PDF_POOL = web.AppKey('pdf_pool', ProcessPoolExecutor)
+
+# Same encoder as the Flask app (orjson when installed, see json_provider.py)
+json_response = functools.partial(web.json_response, dumps=dumps_str)
+
+
+async def run_blocking(fn, *args):
+    """Run a blocking call on the loop's default thread pool"""
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+
+async def cache_call(fn, *args):
+    # The shared cache is a SQLite file whose writes can wait on a lock;
+    # the local cache is a dict and runs inline
+    return await run_blocking(fn, *args) if cache.shared else fn(*args)
+
+
+class FlaskSessions:
+    """Reads and writes simple_app's session, cookie or server-side alike"""
+
+    def __init__(self, app):
+        self.app = app
+        self.interface = app.session_interface
+        self.cookie_name = app.config['SESSION_COOKIE_NAME']
+        self.server_side = isinstance(self.interface, SharedSessionInterface)
+        self.lifetime = int(app.permanent_session_lifetime.total_seconds())
+
+    async def load(self, request):
+        if 'session' not in request:
+            request['session'] = await self._load(request.cookies.get(self.cookie_name))
+        return request['session']
+
+    async def _load(self, value):
+        if not value:
+            return {}
+        if self.server_side:
+            return await cache_call(self.interface.cache.get, self.interface.key_prefix + value) or {}
+        try:
+            return self.interface.get_signing_serializer(self.app).loads(value, max_age=self.lifetime)
+        except BadSignature:
+            return {}
+
+    async def save(self, request, response, data, renew=False):
+        """Store `data` as the session. `renew` (at login) always issues a new
+        session id and drops the old one, so an id planted in the browser
+        before login never becomes authenticated."""
+        if self.server_side:
+            cache, prefix = self.interface.cache, self.interface.key_prefix
+            sid = request.cookies.get(self.cookie_name)
+            if sid and renew:
+                await cache_call(cache.delete, prefix + sid)
+                sid = None
+            elif sid and await cache_call(cache.get, prefix + sid) is None:
+                sid = None  # Never adopt an id this server did not issue
+            sid = sid or secrets.token_urlsafe(32)
+            await cache_call(cache.set, prefix + sid, data, self.lifetime)
+            value = sid
+        else:
+            value = self.interface.get_signing_serializer(self.app).dumps(data)
+        response.set_cookie(self.cookie_name, value, path=self.app.config['SESSION_COOKIE_PATH'] or '/',
+                            max_age=self.lifetime, httponly=True,
+                            samesite=self.app.config['SESSION_COOKIE_SAMESITE'],
+                            secure=self.app.config['SESSION_COOKIE_SECURE'])
+
+    async def clear(self, request, response):
+        value = request.cookies.get(self.cookie_name)
+        if self.server_side and value:
+            await cache_call(self.interface.cache.delete, self.interface.key_prefix + value)
+        response.del_cookie(self.cookie_name, path=self.app.config['SESSION_COOKIE_PATH'] or '/')
+
+
+async def current_user_id(request):
+    return (await request.app[SESSIONS].load(request)).get('user_id')
+
+
+async def read_json(request):
+    try:
+        data = await request.json(loads=loads)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+routes = web.RouteTableDef()
+
+
+@routes.get('/health')
+async def health(request):
+    return json_response({'status': 'healthy', 'database': database_label(), 'server': 'asyncio'})
+
+
+@routes.get('/test-db')
+async def test_db(request):
+    counts = await request.app[STORAGE].counts()
+    return json_response({
+        'database_status': 'working',
+        'mode': database_label(),
+        'collections': {name: f'{count} documents' for name, count in counts.items()}
+    })
+
+
+# ---- authentication ----
+@routes.post('/api/auth/login')
+async def login(request):
+    data = await read_json(request) or {}
+    email = str(data.get('email', '')).strip().lower()
+    password = str(data.get('password', ''))
+    if not email or not password:
+        return json_response({'message': 'Email and password are required'}, status=400)
+
+    storage = request.app[STORAGE]
+    user = await storage.get_user_by_email(email)
+    if not user:
+        # Same demo behaviour as simple_app: unknown emails get an account
+        with metrics.timed('bcrypt'):
+            password_hash = await run_blocking(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt())
+        user = (await storage.create_user(email.split('@')[0].title(), email, password_hash.decode('utf-8'))
+                or await storage.get_user_by_email(email))
+        log.info('demo user created on login', user_id=user['id'])
+
+    with metrics.timed('bcrypt'):
+        password_ok = await run_blocking(bcrypt.checkpw, password.encode('utf-8'), user['password'].encode('utf-8'))
+    if not password_ok:
+        log.info('login failed', user_id=user['id'])
+        return json_response({'message': 'Invalid email or password'}, status=401)
+
+    response = json_response({
+        'message': 'Login successful',
+        'access_token': f'session_token_{user["id"]}',
+        'user': {'id': user['id'], 'name': user['name'], 'email': user['email']}
+    })
+    await request.app[SESSIONS].save(request, response, {
+        'user_id': user['id'], 'user_email': user['email'], 'user_name': user['name']
+    }, renew=True)
+    log.info('login succeeded', user_id=user['id'])
+    return response
+
+
+@routes.post('/api/auth/logout')
+async def logout(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Not logged in'}, status=400)
+    response = json_response({'message': 'Logged out successfully'})
+    await request.app[SESSIONS].clear(request, response)
+    log.info('logged out', user_id=user_id)
+    return response
+
+
+# ---- profile ----
+@routes.get('/api/user/profile')
+async def user_profile(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'authenticated': False, 'message': 'User not logged in', 'user': None})
+
+    key = f'profile:{user_id}'
+    profile = await cache_call(cache.get, key)
+    if profile is None:
+        storage = request.app[STORAGE]
+        user = await storage.get_user(user_id)
+        if not user:
+            return json_response({'authenticated': False, 'message': 'User not found', 'user': None},
+                                     status=404)
+        profile = {
+            'id': user['id'],
+            'name': user['name'],
+            'email': user['email'],
+            'is_admin': user.get('is_admin', False),
+            'created_at': user['created_at'],
+            'resume_count': await storage.count_resumes(user_id)
+        }
+        await cache_call(cache.set, key, profile, PROFILE_CACHE_TTL)
+
+    return json_response({
+        'authenticated': True,
+        'user': {**profile, 'personal_info': {}, 'professional_info': {}, 'education': [],
+                 'experience': [], 'skills': [], 'projects': []}
+    })
+
+
+# ---- resumes ----
+@routes.get('/api/resumes')
+async def list_resumes(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Please login to view resumes'}, status=401)
+    return json_response({'resumes': await request.app[STORAGE].list_resumes(user_id)})
+
+
+@routes.post('/api/resumes')
+async def create_resume(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Please login to create a resume'}, status=401)
+    data = await read_json(request)
+    if data is None:
+        return json_response({'message': 'Request body must be a JSON object'}, status=400)
+    resume = await request.app[STORAGE].create_resume(user_id, data)
+    await cache_call(cache.delete, f'profile:{user_id}')
+    log.info('resume created', resume_id=resume['id'], user_id=user_id)
+    return json_response({'message': 'Resume created successfully!', 'resume_id': resume['id']}, status=201)
+
+
+@routes.get('/api/resumes/{resume_id}')
+async def get_resume(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Please login to view resume'}, status=401)
+    resume = await request.app[STORAGE].get_resume(request.match_info['resume_id'], user_id)
+    if not resume:
+        return json_response({'message': 'Resume not found'}, status=404)
+    return json_response({'resume': resume})
+
+
+@routes.put('/api/resumes/{resume_id}')
+async def update_resume(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Please login to update resume'}, status=401)
+    data = await read_json(request)
+    if data is None:
+        return json_response({'message': 'Request body must be a JSON object'}, status=400)
+    resume_id = request.match_info['resume_id']
+    if not await request.app[STORAGE].update_resume(resume_id, user_id, data):
+        return json_response({'message': 'Resume not found'}, status=404)
+    log.info('resume updated', resume_id=resume_id)
+    return json_response({'message': 'Resume updated successfully'})
+
+
+@routes.patch('/api/resumes/{resume_id}')
+async def patch_resume(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Please login to update resume'}, status=401)
+    try:
+        data = await request.json(loads=loads)
+    except ValueError:
+        data = None
+    try:
+        changes, expected_version = resume_patch.parse(data, request.content_type)
+    except resume_patch.PatchError as e:
+        return json_response({'message': str(e)}, status=400)
+    resume_id = request.match_info['resume_id']
+    try:
+        result = await request.app[STORAGE].patch_resume(resume_id, user_id, changes, expected_version)
+    except ResumeConflict as e:
+        return json_response({'message': 'Resume was changed by another save; reload it and retry',
+                              'version': e.version}, status=409)
+    if not result:
+        return json_response({'message': 'Resume not found'}, status=404)
+    if result['changed']:
+        log.info('resume patched', resume_id=resume_id, version=result['version'], fields=','.join(result['changed']))
+    return json_response(dict(result, message='Resume updated successfully'))
+
+
+@routes.delete('/api/resumes/{resume_id}')
+async def delete_resume(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Please login to delete resume'}, status=401)
+    if not await request.app[STORAGE].delete_resume(request.match_info['resume_id'], user_id):
+        return json_response({'message': 'Resume not found'}, status=404)
+    await cache_call(cache.delete, f'profile:{user_id}')
+    return json_response({'message': 'Resume deleted successfully'})
+
+
+@routes.get('/api/resumes/{resume_id}/download')
+async def download_resume_pdf(request):
+    user_id = await current_user_id(request)
+    if not user_id:
+        return json_response({'message': 'Please login to download resume'}, status=401)
+    resume_id = request.match_info['resume_id']
+    resume = await request.app[STORAGE].get_resume(resume_id, user_id)
+    if not resume:
+        return json_response({'message': 'Resume not found'}, status=404)
+
+    loop = asyncio.get_running_loop()
+    try:
+        with metrics.timed('pdf_render'):
+            picture = picture_store.path(resume['profile_picture'], 'pdf')
+            pdf_bytes = await loop.run_in_executor(request.app[PDF_POOL], render_resume_pdf, resume, picture)
+    except PdfRenderError as e:
+        log.error('pdf generation failed', resume_id=resume_id, errors=str(e))
+        return json_response({'message': 'Error generating PDF'}, status=500)
+
+    log.info('pdf generated', resume_id=resume_id, size=len(pdf_bytes))
+    filename = f'{resume.get("full_name") or "Resume"}'.replace(' ', '_')
+    return web.Response(body=pdf_bytes, content_type='application/pdf', headers={
+        'Content-Disposition': f'attachment; filename="{filename}_Resume.pdf"'
+    })
+
+
+# ---- jobs ----
+@routes.get('/api/jobs')
+async def list_jobs(request):
+    return json_response({'jobs': await request.app[STORAGE].list_jobs()})
+
+
+@routes.get('/api/jobs/{job_id}')
+async def get_job(request):
+    job = await request.app[STORAGE].get_job(request.match_info['job_id'])
+    if not job:
+        return json_response({'message': 'Job not found'}, status=404)
+    return json_response({'job': job})
+
+
+@routes.get('/internal/metrics')
+async def internal_metrics(request):
+    return web.Response(text=metrics.render_prometheus(), headers={'Content-Type': metrics.PROMETHEUS_CONTENT_TYPE})
+
+
+@web.middleware
+async def metrics_middleware(request, handler):
+    """Same request metrics as metrics.instrument_flask(), labelled by handler name"""
+    started = time.perf_counter()
+    endpoint = getattr(request.match_info.handler, '__name__', 'unmatched')
+    metrics.requests_in_flight.inc()
+    status = 500
+    try:
+        response = await handler(request)
+        status = response.status
+        return response
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        metrics.requests_in_flight.dec()
+        metrics.request_latency.observe(time.perf_counter() - started, request.method, endpoint)
+        metrics.request_total.inc(1, request.method, endpoint, str(status))
+
+
+async def _start_pdf_pool(app):
+    workers = int(os.environ.get('PDF_WORKERS', os.cpu_count() or 1))
+    # Forked so the workers share the parent's imported code (spawn would
+    # re-run this module and simple_app in every worker). One warm-up render
+    # per worker forks them all at startup, before any request is in flight,
+    # and pays the xhtml2pdf import and font loading up front.
+    pool = app[PDF_POOL] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('fork'))
+    loop = asyncio.get_running_loop()
+    warm_up = {'full_name': 'Warm Up', 'skills': 'Python'}
+    await asyncio.gather(*(loop.run_in_executor(pool, render_resume_pdf, warm_up) for _ in range(workers)))
+    yield
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _close_storage(app):
+    await app[STORAGE].close()
+
+
+def create_app():
+    """Build the aiohttp application (also the gunicorn entry point)"""
+    app = web.Application(middlewares=[metrics_middleware, web.middleware(compression.aiohttp_middleware)])
+    app[STORAGE] = create_async_storage(sync_storage)
+    app[SESSIONS] = FlaskSessions(flask_app)
+    app.cleanup_ctx.append(_start_pdf_pool)
+    app.on_cleanup.append(_close_storage)
+    app.add_routes(routes)
+    return app
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get('ASYNC_PORT', 8001))
+    print(f"Starting Smart Resume async API on http://0.0.0.0:{port} (storage: {database_label()})")
+    web.run_app(create_app(), host='0.0.0.0', port=port, print=None)
@@ -0,0 +1,244 @@
+"""
+Async storage for the asyncio API (async_api.py)
+
+Coroutine versions of the StorageBackend methods the JSON API uses:
+
+    storage = create_async_storage(sync_storage)
+    resumes = await storage.list_resumes(user_id)
+
+- ExecutorStorage wraps any sync StorageBackend. In-memory calls take
+  microseconds and run inline on the event loop. SQLite (and MongoEngine
+  without Motor) calls run on a small thread pool, so a lock wait never
+  stalls the loop.
+- MotorStorage talks to MongoDB through Motor, so a request waiting on the
+  database holds no thread at all. It reads and writes the same
+  collections and document shapes as the MongoEngine models. Writes skip
+  MongoEngine's field validation, so callers must only pass RESUME_FIELDS.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from storage import (RESUME_FIELDS, RESUME_DEFAULTS, ResumeConflict, check_resume_values, resume_from_fields,
+                     _object_id, _isoformat, _patch_result)
+
+ASYNC_METHODS = [
+    'create_user', 'get_user', 'get_user_by_email',
+    'create_resume', 'list_resumes', 'count_resumes', 'get_resume', 'update_resume', 'patch_resume',
+    'delete_resume',
+    'list_jobs', 'get_job', 'counts'
+]
+
+
+class ExecutorStorage:
+    """Runs a sync StorageBackend's methods as coroutines"""
+
+    def __init__(self, storage, max_workers=None):
+        self.storage = storage
+        self.name = storage.name
+        self.inline = storage.name == 'memory'
+        self._executor = None if self.inline else ThreadPoolExecutor(
+            max_workers=max_workers or int(os.environ.get('ASYNC_STORAGE_THREADS', 16)),
+            thread_name_prefix='async-storage'
+        )
+        for method in ASYNC_METHODS:
+            setattr(self, method, self._wrap(getattr(storage, method)))
+
+    def _wrap(self, fn):
+        if self.inline:
+            async def call(*args):
+                return fn(*args)
+        else:
+            async def call(*args):
+                return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        call.__name__ = fn.__name__
+        return call
+
+    async def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+class MotorStorage:
+    """MongoDB through Motor, mirroring storage.MongoStorage"""
+    name = 'mongodb'
+
+    def __init__(self, uri):
+        from motor.motor_asyncio import AsyncIOMotorClient
+        self.client = AsyncIOMotorClient(uri)
+        self.db = self.client.get_default_database()
+        # Collection names MongoEngine derives from the model classes
+        self.users = self.db['user']
+        self.resumes = self.db['resume']
+        self.jobs = self.db['job']
+        self.password_resets = self.db['password_reset']
+
+    # ---- conversion ----
+    @staticmethod
+    def _user_dict(doc):
+        return {
+            'id': str(doc['_id']),
+            'name': doc.get('name', ''),
+            'email': doc.get('email', ''),
+            'password': doc.get('password', ''),
+            'is_admin': doc.get('is_admin', False),
+            'created_at': _isoformat(doc.get('created_at'))
+        }
+
+    @staticmethod
+    def _resume_dict(doc, user_id):
+        data = {'id': str(doc['_id']), 'user_id': user_id}
+        for field in RESUME_FIELDS:
+            value = doc.get(field)
+            data[field] = RESUME_DEFAULTS[field] if value is None else value
+        data['skill_ratings'] = dict(data['skill_ratings'])
+        data['version'] = doc.get('version') or 0
+        data['created_at'] = _isoformat(doc.get('created_at'))
+        data['updated_at'] = _isoformat(doc.get('updated_at'))
+        return data
+
+    @staticmethod
+    def _job_dict(doc):
+        job = {
+            'id': str(doc['_id']),
+            'job_title': doc.get('job_title', ''),
+            'company': doc.get('company', ''),
+            'required_skills': list(doc.get('required_skills', [])),
+            'created_at': _isoformat(doc.get('created_at')),
+            'updated_at': _isoformat(doc.get('updated_at'))
+        }
+        if doc.get('apply_url'):
+            job['applyUrl'] = doc['apply_url']
+        return job
+
+    # ---- users ----
+    async def create_user(self, name, email, password_hash):
+        from pymongo.errors import DuplicateKeyError
+        doc = {'name': name, 'email': email, 'password': password_hash, 'is_admin': False,
+               'created_at': datetime.utcnow()}
+        try:
+            result = await self.users.insert_one(doc)
+        except DuplicateKeyError:
+            return None
+        doc['_id'] = result.inserted_id
+        return self._user_dict(doc)
+
+    async def get_user(self, user_id):
+        oid = _object_id(user_id)
+        doc = await self.users.find_one({'_id': oid}) if oid else None
+        return self._user_dict(doc) if doc else None
+
+    async def get_user_by_email(self, email):
+        doc = await self.users.find_one({'email': email.lower()})
+        return self._user_dict(doc) if doc else None
+
+    # ---- resumes ----
+    async def create_resume(self, user_id, fields):
+        now = datetime.utcnow()
+        doc = dict(resume_from_fields(fields), user=_object_id(user_id), created_at=now, updated_at=now)
+        result = await self.resumes.insert_one(doc)
+        doc['_id'] = result.inserted_id
+        return self._resume_dict(doc, user_id)
+
+    def _owned(self, resume_id, user_id):
+        oid, user_oid = _object_id(resume_id), _object_id(user_id)
+        if oid is None or user_oid is None:
+            return None
+        return {'_id': oid, 'user': user_oid}
+
+    async def list_resumes(self, user_id):
+        user_oid = _object_id(user_id)
+        if user_oid is None:
+            return []
+        cursor = self.resumes.find({'user': user_oid}).sort('created_at', 1)
+        return [self._resume_dict(doc, user_id) async for doc in cursor]
+
+    async def count_resumes(self, user_id):
+        user_oid = _object_id(user_id)
+        return await self.resumes.count_documents({'user': user_oid}) if user_oid else 0
+
+    async def get_resume(self, resume_id, user_id):
+        query = self._owned(resume_id, user_id)
+        doc = await self.resumes.find_one(query) if query else None
+        return self._resume_dict(doc, user_id) if doc else None
+
+    async def update_resume(self, resume_id, user_id, fields):
+        from pymongo import ReturnDocument
+        query = self._owned(resume_id, user_id)
+        if query is None:
+            return None
+        changes = {field: fields[field] for field in RESUME_FIELDS if field in fields}
+        changes['updated_at'] = datetime.utcnow()
+        doc = await self.resumes.find_one_and_update(query, {'$set': changes, '$inc': {'version': 1}},
+                                                     return_document=ReturnDocument.AFTER)
+        return self._resume_dict(doc, user_id) if doc else None
+
+    async def patch_resume(self, resume_id, user_id, changes, expected_version=None):
+        query = self._owned(resume_id, user_id)
+        if query is None:
+            return None
+        fields = [field for field in RESUME_FIELDS if field in changes]
+        doc = await self.resumes.find_one(query, ['version', 'updated_at', *fields])
+        if doc is None:
+            return None
+        version = doc.get('version') or 0
+        if expected_version is not None and expected_version != version:
+            raise ResumeConflict(version)
+        changed = [field for field in fields
+                   if (RESUME_DEFAULTS[field] if doc.get(field) is None else doc[field]) != changes[field]]
+        if not changed:
+            return _patch_result(resume_id, version, _isoformat(doc.get('updated_at')), changed)
+
+        if expected_version is not None:
+            # Documents written before the version field existed have none
+            query = dict(query, version={'$in': [0, None]} if version == 0 else version)
+        now = datetime.utcnow()
+        values = {field: changes[field] for field in changed}
+        check_resume_values(values)
+        result = await self.resumes.update_one(query, {'$set': dict(values, updated_at=now), '$inc': {'version': 1}})
+        if result.matched_count == 0:
+            doc = await self.resumes.find_one(self._owned(resume_id, user_id), ['version'])
+            if doc is None:
+                return None
+            raise ResumeConflict(doc.get('version') or 0)
+        return _patch_result(resume_id, version + 1, now.isoformat(), changed)
+
+    async def delete_resume(self, resume_id, user_id):
+        query = self._owned(resume_id, user_id)
+        if query is None:
+            return False
+        result = await self.resumes.delete_one(query)
+        return result.deleted_count == 1
+
+    # ---- jobs ----
+    async def list_jobs(self):
+        return [self._job_dict(doc) async for doc in self.jobs.find()]
+
+    async def get_job(self, job_id):
+        oid = _object_id(job_id)
+        doc = await self.jobs.find_one({'_id': oid}) if oid else None
+        return self._job_dict(doc) if doc else None
+
+    # ---- diagnostics ----
+    async def counts(self):
+        users, resumes, jobs, resets = await asyncio.gather(
+            self.users.estimated_document_count(),
+            self.resumes.estimated_document_count(),
+            self.jobs.estimated_document_count(),
+            self.password_resets.estimated_document_count()
+        )
+        return {'users': users, 'resumes': resumes, 'jobs': jobs, 'password_resets': resets}
+
+    async def close(self):
+        self.client.close()
+
+
+def create_async_storage(storage):
+    """Motor for MongoDB when it is installed, otherwise an ExecutorStorage around `storage`"""
+    if storage.name == 'mongodb':
+        try:
+            return MotorStorage(os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/smart_resume'))
+        except ImportError:
+            print("⚠️ motor is not installed; MongoDB calls will run on a thread pool")
+    return ExecutorStorage(storage)
@@ -0,0 +1,6 @@
+"""
+Benchmark suite for Smart Resume
+
+Run modules from the repository root, e.g.:
+    python -m benchmarks.storage_bench
+"""
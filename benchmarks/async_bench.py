@@ -0,0 +1,232 @@
+"""
+Concurrency benchmark - async API versus the threaded WSGI app
+
+    python -m benchmarks.async_bench [--concurrency 50,200,1000] [--duration 10]
+                                     [--db-latency-ms 20] [--threads 4] [--output async.json]
+
+Runs one server process per variant, both on the in-memory engine with
+--db-latency-ms added to every storage call to stand in for a MongoDB
+round trip:
+
+    threaded  simple_app under gunicorn, 1 gthread worker with --threads
+              threads (werkzeug's thread-per-request server if gunicorn is
+              missing); the latency is a blocking sleep that holds a thread
+    async     async_api under aiohttp, one event loop; the latency is an
+              asyncio sleep, as with Motor
+
+At each concurrency level that many clients, each with its own
+keep-alive connection, request /api/jobs, /api/resumes and
+/api/user/profile for --duration seconds, sharing one logged-in session.
+Reports throughput, p50/p95/p99 and errors (timeouts, refused
+connections) per variant and level, plus each server's peak RSS.
+"""
+import argparse
+import asyncio
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.harness import summarize, print_table, write_report, environment
+
+PATHS = [('list_jobs', '/api/jobs'), ('list_jobs', '/api/jobs'),
+         ('list_resumes', '/api/resumes'), ('profile', '/api/user/profile')]
+
+
+# ---- server side (runs in the subprocess) ----
+
+def add_sync_latency(storage, seconds):
+    from async_storage import ASYNC_METHODS
+    for name in ASYNC_METHODS:
+        fn = getattr(storage, name)
+
+        def slow(*args, _fn=fn):
+            time.sleep(seconds)
+            return _fn(*args)
+        setattr(storage, name, slow)
+
+
+def add_async_latency(storage, seconds):
+    from async_storage import ASYNC_METHODS
+    for name in ASYNC_METHODS:
+        fn = getattr(storage, name)
+
+        async def slow(*args, _fn=fn):
+            await asyncio.sleep(seconds)
+            return await _fn(*args)
+        setattr(storage, name, slow)
+
+
+def serve(variant, port, latency, threads):
+    os.environ.update(STORAGE_BACKEND='memory', LOG_LEVEL='WARNING', SELF_CHECK='0')
+    if variant == 'async':
+        from aiohttp import web
+        import async_api
+        app = async_api.create_app()
+        add_async_latency(app[async_api.STORAGE], latency)
+        web.run_app(app, host='127.0.0.1', port=port, print=None, access_log=None)
+        return
+
+    import simple_app
+    add_sync_latency(simple_app.storage, latency)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        from werkzeug.serving import run_simple
+        run_simple('127.0.0.1', port, simple_app.app, threaded=True)
+        return
+
+    class Server(BaseApplication):
+        def load_config(self):
+            for key, value in {'bind': f'127.0.0.1:{port}', 'workers': 1, 'threads': threads,
+                               'worker_class': 'gthread', 'keepalive': 5, 'timeout': 120,
+                               'worker_connections': 10000, 'loglevel': 'warning'}.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return simple_app.app
+
+    Server().run()
+
+
+# ---- client side ----
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(variant, latency_ms, threads):
+    import requests
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.async_bench', '--serve', variant, '--port', str(port),
+         '--db-latency-ms', str(latency_ms), '--threads', str(threads)],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    base_url = f'http://127.0.0.1:{port}'
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{variant} server exited with status {process.returncode}')
+        try:
+            requests.get(base_url + '/api/jobs', timeout=1)
+            return process, base_url
+        except requests.RequestException:
+            time.sleep(0.2)
+    os.killpg(process.pid, signal.SIGKILL)
+    raise RuntimeError(f'{variant} server did not start within 30s')
+
+
+def server_peak_rss_mb(pid):
+    """VmHWM of the server process (Linux only)"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    return None
+
+
+async def run_level(base_url, cookies, concurrency, duration, timeout):
+    import aiohttp
+    latencies, errors = {}, {}
+    deadline = time.monotonic() + duration
+
+    async def client(index):
+        rng = random.Random(index)
+        # One connection per client, like separate browsers
+        connector = aiohttp.TCPConnector(limit=1, force_close=False)
+        async with aiohttp.ClientSession(connector=connector, cookies=cookies,
+                                         timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+            while time.monotonic() < deadline:
+                name, path = rng.choice(PATHS)
+                started = time.perf_counter()
+                try:
+                    async with session.get(base_url + path) as response:
+                        await response.read()
+                        ok = response.status < 400
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    ok = False
+                latencies.setdefault(name, []).append(time.perf_counter() - started)
+                if not ok:
+                    errors[name] = errors.get(name, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    everything = [value for values in latencies.values() for value in values]
+    operations = {name: summarize(values, elapsed) for name, values in sorted(latencies.items())}
+    operations['all'] = summarize(everything, elapsed)
+    return {'operations': operations, 'errors': errors}
+
+
+def login_cookies(base_url):
+    import requests
+    session = requests.Session()
+    response = session.post(base_url + '/api/auth/login',
+                            json={'email': 'async-bench@example.com', 'password': 'benchmark123'})
+    response.raise_for_status()
+    session.post(base_url + '/api/resumes', json={'full_name': 'Async Bench', 'skills': 'Python'})
+    return session.cookies.get_dict()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the async API with the threaded app under concurrency')
+    parser.add_argument('--variants', default='threaded,async')
+    parser.add_argument('--concurrency', default='50,200,1000', help='comma-separated client counts')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per level')
+    parser.add_argument('--db-latency-ms', type=float, default=20, help='simulated latency per storage call')
+    parser.add_argument('--threads', type=int, default=4, help='threads of the gthread worker')
+    parser.add_argument('--timeout', type=float, default=30, help='client timeout per request')
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--serve', choices=('threaded', 'async'), help=argparse.SUPPRESS)
+    parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port, args.db_latency_ms / 1000.0, args.threads)
+        return
+
+    levels = [int(level) for level in args.concurrency.split(',') if level]
+    report = {
+        'benchmark': 'async',
+        'environment': environment(),
+        'params': {'concurrency': levels, 'duration': args.duration, 'db_latency_ms': args.db_latency_ms,
+                   'threads': args.threads},
+        'variants': {}
+    }
+    summary = []
+    for variant in [v for v in args.variants.split(',') if v]:
+        process, base_url = start_server(variant, args.db_latency_ms, args.threads)
+        try:
+            cookies = login_cookies(base_url)
+            results = {}
+            for level in levels:
+                result = asyncio.run(run_level(base_url, cookies, level, args.duration, args.timeout))
+                results[str(level)] = result
+                print_table(f"{variant}: {level} concurrent clients", result['operations'])
+                if result['errors']:
+                    print(f"⚠️ Errors: {result['errors']}")
+                summary.append((variant, level, result['operations']['all']))
+            report['variants'][variant] = {'levels': results, 'server_peak_rss_mb': server_peak_rss_mb(process.pid)}
+        finally:
+            os.killpg(process.pid, signal.SIGTERM)
+            process.wait(timeout=15)
+
+    print(f"\n{'variant':<10}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for variant, level, row in summary:
+        print(f"{variant:<10}{level:>8}{row['ops_per_sec']:>10}{row['p50_ms']:>10}{row['p99_ms']:>10}")
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Autosave benchmark - database writes with and without write-behind
+
+    python -m benchmarks.autosave_bench [--users 50] [--interval 0.2] [--duration 10]
+                                        [--window 2] [--mongo mongodb://localhost:27017/smart_resume_bench]
+                                        [--output autosave.json]
+
+Every user has an editor open that PATCHes its resume's summary every
+--interval seconds for --duration seconds. The same schedule runs against
+the SQLite engine (and MongoDB with --mongo or MONGODB_BENCH_URI; use a
+throwaway database) twice:
+
+    direct        storage.patch_resume() per autosave
+    write-behind  write_behind.WriteBehindBuffer with --window
+
+Reports PATCH latency, resume rows written and write round trips to the
+database, and checks that each autosave is visible to an immediate re-read
+(read-your-writes) and that the final text of every resume reached the
+database after close() (lost edits).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from benchmarks.harness import summarize, write_report, environment
+from benchmarks.storage_bench import sqlite_storage, mongo_storage, PASSWORD_HASH, RESUME_TEMPLATE
+import write_behind
+
+
+class WriteCounter:
+    """Counts rows and round trips of the engine's resume write methods"""
+
+    def __init__(self, storage):
+        self.rows = 0
+        self.round_trips = 0
+        patch, bulk = storage.patch_resume, storage.bulk_patch_resumes
+
+        def patch_resume(*args):
+            result = patch(*args)
+            self.round_trips += 1
+            self.rows += bool(result and result['changed'])
+            return result
+
+        def bulk_patch_resumes(writes):
+            self.round_trips += 1
+            self.rows += len(writes)
+            return bulk(writes)
+
+        storage.patch_resume, storage.bulk_patch_resumes = patch_resume, bulk_patch_resumes
+
+
+def run(storage, mode, args):
+    user_ids = [storage.create_user(f'User {i}', f'{mode}{i}@autosave.example.com', PASSWORD_HASH)['id']
+                for i in range(args.users)]
+    resumes = [(storage.create_resume(user_id, RESUME_TEMPLATE)['id'], user_id) for user_id in user_ids]
+    counter = WriteCounter(storage)
+    target = write_behind.WriteBehindBuffer(storage, args.window) if mode == 'write-behind' else storage
+
+    latencies, stale_reads, revision = [], 0, 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.duration:
+        tick = time.perf_counter()
+        revision += 1
+        for resume_id, user_id in resumes:
+            summary = f'Draft {revision}: ' + RESUME_TEMPLATE['summary']
+            call_started = time.perf_counter()
+            target.patch_resume(resume_id, user_id, {'summary': summary})
+            latencies.append(time.perf_counter() - call_started)
+            stale_reads += target.get_resume(resume_id, user_id)['summary'] != summary
+        time.sleep(max(0.0, args.interval - (time.perf_counter() - tick)))
+    if target is not storage:
+        target.close()
+
+    final = f'Draft {revision}: ' + RESUME_TEMPLATE['summary']
+    lost = sum(storage.get_resume(resume_id, user_id)['summary'] != final for resume_id, user_id in resumes)
+    return {'patch': summarize(latencies), 'autosaves': len(latencies), 'rows_written': counter.rows,
+            'round_trips': counter.round_trips, 'stale_reads': stale_reads, 'lost_edits': lost}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare autosave write volume with and without write-behind')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--interval', type=float, default=0.2, help='seconds between autosaves per editor')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--window', type=float, default=write_behind.WINDOW, help='write-behind window in seconds')
+    parser.add_argument('--mongo', default=os.environ.get('MONGODB_BENCH_URI'),
+                        help='MongoDB URI of a throwaway benchmark database')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    engines = {'sqlite': sqlite_storage}
+    if args.mongo:
+        engines['mongodb'] = lambda: mongo_storage(args.mongo)
+
+    report = {'benchmark': 'autosave', 'environment': environment(),
+              'params': {'users': args.users, 'interval': args.interval, 'duration': args.duration,
+                         'window': args.window}, 'engines': {}}
+    print(f"{'engine':<9}{'mode':<14}{'autosaves':>10}{'rows':>8}{'trips':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'stale':>7}{'lost':>6}")
+    for name, factory in engines.items():
+        results = {}
+        for mode in ('direct', 'write-behind'):
+            storage, cleanup = factory()
+            try:
+                results[mode] = row = run(storage, mode, args)
+            finally:
+                cleanup()
+            print(f"{name:<9}{mode:<14}{row['autosaves']:>10}{row['rows_written']:>8}{row['round_trips']:>8}"
+                  f"{row['patch']['p50_ms']:>9.3f}{row['patch']['p99_ms']:>9.3f}{row['stale_reads']:>7}"
+                  f"{row['lost_edits']:>6}")
+        direct, buffered = results['direct'], results['write-behind']
+        results['rows_reduction'] = round(direct['rows_written'] / max(buffered['rows_written'], 1), 1)
+        results['round_trip_reduction'] = round(direct['round_trips'] / max(buffered['round_trips'], 1), 1)
+        print(f"   {name}: {results['rows_reduction']}x fewer rows written, "
+              f"{results['round_trip_reduction']}x fewer round trips")
+        report['engines'][name] = results
+
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
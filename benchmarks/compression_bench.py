@@ -0,0 +1,111 @@
+"""
+Compression benchmark - bytes saved and CPU cost per route
+
+    python -m benchmarks.compression_bench [--jobs 10000] [--resumes 50] [--repeat 50]
+                                           [--output compression.json]
+
+Loads simple_app on the in-memory engine with --jobs jobs and one user
+with --resumes resumes, then requests each route --repeat times through
+the Flask test client per Accept-Encoding (none, gzip, br):
+
+    get_jobs       GET /api/jobs                  precompressed per catalogue version
+    print_resume   GET /api/resumes/<id>/print    precompressed per resume version
+    get_resumes    GET /api/resumes               compressed on every request
+
+Reports request latency, bytes sent, the saving against the identity
+body and the compression CPU time per request (from the
+http_compression_cpu_seconds_total metric). Precompressed routes pay their
+CPU on the first request only; the `cold` column is that first request.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.update(STORAGE_BACKEND='memory', LOG_LEVEL='WARNING')
+
+from benchmarks.harness import summarize, write_report, environment
+
+ENCODINGS = {'identity': None, 'gzip': 'gzip', 'br': 'br'}
+SKILLS = ['Python', 'JavaScript', 'React', 'Flask', 'MongoDB', 'Docker', 'AWS', 'SQL']
+RESUME = {
+    'full_name': 'Compression Bench',
+    'email': 'bench@example.com',
+    'summary': 'Experienced software developer. ' * 5,
+    'education': 'BSc Computer Science\nUniversity of Technology\n2018 - 2022',
+    'experience': 'Software Developer at Tech Corp\n- Built things\n' * 5,
+    'projects': 'Smart Resume Builder\n- Flask, MongoDB\n' * 3,
+    'skills': 'Python, JavaScript, React, Flask, MongoDB, Docker, AWS',
+    'skill_ratings': {'Python': 8, 'JavaScript': 7, 'React': 7}
+}
+
+
+def cpu_seconds(counter, endpoint, encoding):
+    return counter._collect().get((endpoint, encoding), 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure response compression per route and encoding')
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--resumes', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    import compression
+    from simple_app import app, storage
+
+    for i in range(args.jobs):
+        storage.create_job({'job_title': f'Engineer {i}', 'company': f'Company {i % 500}',
+                            'required_skills': SKILLS[i % 5:i % 5 + 4]})
+    client = app.test_client()
+    credentials = {'email': 'compression-bench@example.com', 'password': 'benchmark123'}
+    client.post('/api/auth/register', json=dict(credentials, name='Compression Bench'))
+    client.post('/api/auth/login', json=credentials)
+    resume_ids = [client.post('/api/resumes', json=dict(RESUME, full_name=f'Bench {i}')).get_json()['resume_id']
+                  for i in range(args.resumes)]
+    routes = {
+        'get_jobs': '/api/jobs',
+        'print_resume': f'/api/resumes/{resume_ids[0]}/print',
+        'get_resumes': '/api/resumes'
+    }
+
+    report = {'benchmark': 'compression', 'environment': environment(),
+              'params': {'jobs': args.jobs, 'resumes': args.resumes, 'repeat': args.repeat,
+                         'brotli': compression.brotli is not None}, 'routes': {}}
+    print(f"{'route':<14}{'encoding':<10}{'cold ms':>9}{'p50 ms':>9}{'bytes':>10}{'saved':>8}{'cpu ms/req':>12}")
+    for route, path in routes.items():
+        identity_size = None
+        results = {}
+        for name, coding in ENCODINGS.items():
+            if coding == 'br' and compression.brotli is None:
+                continue
+            compression.precompressed.clear()
+            headers = {'Accept-Encoding': coding} if coding else {}
+            cpu_before = cpu_seconds(compression.compression_cpu, route, coding)
+            latencies, size = [], 0
+            for _ in range(args.repeat + 1):
+                started = time.perf_counter()
+                response = client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                size = len(response.data)
+            cpu = cpu_seconds(compression.compression_cpu, route, coding) - cpu_before
+            identity_size = identity_size or size
+            results[name] = {
+                'cold_ms': round(latencies[0] * 1000, 3),
+                'latency': summarize(latencies[1:]),
+                'bytes': size,
+                'saved_pct': round(100 * (1 - size / identity_size), 1),
+                'cpu_ms_per_request': round(cpu / (args.repeat + 1) * 1000, 3)
+            }
+            row = results[name]
+            print(f"{route:<14}{name:<10}{row['cold_ms']:>9}{row['latency']['p50_ms']:>9.3f}{size:>10}"
+                  f"{row['saved_pct']:>7}%{row['cpu_ms_per_request']:>12}")
+        report['routes'][route] = results
+
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Conditional GET benchmark - polling with and without If-None-Match
+
+    python -m benchmarks.conditional_bench [--jobs 10000] [--resumes 50] [--repeat 200]
+                                           [--backend memory] [--output conditional.json]
+
+Loads simple_app on --backend (memory or sqlite) with --jobs jobs and one
+user with --resumes resumes, then polls each route --repeat times through
+the Flask test client, first unconditionally and then revalidating with
+the ETag from the previous response (what a polling dashboard does):
+
+    get_resumes       GET /api/resumes
+    get_resume        GET /api/resumes/<id>
+    get_jobs          GET /api/jobs
+    get_user_profile  GET /api/user/profile
+
+Reports latency and bytes sent per poll; a 304 sends no body.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import summarize, print_table, write_report, environment
+
+SKILLS = ['Python', 'JavaScript', 'React', 'Flask', 'MongoDB', 'Docker', 'AWS', 'SQL']
+RESUME = {
+    'full_name': 'Conditional Bench',
+    'email': 'bench@example.com',
+    'summary': 'Experienced software developer. ' * 5,
+    'experience': 'Software Developer at Tech Corp\n- Built things\n' * 5,
+    'skills': 'Python, JavaScript, React, Flask, MongoDB, Docker, AWS',
+    'skill_ratings': {'Python': 8, 'JavaScript': 7, 'React': 7}
+}
+
+
+def poll(client, path, repeat, conditional):
+    latencies, sent, statuses = [], 0, set()
+    etag = client.get(path).headers.get('ETag')
+    for _ in range(repeat):
+        headers = {'If-None-Match': etag} if conditional and etag else {}
+        started = time.perf_counter()
+        response = client.get(path, headers=headers)
+        latencies.append(time.perf_counter() - started)
+        sent += len(response.data)
+        statuses.add(response.status_code)
+    return latencies, sent // repeat, sorted(statuses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare unconditional and revalidating polls per route')
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--resumes', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--backend', choices=['memory', 'sqlite'], default='memory')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    tmpdir = tempfile.TemporaryDirectory()
+    os.environ.update(STORAGE_BACKEND=args.backend, LOG_LEVEL='WARNING',
+                      SQLITE_PATH=os.path.join(tmpdir.name, 'conditional_bench.db'))
+    from simple_app import app, storage
+
+    for i in range(args.jobs):
+        storage.create_job({'job_title': f'Engineer {i}', 'company': f'Company {i % 500}',
+                            'required_skills': SKILLS[i % 5:i % 5 + 4]})
+    client = app.test_client()
+    credentials = {'email': 'conditional-bench@example.com', 'password': 'benchmark123'}
+    client.post('/api/auth/register', json=dict(credentials, name='Conditional Bench'))
+    client.post('/api/auth/login', json=credentials)
+    resume_ids = [client.post('/api/resumes', json=dict(RESUME, full_name=f'Bench {i}')).get_json()['resume_id']
+                  for i in range(args.resumes)]
+    routes = {
+        'get_resumes': '/api/resumes',
+        'get_resume': f'/api/resumes/{resume_ids[0]}',
+        'get_jobs': '/api/jobs',
+        'get_user_profile': '/api/user/profile'
+    }
+
+    report = {'benchmark': 'conditional', 'environment': environment(),
+              'params': {'jobs': args.jobs, 'resumes': args.resumes, 'repeat': args.repeat,
+                         'backend': args.backend}, 'routes': {}}
+    for route, path in routes.items():
+        results, sizes = {}, {}
+        for name, conditional in (('unconditional', False), ('if-none-match', True)):
+            latencies, size, statuses = poll(client, path, args.repeat, conditional)
+            results[name] = summarize(latencies)
+            sizes[name] = {'bytes_per_poll': size, 'statuses': statuses}
+        report['routes'][route] = {'latency': results, 'bytes': sizes}
+        print_table(f'{route}: GET {path}', results)
+        print('   bytes/poll: ' + ', '.join(f"{name} {info['bytes_per_poll']} ({info['statuses']})"
+                                          for name, info in sizes.items()))
+
+    write_report(args.output, report)
+    tmpdir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Shared benchmark helpers: timing, latency percentiles and JSON reports
+"""
+import json
+import math
+import os
+import platform
+import resource
+import sys
+import time
+from datetime import datetime
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+def summarize(latencies, elapsed=None):
+    """Summarize latencies (seconds) as milliseconds plus throughput"""
+    values = sorted(latencies)
+    total = elapsed if elapsed is not None else sum(values)
+    return {
+        'count': len(values),
+        'ops_per_sec': round(len(values) / total, 1) if total else 0.0,
+        'mean_ms': round(sum(values) / len(values) * 1000, 4) if values else 0.0,
+        'p50_ms': round(percentile(values, 50) * 1000, 4),
+        'p95_ms': round(percentile(values, 95) * 1000, 4),
+        'p99_ms': round(percentile(values, 99) * 1000, 4),
+        'max_ms': round(values[-1] * 1000, 4) if values else 0.0
+    }
+
+
+def time_calls(fn, args_list):
+    """Call fn(*args) for each args tuple; returns (latencies, elapsed)"""
+    latencies = []
+    perf_counter = time.perf_counter
+    started = perf_counter()
+    for args in args_list:
+        t0 = perf_counter()
+        fn(*args)
+        latencies.append(perf_counter() - t0)
+    return latencies, perf_counter() - started
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux, bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'timestamp': datetime.utcnow().isoformat()
+    }
+
+
+def print_table(title, rows):
+    """Print {name: summary} rows as a fixed-width table"""
+    print(f"\n{title}")
+    print(f"{'operation':<28}{'count':>8}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, row in rows.items():
+        print(f"{name:<28}{row['count']:>8}{row['ops_per_sec']:>12}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}")
+
+
+def write_report(path, report):
+    if not path:
+        return
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\n📄 Results written to {path}")
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(current, baseline, tolerance=0.2, min_count=20, latency='p95_ms'):
+    """Compare {operation: summary} rows against a baseline.
+
+    Flags an operation when its `latency` percentile grew, or its
+    throughput dropped, by more than `tolerance` (0.2 = 20%). Operations
+    with fewer than `min_count` samples on either side are too noisy to
+    judge and are skipped. Returns a list of human-readable regressions
+    (empty when everything is within bounds).
+    """
+    regressions = []
+    label = latency.split('_')[0]
+    for name, row in current.items():
+        base = baseline.get(name)
+        if not base or min(base.get('count', 0), row['count']) < min_count:
+            continue
+        if base[latency] and row[latency] > base[latency] * (1 + tolerance):
+            regressions.append(f"{name}: {label} {row[latency]} ms vs baseline {base[latency]} ms")
+        if base['ops_per_sec'] and row['ops_per_sec'] < base['ops_per_sec'] * (1 - tolerance):
+            regressions.append(f"{name}: {row['ops_per_sec']} ops/s vs baseline {base['ops_per_sec']} ops/s")
+    return regressions
@@ -0,0 +1,184 @@
+"""
+Resume history benchmark - storage and latency for long edit histories
+
+    python -m benchmarks.history_bench [--edits 5000] [--resumes 3] [--snapshot-every 10,50,200]
+                                       [--reads 300] [--mongo mongodb://localhost:27017/smart_resume_bench]
+                                       [--output history.json]
+
+Each of --resumes resumes receives --edits autosaves, every one a word
+typed, deleted or replaced somewhere in summary, education, experience,
+projects or skills. They run through resume_history.ResumeHistory on the
+in-memory and SQLite engines (and MongoDB with --mongo or
+MONGODB_BENCH_URI; use a throwaway database), once per snapshot interval,
+and once on the plain engine for comparison. Reports:
+
+    patch     patch_resume() latency with history recording, and without
+    storage   history bytes per resume against keeping a full copy of the
+              five sections per edit (raw, and zlib-compressed each)
+    rebuild   texts_at() latency for --reads random revisions, and for the
+              worst case: the revision just before a snapshot
+
+Every rebuilt revision is checked against the text that was saved.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from benchmarks.harness import summarize, write_report, environment
+from benchmarks.storage_bench import sqlite_storage, mongo_storage, PASSWORD_HASH, RESUME_TEMPLATE
+from storage import InMemoryStorage
+import json_provider
+from resume_history import HISTORY_FIELDS, ResumeHistory, history_texts
+
+WORDS = ('Python', 'Flask', 'led', 'built', 'designed', 'scalable', 'services', 'team', 'migrated',
+         'reduced', 'latency', 'by', '40%', 'customers', 'platform', 'data', 'pipeline', 'and')
+# Roughly where editing time goes on a real resume
+FIELD_WEIGHTS = {'summary': 3, 'education': 1, 'experience': 5, 'projects': 2, 'skills': 1}
+MAX_SUMMARY = 1000  # models.Resume.summary max_length
+
+
+def starting_resume():
+    resume = dict(RESUME_TEMPLATE)
+    resume['experience'] = ('Senior Software Developer | Tech Solutions Inc. | 2022 - Present\n'
+                            '- Led development of microservices architecture serving 1M+ users\n'
+                            '- Mentored junior developers and conducted code reviews\n') * 15
+    resume['projects'] = RESUME_TEMPLATE['projects'] * 6
+    return resume
+
+
+def edit(rng, texts):
+    """(field, new text): one word typed, deleted or replaced in a random spot"""
+    field = rng.choices(list(FIELD_WEIGHTS), weights=list(FIELD_WEIGHTS.values()))[0]
+    text = texts[field]
+    spaces = [i for i, char in enumerate(text) if char == ' '] or [len(text)]
+    at = rng.choice(spaces)
+    action = rng.random()
+    if action < 0.5 and not (field == 'summary' and len(text) > MAX_SUMMARY - 20):
+        return field, f'{text[:at]} {rng.choice(WORDS)}{text[at:]}'
+    end = text.find(' ', at + 1)
+    end = len(text) if end < 0 else end
+    if action < 0.8 and end - at > 1:
+        return field, text[:at] + text[end:]
+    return field, f'{text[:at]} {rng.choice(WORDS)}-{rng.randrange(100)}{text[end:]}'
+
+
+def run_edits(storage, args, seed=1):
+    """Apply --edits autosaves to each resume; returns (latencies, [(resume_id, [texts per seq])]).
+    The same seed gives every run the same edits."""
+    user_id = storage.create_user('History Bench', f'history-{seed}@example.com', PASSWORD_HASH)['id']
+    rng = random.Random(seed)
+    latencies, resumes = [], []
+    for _ in range(args.resumes):
+        resume = storage.create_resume(user_id, starting_resume())
+        texts = history_texts(resume)
+        revisions = [texts]
+        for _ in range(args.edits):
+            field, text = edit(rng, texts)
+            while text == texts[field]:  # A word replaced by itself saves nothing
+                field, text = edit(rng, texts)
+            started = time.perf_counter()
+            storage.patch_resume(resume['id'], user_id, {field: text})
+            latencies.append(time.perf_counter() - started)
+            texts = dict(texts, **{field: text})
+            revisions.append(texts)
+        resumes.append((resume['id'], revisions))
+    return latencies, resumes
+
+
+def full_copy_bytes(revisions):
+    raw = sum(len(text.encode('utf-8')) for texts in revisions for text in texts.values())
+    compressed = sum(len(zlib.compress(json_provider.dumps(texts))) for texts in revisions)
+    return raw, compressed
+
+
+def run(factory, snapshot_every, args):
+    storage, cleanup = factory()
+    try:
+        history = ResumeHistory(storage, snapshot_every=snapshot_every)
+        latencies, resumes = run_edits(history, args)
+
+        rng = random.Random(snapshot_every)
+        history_bytes = raw_bytes = compressed_bytes = 0
+        random_reads, worst_reads, mismatches = [], [], 0
+        for resume_id, revisions in resumes:
+            history_bytes += sum(revision['size'] for revision in history.revisions(resume_id))
+            raw, compressed = full_copy_bytes(revisions)
+            raw_bytes, compressed_bytes = raw_bytes + raw, compressed_bytes + compressed
+
+            last = len(revisions) - 1
+            worst = [seq for seq in range(snapshot_every - 1, last + 1, snapshot_every)] or [last]
+            for seqs, latencies_out in (([rng.randint(0, last) for _ in range(args.reads)], random_reads),
+                                        ((rng.choice(worst) for _ in range(args.reads)), worst_reads)):
+                for seq in seqs:
+                    started = time.perf_counter()
+                    texts = history.texts_at(resume_id, seq)
+                    latencies_out.append(time.perf_counter() - started)
+                    mismatches += texts != revisions[seq]
+        count = len(resumes)
+        return {
+            'patch': summarize(latencies),
+            'history_bytes_per_resume': history_bytes // count,
+            'full_copy_bytes_per_resume': raw_bytes // count,
+            'full_copy_compressed_bytes_per_resume': compressed_bytes // count,
+            'rebuild_random': summarize(random_reads),
+            'rebuild_worst': summarize(worst_reads),
+            'mismatches': mismatches
+        }
+    finally:
+        cleanup()
+
+
+def run_plain(factory, args):
+    storage, cleanup = factory()
+    try:
+        latencies, _ = run_edits(storage, args)
+        return {'patch': summarize(latencies)}
+    finally:
+        cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure delta-chain resume history on long edit histories')
+    parser.add_argument('--edits', type=int, default=5000, help='autosaves per resume')
+    parser.add_argument('--resumes', type=int, default=3)
+    parser.add_argument('--snapshot-every', default='10,50,200', help='comma-separated snapshot intervals')
+    parser.add_argument('--reads', type=int, default=300, help='rebuilds per resume and case')
+    parser.add_argument('--mongo', default=os.environ.get('MONGODB_BENCH_URI'),
+                        help='MongoDB URI of a throwaway benchmark database')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+    intervals = [int(value) for value in args.snapshot_every.split(',')]
+
+    engines = {'memory': lambda: (InMemoryStorage(), lambda: None), 'sqlite': sqlite_storage}
+    if args.mongo:
+        engines['mongodb'] = lambda: mongo_storage(args.mongo)
+
+    report = {'benchmark': 'history', 'environment': environment(),
+              'params': {'edits': args.edits, 'resumes': args.resumes, 'snapshot_every': intervals,
+                         'reads': args.reads, 'fields': list(HISTORY_FIELDS)}, 'engines': {}}
+    print(f"{'engine':<9}{'snapshot':>9}{'patch p50':>11}{'p99 ms':>9}{'KB/resume':>11}{'full KB':>9}"
+          f"{'full.z KB':>11}{'rebuild p50':>13}{'worst p50':>11}{'p99 ms':>9}{'bad':>5}")
+    for name, factory in engines.items():
+        results = {'plain': run_plain(factory, args)}
+        plain = results['plain']['patch']
+        print(f"{name:<9}{'-':>9}{plain['p50_ms']:>11.3f}{plain['p99_ms']:>9.3f}{'-':>11}{'-':>9}{'-':>11}"
+              f"{'-':>13}{'-':>11}{'-':>9}{'-':>5}")
+        for interval in intervals:
+            results[f'snapshot_every_{interval}'] = row = run(factory, interval, args)
+            print(f"{name:<9}{interval:>9}{row['patch']['p50_ms']:>11.3f}{row['patch']['p99_ms']:>9.3f}"
+                  f"{row['history_bytes_per_resume'] / 1024:>11.1f}{row['full_copy_bytes_per_resume'] / 1024:>9.0f}"
+                  f"{row['full_copy_compressed_bytes_per_resume'] / 1024:>11.0f}{row['rebuild_random']['p50_ms']:>13.3f}"
+                  f"{row['rebuild_worst']['p50_ms']:>11.3f}{row['rebuild_worst']['p99_ms']:>9.3f}{row['mismatches']:>5}")
+        report['engines'][name] = results
+
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Bulk import benchmark - streamed against buffered parsing of large bodies
+
+    python -m benchmarks.import_bench [--mb 100] [--output import.json]
+
+Writes a job catalogue of about --mb megabytes to a temporary directory, as
+NDJSON and as one JSON array, and imports it into a fresh SQLite database
+in a separate process per mode, so each gets its own peak RSS:
+
+    buffered   what a request.get_json() handler does: the whole body read,
+               then parsed into one list, then stored in batches
+    ndjson     POST /api/jobs/import, application/x-ndjson
+    array      POST /api/jobs/import, application/json
+
+The streamed modes post the file through the Flask test client as an input
+stream, so the body is never in memory on the client side either. Reports
+the import time, jobs per second and the growth of peak RSS during the
+import (ru_maxrss), which for the streamed modes should not depend on --mb.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from benchmarks.harness import write_report, environment
+
+SKILLS = ['Python', 'JavaScript', 'React', 'Flask', 'MongoDB', 'Docker', 'AWS', 'SQL', 'Kubernetes', 'Go']
+MODES = ('buffered', 'ndjson', 'array')
+
+
+def job(i):
+    return {'job_title': f'Software Engineer {i}', 'company': f'Company {i % 5000} Holdings',
+            'required_skills': [SKILLS[(i + k) % len(SKILLS)] for k in range(4)],
+            'description': 'Build and run services for a growing product team. ' * 2}
+
+
+def write_files(directory, megabytes):
+    """NDJSON and JSON-array files of about `megabytes` MB; returns (paths, jobs)"""
+    target = megabytes * 1024 * 1024
+    ndjson, array = os.path.join(directory, 'jobs.ndjson'), os.path.join(directory, 'jobs.json')
+    count = size = 0
+    with open(ndjson, 'wb') as lines, open(array, 'wb') as items:
+        items.write(b'[')
+        while size < target:
+            encoded = json.dumps(job(count)).encode()
+            lines.write(encoded + b'\n')
+            items.write((b',\n' if count else b'\n') + encoded)
+            size += len(encoded) + 1
+            count += 1
+        items.write(b'\n]')
+    return {'buffered': array, 'ndjson': ndjson, 'array': array}, count
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+# ---- one import (runs in the subprocess) ----
+def worker(mode, path, database):
+    os.environ.update(STORAGE_BACKEND='sqlite', SQLITE_PATH=database, UPLOAD_FOLDER=os.path.dirname(database))
+    import json_provider
+    import streaming
+    from simple_app import app, storage
+
+    client = app.test_client()
+    client.post('/api/auth/register', json={'email': 'import@bench.example.com', 'password': 'bench-password',
+                                             'name': 'Import Bench'})
+    client.post('/api/auth/login', json={'email': 'import@bench.example.com', 'password': 'bench-password'})
+    size = os.path.getsize(path)
+    before = peak_rss_bytes()
+    started = time.perf_counter()
+    if mode == 'buffered':
+        with open(path, 'rb') as f:
+            records = json_provider.loads(f.read())
+        added = 0
+        for batch in streaming.batched(records, streaming.IMPORT_BATCH):
+            added += storage.seed_jobs([{'job_title': record['job_title'], 'company': record['company'],
+                                         'required_skills': record['required_skills']} for record in batch])
+        received = len(records)
+    else:
+        mimetype = 'application/x-ndjson' if mode == 'ndjson' else 'application/json'
+        with open(path, 'rb') as f:
+            response = client.post('/api/jobs/import', input_stream=f, content_length=size, content_type=mimetype)
+        if response.status_code != 200:
+            raise SystemExit(f'{mode}: {response.status_code} {response.get_data(as_text=True)}')
+        received, added = response.json['received'], response.json['added']
+    elapsed = time.perf_counter() - started
+    print(json.dumps({'elapsed_s': round(elapsed, 2), 'received': received, 'added': added,
+                      'body_bytes': size, 'peak_rss_growth_bytes': peak_rss_bytes() - before}))
+
+
+def run(mode, path, directory):
+    database = os.path.join(directory, f'{mode}.db')
+    output = subprocess.run([sys.executable, '-m', 'benchmarks.import_bench', '--worker', mode, path, database],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database + suffix):
+            os.unlink(database + suffix)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure streamed against buffered bulk imports')
+    parser.add_argument('--mb', type=int, default=100, help='size of the generated import')
+    parser.add_argument('--modes', default=','.join(MODES))
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--worker', nargs=3, metavar=('MODE', 'FILE', 'DATABASE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        worker(*args.worker)
+        return
+
+    directory = tempfile.mkdtemp(prefix='import_bench_')
+    try:
+        paths, count = write_files(directory, args.mb)
+        print(f'{count} jobs, {os.path.getsize(paths["ndjson"]) / 1024 / 1024:.0f} MB')
+        print(f"{'mode':<10}{'seconds':>9}{'jobs/s':>10}{'added':>9}{'peak RSS growth MB':>20}")
+        results = {}
+        for mode in args.modes.split(','):
+            results[mode] = row = run(mode, paths[mode], directory)
+            print(f"{mode:<10}{row['elapsed_s']:>9.2f}{row['received'] / row['elapsed_s']:>10.0f}{row['added']:>9}"
+                  f"{row['peak_rss_growth_bytes'] / 1024 / 1024:>20.1f}")
+        report = {'benchmark': 'import', 'environment': environment(),
+                  'params': {'mb': args.mb, 'jobs': count, 'batch': 1000}, 'modes': results}
+        write_report(args.output, report)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+"""
+User-journey load test for simple_app.py
+
+    python -m benchmarks.journeys [--backend memory|sqlite|mongodb] [--mode client|server]
+                                  [--users 4] [--duration 20 | --iterations 200] [--output journeys.json]
+                                  [--baseline benchmarks/baselines/journeys-memory-client.json]
+
+Each virtual user registers, logs in and creates a resume, then runs a
+weighted mix of journeys until --duration runs out (or for --iterations
+journeys each, which replays the same seeded sequence on every run):
+
+    browse_jobs    list jobs, open one
+    edit_resume    update the resume, list resumes, load the profile
+    print_resume   render the print view
+    download_pdf   render the PDF
+    relogin        log in again
+
+--mode client drives the Flask test client in-process. --mode server runs
+simple_app under a threaded WSGI server on a local port and drives it over
+HTTP. --backend selects STORAGE_BACKEND. mongodb uses MONGODB_URI, which
+defaults to a local mongod.
+
+Results (throughput, p50/p95/p99 per operation, errors, peak RSS) can be
+written to JSON. With --baseline, operations whose --compare percentile
+(p50 by default) grew or whose throughput dropped by more than --tolerance
+are reported and the exit status is 1. --save-baseline writes the run as a
+new baseline. bcrypt and PDF rendering hold the GIL for long stretches, so
+p95/p99 swing a lot between runs of this mix; p50 is the stable gate.
+Baselines are only comparable on the machine that recorded them.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import (summarize, print_table, write_report, environment, peak_rss_mb,
+                                load_report, compare_to_baseline)
+
+JOURNEY_MIX = {
+    'browse_jobs': 50,
+    'edit_resume': 30,
+    'print_resume': 12,
+    'download_pdf': 3,
+    'relogin': 5
+}
+
+RESUME = {
+    'full_name': 'Load Test User',
+    'email': 'loadtest@example.com',
+    'phone': '+1 (555) 123-4567',
+    'summary': 'Experienced software developer. ' * 4,
+    'education': 'BSc Computer Science\nUniversity of Technology\n2018 - 2022',
+    'experience': 'Software Developer at Tech Corp\n- Built APIs\n- Led migrations\n' * 3,
+    'projects': 'Smart Resume Builder\n- Flask, MongoDB\n' * 2,
+    'skills': 'Python, JavaScript, React, Flask, MongoDB, Docker, AWS',
+    'skill_ratings': {'Python': 8, 'JavaScript': 7, 'React': 7},
+    'template_type': 'modern'
+}
+
+
+class TestClientDriver:
+    """Sends requests through Flask's test client (one cookie jar per user)"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, json=None):
+        response = self.client.open(path, method=method, json=json)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpDriver:
+    """Sends requests to a running server over a keep-alive HTTP session"""
+
+    def __init__(self, base_url):
+        import requests
+        self.base_url = base_url
+        self.session = requests.Session()
+
+    def request(self, method, path, json=None):
+        response = self.session.request(method, self.base_url + path, json=json)
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body
+
+
+class Recorder:
+    """Collects per-operation latencies and error counts from all users"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def call(self, driver, name, method, path, json=None):
+        started = time.perf_counter()
+        status, body = driver.request(method, path, json)
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.latencies.setdefault(name, []).append(elapsed)
+            if status >= 400:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        return status, body
+
+
+def virtual_user(index, driver, recorder, deadline, iterations, rng):
+    email = f'loadtest{index}-{rng.randrange(10**9)}@bench.example.com'
+    credentials = {'email': email, 'password': 'benchmark123'}
+    recorder.call(driver, 'register', 'POST', '/api/auth/register', dict(credentials, name=f'Load Test {index}'))
+    recorder.call(driver, 'login', 'POST', '/api/auth/login', credentials)
+    _, body = recorder.call(driver, 'create_resume', 'POST', '/api/resumes', RESUME)
+    resume_id = (body or {}).get('resume_id')
+    _, body = recorder.call(driver, 'list_jobs', 'GET', '/api/jobs')
+    job_ids = [job['id'] for job in (body or {}).get('jobs', [])]
+
+    journeys, weights = zip(*JOURNEY_MIX.items())
+    revision = 0
+    done = 0
+    while (done < iterations) if iterations else (time.monotonic() < deadline):
+        done += 1
+        journey = rng.choices(journeys, weights)[0]
+        if journey == 'browse_jobs':
+            recorder.call(driver, 'list_jobs', 'GET', '/api/jobs')
+            if job_ids:
+                recorder.call(driver, 'get_job', 'GET', f'/api/jobs/{rng.choice(job_ids)}')
+        elif journey == 'edit_resume' and resume_id:
+            revision += 1
+            recorder.call(driver, 'update_resume', 'PUT', f'/api/resumes/{resume_id}',
+                          {'summary': f'Revision {revision}: ' + RESUME['summary']})
+            recorder.call(driver, 'list_resumes', 'GET', '/api/resumes')
+            recorder.call(driver, 'profile', 'GET', '/api/user/profile')
+        elif journey == 'print_resume' and resume_id:
+            recorder.call(driver, 'print_resume', 'GET', f'/api/resumes/{resume_id}/print')
+        elif journey == 'download_pdf' and resume_id:
+            recorder.call(driver, 'download_pdf', 'GET', f'/api/resumes/{resume_id}/download')
+        elif journey == 'relogin':
+            recorder.call(driver, 'login', 'POST', '/api/auth/login', credentials)
+
+
+def load_app(backend):
+    """Import simple_app with the requested storage engine"""
+    os.environ['STORAGE_BACKEND'] = backend
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')  # Keep per-request log lines out of the timings
+    if backend == 'sqlite':
+        directory = tempfile.mkdtemp(prefix='journeys_')
+        os.environ['SQLITE_PATH'] = os.path.join(directory, 'bench.db')
+        os.environ['SHARED_CACHE_PATH'] = os.path.join(directory, 'cache.db')
+    import simple_app
+    return simple_app.app
+
+
+def start_server(app):
+    import logging
+    from werkzeug.serving import make_server
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # No access log line per request
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def run(backend, mode, users, duration, seed, iterations=None):
+    app = load_app(backend)
+    server = None
+    if mode == 'server':
+        server, base_url = start_server(app)
+        make_driver = lambda: HttpDriver(base_url)
+    else:
+        make_driver = lambda: TestClientDriver(app)
+
+    recorder = Recorder()
+    deadline = time.monotonic() + duration
+    threads = [
+        threading.Thread(target=virtual_user,
+                         args=(i, make_driver(), recorder, deadline, iterations, random.Random(seed + i)))
+        for i in range(users)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    if server is not None:
+        server.shutdown()
+
+    operations = {name: summarize(values, elapsed) for name, values in sorted(recorder.latencies.items())}
+    total = sum(len(values) for values in recorder.latencies.values())
+    return {
+        'operations': operations,
+        'errors': recorder.errors,
+        'total_requests': total,
+        'requests_per_sec': round(total / elapsed, 1),
+        'elapsed_s': round(elapsed, 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the main user journeys')
+    parser.add_argument('--backend', choices=('memory', 'sqlite', 'mongodb'), default='memory')
+    parser.add_argument('--mode', choices=('client', 'server'), default='client')
+    parser.add_argument('--users', type=int, default=4, help='concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=20, help='seconds to run the mix')
+    parser.add_argument('--iterations', type=int, help='journeys per user (overrides --duration)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='write JSON results to this file')
+    parser.add_argument('--baseline', help='compare against this JSON report')
+    parser.add_argument('--compare', choices=('p50', 'p95', 'p99'), default='p50',
+                        help='latency percentile checked against the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown before flagging (0.2 = 20%%)')
+    parser.add_argument('--save-baseline', help='also write the results to this baseline file')
+    args = parser.parse_args()
+
+    results = run(args.backend, args.mode, args.users, args.duration, args.seed, args.iterations)
+    report = {
+        'benchmark': 'journeys',
+        'environment': environment(),
+        'params': {'backend': args.backend, 'mode': args.mode, 'users': args.users,
+                   'duration': args.duration, 'iterations': args.iterations, 'seed': args.seed,
+                   'mix': JOURNEY_MIX},
+        'peak_rss_mb': peak_rss_mb(),
+        **results
+    }
+
+    print_table(f"Journeys: {args.backend} backend, {args.mode} mode, {args.users} users",
+                results['operations'])
+    print(f"\nTotal: {results['total_requests']} requests, {results['requests_per_sec']} req/s, "
+          f"peak RSS {report['peak_rss_mb']} MB")
+    if results['errors']:
+        print(f"⚠️ Errors: {results['errors']}")
+
+    write_report(args.output, report)
+    write_report(args.save_baseline, report)
+
+    if args.baseline:
+        baseline = load_report(args.baseline)
+        if baseline.get('params', {}) != report['params']:
+            print(f"\n⚠️ Run parameters differ from the baseline: {baseline.get('params')}")
+        regressions = compare_to_baseline(report['operations'], baseline['operations'],
+                                          args.tolerance, latency=f'{args.compare}_ms')
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"   {regression}")
+            sys.exit(1)
+        print(f"\n✅ Within {int(args.tolerance * 100)}% of {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+JSON benchmark - encoding large API responses
+
+    python -m benchmarks.json_bench [--jobs 10000] [--resumes 1000] [--repeat 20] [--output json.json]
+
+Builds the payloads of GET /api/jobs (--jobs jobs from InMemoryStorage)
+and GET /api/resumes (--resumes full resumes), then times a complete
+jsonify() call, response object included, inside simple_app's app
+context with:
+
+    flask-default  Flask's DefaultJSONProvider (stdlib json, sorted keys)
+    stdlib         json_provider.FastJSONProvider without orjson
+    orjson         json_provider.FastJSONProvider (skipped if orjson is
+                   not installed)
+
+Also reports the encoded size, so a provider that changes the output
+(e.g. sorting or escaping) is visible.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.harness import summarize, print_table, write_report, environment
+import json_provider
+from storage import InMemoryStorage
+
+RESUME = {
+    'full_name': 'Benchmark User',
+    'email': 'bench@example.com',
+    'phone': '+1 (555) 123-4567',
+    'linkedin': 'https://linkedin.com/in/bench',
+    'address': 'San Francisco, CA',
+    'summary': 'Experienced software developer. ' * 5,
+    'education': 'BSc Computer Science\nUniversity of Technology\n2018 - 2022',
+    'experience': 'Software Developer at Tech Corp\n- Built things\n' * 5,
+    'projects': 'Smart Resume Builder\n- Flask, MongoDB\n' * 3,
+    'skills': 'Python, JavaScript, React, Flask, MongoDB, Docker, AWS',
+    'skill_ratings': {'Python': 8, 'JavaScript': 7, 'React': 7},
+    'template_type': 'modern'
+}
+SKILLS = ['Python', 'JavaScript', 'React', 'Flask', 'MongoDB', 'Docker', 'AWS', 'SQL']
+
+
+def build_payloads(jobs, resumes):
+    storage = InMemoryStorage()
+    for i in range(jobs):
+        storage.create_job({'job_title': f'Engineer {i}', 'company': f'Company {i % 500}',
+                            'required_skills': SKILLS[i % 5:i % 5 + 4],
+                            'applyUrl': f'https://careers.example.com/{i}'})
+    user = storage.create_user('Bench', 'json-bench@example.com', 'hash')
+    for i in range(resumes):
+        storage.create_resume(user['id'], dict(RESUME, full_name=f'Benchmark User {i}'))
+    return {'jobs': {'jobs': storage.list_jobs()}, 'resumes': {'resumes': storage.list_resumes(user['id'])}}
+
+
+class StdlibProvider(json_provider.FastJSONProvider):
+    """FastJSONProvider with orjson switched off for its calls"""
+
+    def response(self, *args, **kwargs):
+        orjson, json_provider.orjson = json_provider.orjson, None
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            json_provider.orjson = orjson
+
+
+def providers(app):
+    variants = {'flask-default': DefaultJSONProvider(app), 'stdlib': StdlibProvider(app)}
+    if json_provider.orjson is not None:
+        variants['orjson'] = json_provider.FastJSONProvider(app)
+    return variants
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time jsonify() on large API responses per JSON provider')
+    parser.add_argument('--jobs', type=int, default=10000)
+    parser.add_argument('--resumes', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    from simple_app import app
+    payloads = build_payloads(args.jobs, args.resumes)
+    report = {'benchmark': 'json', 'environment': environment(),
+              'params': {'jobs': args.jobs, 'resumes': args.resumes, 'repeat': args.repeat,
+                         'orjson': json_provider.orjson is not None}, 'payloads': {}}
+
+    with app.app_context():
+        for payload_name, payload in payloads.items():
+            results, sizes = {}, {}
+            for name, provider in providers(app).items():
+                latencies = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    response = provider.response(payload)
+                    latencies.append(time.perf_counter() - started)
+                results[name] = summarize(latencies)
+                sizes[name] = len(response.get_data())
+            report['payloads'][payload_name] = {'providers': results, 'bytes': sizes}
+            print_table(f"{payload_name}: jsonify()", results)
+            print('   bytes: ' + ', '.join(f'{name} {size}' for name, size in sizes.items()))
+
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Memory benchmark - bytes per user, resume and job in the in-memory engine
+
+    python -m benchmarks.memory_bench [--records 100000] [--output memory.json]
+
+Creates --records users, resumes (three per user) and jobs through
+InMemoryStorage in two layouts and measures what the engine holds with
+tracemalloc:
+
+    dicts    every record kept as the dict the API returns, which is what
+             the engine stored before records.py
+    records  the slotted records from records.py
+
+The client-supplied text (names, summaries, ...) is generated before
+measuring and is the same objects in both layouts, so the numbers are the
+per-record overhead that the layout controls: containers, timestamps,
+skill ratings and the engine's indexes.
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import write_report, environment
+import storage as storage_module
+from storage import InMemoryStorage
+
+PASSWORD_HASH = '$2b$12$C6UzMDM.H6dfI/f/IKxGhu4jP7ZzVh0x0bWZ3SxZ4o0Q9k9hJ0mG.'
+SKILLS = ['Python', 'JavaScript', 'React', 'Flask', 'MongoDB', 'Docker', 'AWS', 'SQL']
+
+
+class DictLayout:
+    """Stand-in for the record classes that stores plain dicts"""
+
+    @staticmethod
+    def from_dict(fields):
+        return dict(fields)
+
+
+@contextmanager
+def layout(name):
+    saved = storage_module.UserRecord, storage_module.ResumeRecord, storage_module.JobRecord
+    if name == 'dicts':
+        storage_module.UserRecord = storage_module.ResumeRecord = storage_module.JobRecord = DictLayout
+    try:
+        yield
+    finally:
+        storage_module.UserRecord, storage_module.ResumeRecord, storage_module.JobRecord = saved
+
+
+def make_inputs(count):
+    users = [(f'User {i}', f'user{i}@bench.example.com', PASSWORD_HASH) for i in range(count)]
+    resumes = []
+    for i in range(count):
+        skills = [SKILLS[(i + k) % len(SKILLS)] for k in range(3)]
+        resumes.append({
+            'full_name': f'User {i}',
+            'email': f'user{i}@bench.example.com',
+            'summary': f'Experienced developer number {i}. ' * 3,
+            'experience': f'Developer at Company {i}\n- Built things\n',
+            'skills': ', '.join(skills),
+            'skill_ratings': {skill: (i + k) % 10 for k, skill in enumerate(skills)},
+            'template_type': 'modern'
+        })
+    jobs = [{'job_title': f'Engineer {i}', 'company': f'Company {i % 1000}',
+             'required_skills': SKILLS[i % 4:i % 4 + 3]} for i in range(count)]
+    return users, resumes, jobs
+
+
+def measure(fn):
+    """Bytes still allocated after fn() returns (its result is kept alive)"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] - before, result
+
+
+def run_layout(name, inputs):
+    users, resumes, jobs = inputs
+    with layout(name):
+        storage = InMemoryStorage()
+        user_bytes, user_ids = measure(lambda: [storage.create_user(*args)['id'] for args in users])
+        # Three resumes per user, like the journeys workload
+        owners = [user_ids[i // 3] for i in range(len(resumes))]
+        resume_bytes, _ = measure(lambda: [storage.create_resume(owner, fields)['id']
+                                           for owner, fields in zip(owners, resumes)])
+        job_bytes, _ = measure(lambda: [storage.create_job(fields)['id'] for fields in jobs])
+    count = len(users)
+    return {kind: {'bytes_per_record': round(size / count), 'mb_per_100k': round(size / count * 100000 / 2 ** 20, 1)}
+            for kind, size in (('users', user_bytes), ('resumes', resume_bytes), ('jobs', job_bytes))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure memory per record of the in-memory storage engine')
+    parser.add_argument('--records', type=int, default=100000, help='users, resumes and jobs to create')
+    parser.add_argument('--layouts', default='dicts,records')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    inputs = make_inputs(args.records)
+    tracemalloc.start()
+    report = {'benchmark': 'memory', 'environment': environment(), 'params': {'records': args.records}, 'layouts': {}}
+    for name in [l for l in args.layouts.split(',') if l]:
+        report['layouts'][name] = run_layout(name, inputs)
+    tracemalloc.stop()
+
+    print(f"{'layout':<10}{'kind':<10}{'bytes/record':>14}{'MB per 100k':>13}")
+    for name, kinds in report['layouts'].items():
+        for kind, result in kinds.items():
+            print(f"{name:<10}{kind:<10}{result['bytes_per_record']:>14}{result['mb_per_100k']:>13}")
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
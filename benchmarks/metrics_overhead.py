@@ -0,0 +1,142 @@
+"""
+Metrics overhead benchmark
+
+    python -m benchmarks.metrics_overhead [--requests 20000] [--threads 8] [--output metrics.json]
+
+Measures the per-request cost of metrics.instrument_flask() two ways:
+calling its hooks directly inside a request context (the number to hold
+under 20 µs), and serving a trivial endpoint with and without it (noisier,
+includes Flask's hook dispatch). Also reports the raw cost of
+counter/histogram updates and their throughput when several threads update
+the same metric.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+import metrics
+from benchmarks.harness import summarize, time_calls, print_table, write_report, environment
+
+
+def make_app(instrumented):
+    app = Flask(f'bench_{instrumented}')
+
+    @app.route('/ping')
+    def ping():
+        return 'ok'
+
+    if instrumented:
+        metrics.instrument_flask(app)
+    return app
+
+
+def hook_cost(iterations):
+    """Mean µs spent in the before/after/teardown hooks for one request"""
+    app = make_app(True)
+    before = app.before_request_funcs[None][0]
+    after = app.after_request_funcs[None][0]
+    teardown = app.teardown_request_funcs[None][0]
+    response = app.response_class('ok')
+    with app.test_request_context('/ping'):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            before()
+            after(response)
+            teardown()
+        return round((time.perf_counter() - started) / iterations * 1e6, 2)
+
+
+def request_overhead(requests, rounds=5):
+    """Alternate plain/instrumented rounds and keep each variant's fastest
+    round, so machine noise does not swamp a difference of a few µs"""
+    clients = {name: make_app(name == 'instrumented').test_client() for name in ('plain', 'instrumented')}
+    for client in clients.values():
+        for _ in range(500):  # warm up
+            client.get('/ping')
+    best = {}
+    per_round = max(1, requests // rounds)
+    for _ in range(rounds):
+        for name, client in clients.items():
+            latencies, elapsed = time_calls(client.get, [('/ping',)] * per_round)
+            summary = summarize(latencies, elapsed)
+            if name not in best or summary['mean_ms'] < best[name]['mean_ms']:
+                best[name] = summary
+    best['overhead_us'] = round((best['instrumented']['mean_ms'] - best['plain']['mean_ms']) * 1000, 2)
+    return best
+
+
+def update_cost(iterations):
+    counter = metrics.Counter('bench_counter', 'bench', ('endpoint',))
+    histogram = metrics.Histogram('bench_histogram', 'bench', ('endpoint',))
+    results = {}
+    for name, fn, args in (('counter.inc', counter.inc, (1, 'ping')),
+                           ('histogram.observe', histogram.observe, (0.004, 'ping')),
+                           ('timed()', None, None)):
+        started = time.perf_counter()
+        if fn is None:
+            for _ in range(iterations):
+                with metrics.timed('bench', histogram):
+                    pass
+        else:
+            for _ in range(iterations):
+                fn(*args)
+        results[name] = round((time.perf_counter() - started) / iterations * 1e9, 1)
+    return results
+
+
+def contended_throughput(threads, iterations):
+    histogram = metrics.Histogram('bench_contended', 'bench', ('endpoint',))
+    barrier = threading.Barrier(threads + 1)
+
+    def work():
+        barrier.wait()
+        for _ in range(iterations):
+            histogram.observe(0.004, 'ping')
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    total = sum(value[2] for value in histogram._collect().values())
+    assert total == threads * iterations, total
+    return {'threads': threads, 'observations': total, 'ops_per_sec': round(total / elapsed, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure metrics overhead')
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'metrics_overhead', 'environment': environment()}
+    report['hook_us'] = hook_cost(100000)
+    print(f"Instrumentation hooks: {report['hook_us']} us/request")
+
+    report['requests'] = request_overhead(args.requests)
+    print_table('Trivial endpoint via test client', {k: v for k, v in report['requests'].items() if k != 'overhead_us'})
+    print(f"End-to-end difference: {report['requests']['overhead_us']} us/request")
+
+    report['update_ns'] = update_cost(200000)
+    print('\nSingle-thread update cost (ns/op):')
+    for name, value in report['update_ns'].items():
+        print(f'  {name:<20} {value}')
+
+    report['contended'] = contended_throughput(args.threads, 100000)
+    print(f"\n{args.threads} threads observing one histogram: {report['contended']['ops_per_sec']} ops/s")
+
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+"""
+PDF render benchmark - synthetic resumes from small to very large
+
+    python -m benchmarks.pdf_bench [--sizes small,medium,large,xlarge]
+                                   [--templates modern,classic] [--repeat 5]
+                                   [--output pdf.json]
+
+Renders every size x template_type combination through pdf_render.py (the
+code path behind /api/resumes/<id>/download) and reports per case:
+
+    html_ms / parse_ms / layout_ms   time per phase (p50): building the HTML,
+                                     xhtml2pdf parsing HTML+CSS into a story,
+                                     page layout and writing the PDF
+    total_ms (p50/p95)               whole render
+    pages, bytes                     size of the produced PDF
+    peak_alloc_mb                    Python allocation high-water mark of one
+                                     render (tracemalloc, measured separately)
+
+plus the process's peak RSS. 1000 / total_ms p50 is roughly the renders per
+second one worker core can sustain for that resume size.
+
+The larger sizes use long experience sections, many skills and LinkedIn
+URLs far past what safe_url_display() truncates.
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import percentile, write_report, environment, peak_rss_mb
+from pdf_render import TEMPLATE_TYPES, build_resume_html, render_pdf
+
+# experience/project entries, skills, summary paragraphs, LinkedIn URL length
+SIZES = {
+    'small': {'entries': 2, 'skills': 8, 'paragraphs': 1, 'url_length': 40},
+    'medium': {'entries': 6, 'skills': 25, 'paragraphs': 2, 'url_length': 90},
+    'large': {'entries': 20, 'skills': 60, 'paragraphs': 4, 'url_length': 400},
+    'xlarge': {'entries': 60, 'skills': 150, 'paragraphs': 10, 'url_length': 2000}
+}
+
+SKILL_NAMES = ['Python', 'JavaScript', 'TypeScript', 'React', 'Flask', 'Django', 'MongoDB',
+               'PostgreSQL', 'Docker', 'Kubernetes', 'AWS', 'GCP', 'Terraform', 'GraphQL', 'Redis']
+
+PARAGRAPH = ('Software engineer with a track record of shipping reliable web services, '
+             'mentoring developers and improving performance across the stack. ')
+
+_PAGE_RE = re.compile(rb'/Type\s*/Page\b(?!s)')
+
+
+def synthetic_resume(size, template_type):
+    spec = SIZES[size]
+    experience = '\n'.join(
+        f'Senior Developer at Company {i} ({2024 - i} - {2025 - i})\n'
+        f'- Led the migration of service {i} to a new platform, cutting latency by {10 + i % 50}%\n'
+        f'- Built internal tooling used by {5 + i} teams\n'
+        f'- Mentored {1 + i % 6} junior engineers'
+        for i in range(spec['entries'])
+    )
+    projects = '\n'.join(
+        f'Project {i}: open-source library for data processing\n- {PARAGRAPH}'
+        for i in range(max(1, spec['entries'] // 2))
+    )
+    skills = ', '.join(f'{SKILL_NAMES[i % len(SKILL_NAMES)]} {i // len(SKILL_NAMES) or ""}'.strip()
+                       for i in range(spec['skills']))
+    linkedin = 'https://www.linkedin.com/in/'
+    linkedin += ('benchmark-user-' * (spec['url_length'] // 15 + 1))[:max(0, spec['url_length'] - len(linkedin))]
+    return {
+        'full_name': 'Benchmark User',
+        'email': 'bench@example.com',
+        'phone': '+1 (555) 123-4567',
+        'address': '123 Benchmark Street, Test City',
+        'linkedin': linkedin,
+        'summary': PARAGRAPH * (3 * spec['paragraphs']),
+        'education': 'BSc Computer Science\nUniversity of Technology\n2010 - 2014',
+        'experience': experience,
+        'projects': projects,
+        'skills': skills,
+        'template_type': template_type
+    }
+
+
+def count_pages(pdf_bytes):
+    return len(_PAGE_RE.findall(pdf_bytes))
+
+
+class PhaseTimer:
+    """Splits a render into parse and layout by timing xhtml2pdf's pisaStory.
+
+    pisaDocument() parses through document.pisaStory() and then lays the
+    story out, so wrapping that one call separates the phases. Only safe in
+    a single-threaded benchmark.
+    """
+
+    def __init__(self):
+        from xhtml2pdf import document
+        self._document = document
+        self._original = document.pisaStory
+        self.parse = 0.0
+
+    def __enter__(self):
+        original = self._original
+
+        def timed_story(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.parse = time.perf_counter() - started
+        self._document.pisaStory = timed_story
+        return self
+
+    def __exit__(self, *exc):
+        self._document.pisaStory = self._original
+        return False
+
+
+def render_once(resume):
+    """Render one resume; returns (phase seconds, pdf bytes)"""
+    started = time.perf_counter()
+    html = build_resume_html(resume)
+    built = time.perf_counter()
+    with PhaseTimer() as timer:
+        pdf_bytes = render_pdf(html)
+    finished = time.perf_counter()
+    return {
+        'html': built - started,
+        'parse': timer.parse,
+        'layout': finished - built - timer.parse,
+        'total': finished - started
+    }, pdf_bytes
+
+
+def peak_alloc_mb(resume):
+    tracemalloc.start()
+    try:
+        render_once(resume)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+
+def run_case(resume, repeat):
+    render_once(resume)  # Warm-up: font and CSS caches, imports
+    phases = {'html': [], 'parse': [], 'layout': [], 'total': []}
+    pdf_bytes = b''
+    for _ in range(repeat):
+        timings, pdf_bytes = render_once(resume)
+        for phase, value in timings.items():
+            phases[phase].append(value)
+    totals = sorted(phases['total'])
+    return {
+        'html_ms': round(statistics.median(phases['html']) * 1000, 3),
+        'parse_ms': round(statistics.median(phases['parse']) * 1000, 3),
+        'layout_ms': round(statistics.median(phases['layout']) * 1000, 3),
+        'total_p50_ms': round(percentile(totals, 50) * 1000, 3),
+        'total_p95_ms': round(percentile(totals, 95) * 1000, 3),
+        'renders_per_sec_per_core': round(1 / statistics.median(totals), 2),
+        'pages': count_pages(pdf_bytes),
+        'bytes': len(pdf_bytes),
+        'peak_alloc_mb': peak_alloc_mb(resume),
+        'html_bytes': len(build_resume_html(resume).encode('utf-8'))
+    }
+
+
+def print_cases(cases):
+    print(f"\n{'case':<20}{'html ms':>9}{'parse ms':>10}{'layout ms':>11}{'p50 ms':>9}{'p95 ms':>9}"
+          f"{'pages':>7}{'KB':>8}{'alloc MB':>10}")
+    for name, row in cases.items():
+        print(f"{name:<20}{row['html_ms']:>9.2f}{row['parse_ms']:>10.1f}{row['layout_ms']:>11.1f}"
+              f"{row['total_p50_ms']:>9.1f}{row['total_p95_ms']:>9.1f}{row['pages']:>7}"
+              f"{row['bytes'] / 1024:>8.1f}{row['peak_alloc_mb']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PDF rendering across resume sizes and templates')
+    parser.add_argument('--sizes', default=','.join(SIZES), help='comma-separated subset of ' + ', '.join(SIZES))
+    parser.add_argument('--templates', default=','.join(TEMPLATE_TYPES), help='comma-separated template types')
+    parser.add_argument('--repeat', type=int, default=5, help='timed renders per case')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    sizes = [size for size in args.sizes.split(',') if size]
+    templates = [template for template in args.templates.split(',') if template]
+    unknown = [size for size in sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+
+    cases = {}
+    for size in sizes:
+        for template in templates:
+            cases[f'{size}/{template}'] = run_case(synthetic_resume(size, template), args.repeat)
+
+    print_cases(cases)
+    report = {
+        'benchmark': 'pdf_render',
+        'environment': environment(),
+        'params': {'sizes': sizes, 'templates': templates, 'repeat': args.repeat},
+        'cases': cases,
+        'peak_rss_mb': peak_rss_mb()
+    }
+    print(f"\nPeak RSS: {report['peak_rss_mb']} MB")
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
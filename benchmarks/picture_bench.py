@@ -0,0 +1,124 @@
+"""
+Profile picture benchmark - uploads, deduplication and PDF embedding
+
+    python -m benchmarks.picture_bench [--pictures 20] [--repeat 3] [--width 4000] [--height 3000]
+                                       [--output pictures.json]
+
+Generates --pictures distinct JPEG photos of --width x --height and uploads
+each one --repeat times (the same photo reused on several resumes) into a
+pictures.PictureStore in a temporary directory. Reports:
+
+    upload     save() latency for new content (hash, store, render the
+               sizes) and for repeats (hash only, deduplicated)
+    memory     peak Python allocations during an upload, against the
+               upload size (tracemalloc; the body is streamed, not held)
+    disk       bytes stored against bytes uploaded
+    pdf        render_pdf() time and PDF size embedding the 'pdf' size
+               against embedding the original upload
+"""
+import argparse
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from benchmarks.harness import summarize, print_table, write_report, environment
+from pdf_render import build_resume_html, render_pdf
+import pictures
+
+RESUME = {
+    'full_name': 'Picture Bench',
+    'email': 'bench@example.com',
+    'summary': 'Experienced software developer. ' * 5,
+    'experience': 'Software Developer at Tech Corp\n- Built things\n' * 5,
+    'skills': 'Python, JavaScript, React, Flask, MongoDB, Docker, AWS'
+}
+
+
+def photo(index, width, height):
+    """A distinct photo-like JPEG (fractal noise compresses like a real photo)"""
+    from PIL import Image
+    image = Image.effect_mandelbrot((width, height), (-2 + index * 0.01, -1.2, 1, 1.2), 60 + index)
+    buffer = io.BytesIO()
+    Image.merge('RGB', (image, image.rotate(90, expand=False), image.transpose(Image.FLIP_LEFT_RIGHT))).save(
+        buffer, 'JPEG', quality=92)
+    return buffer.getvalue()
+
+
+def disk_usage(root):
+    return sum(os.path.getsize(os.path.join(directory, name))
+               for directory, _, names in os.walk(root) for name in names)
+
+
+def time_pdf(picture, repeat):
+    html = build_resume_html(RESUME, picture)
+    latencies, size = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(render_pdf(html))
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure picture uploads, dedup and PDF embedding')
+    parser.add_argument('--pictures', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3, help='uploads of each picture')
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+    if pictures.Image is None:
+        sys.exit('Pillow is not installed (pip install Pillow)')
+
+    directory = tempfile.mkdtemp(prefix='picture_bench_')
+    try:
+        store = pictures.PictureStore(directory)
+        photos = [photo(i, args.width, args.height) for i in range(args.pictures)]
+        uploaded = sum(len(body) for body in photos) * args.repeat
+
+        new, repeats, peaks, first = [], [], [], None
+        for _ in range(args.repeat):
+            for body in photos:
+                tracemalloc.start()
+                started = time.perf_counter()
+                picture = store.save(io.BytesIO(body))
+                elapsed = time.perf_counter() - started
+                peaks.append(tracemalloc.get_traced_memory()[1])
+                tracemalloc.stop()
+                (new if picture['created'] else repeats).append(elapsed)
+                first = first or picture
+        stored = disk_usage(store.root)
+
+        render_pdf(build_resume_html(RESUME))  # xhtml2pdf's first render loads fonts; keep it out of the timings
+        with_pdf_size, pdf_bytes = time_pdf(store.path(first['id'], 'pdf'), 5)
+        with_original, original_bytes = time_pdf(store.find(first['id'])[0], 5)
+
+        upload_size = len(photos[0])
+        results = {'upload_new': summarize(new), 'upload_repeat': summarize(repeats),
+                   'pdf_resized': with_pdf_size, 'pdf_original': with_original}
+        print_table(f'{args.pictures} photos x {args.repeat} uploads, {args.width}x{args.height}, '
+                    f'{upload_size / 1024:.0f} KB each', results)
+        print(f"\n   peak allocations per upload: {max(peaks) / 1024:.0f} KB (upload {upload_size / 1024:.0f} KB)")
+        print(f"   disk: {stored / 1024 / 1024:.1f} MB stored for {uploaded / 1024 / 1024:.1f} MB uploaded")
+        print(f"   pdf: {pdf_bytes / 1024:.0f} KB with the 'pdf' size, {original_bytes / 1024:.0f} KB with the original")
+
+        report = {'benchmark': 'pictures', 'environment': environment(),
+                  'params': {'pictures': args.pictures, 'repeat': args.repeat, 'width': args.width,
+                             'height': args.height, 'sizes': store.sizes},
+                  'latency': results, 'upload_bytes': upload_size, 'peak_alloc_bytes': max(peaks),
+                  'disk_bytes': stored, 'uploaded_bytes': uploaded,
+                  'pdf_bytes': {'resized': pdf_bytes, 'original': original_bytes}}
+        write_report(args.output, report)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Resume import benchmark - parsing throughput and accuracy on a CV corpus
+
+    python -m benchmarks.resume_import_bench [--files 200] [--workers 1,2,4] [--corpus DIR]
+                                             [--output resume_import.json]
+
+Builds a corpus of --files resumes with known contents: half PDFs (the
+app's own PDF export, and a plain single-column layout) and half DOCX
+files (Word headings, bullets, skills in a table on some), with heading
+wording, section order and skill separators varied between files. With
+--corpus, the .pdf/.docx files in DIR are parsed instead (throughput only,
+no accuracy check). Reports:
+
+    parse      resume_import.parse_resume() latency per format, inline
+    pool       files per second through ResumeImporter (submit everything,
+               poll every job until done) for each --workers count
+    accuracy   share of the generated sections found with the right text,
+               contact fields recovered, and recall/precision of the
+               detected skills
+"""
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+from benchmarks.harness import summarize, print_table, write_report, environment
+from pdf_render import build_resume_html, render_pdf
+from shared_cache import LocalCache
+import resume_import
+
+FIRST = ('Jane', 'John', 'Priya', 'Lukas', 'Mei', 'Carlos', 'Amara', 'Oliver', 'Sofia', 'Kenji')
+LAST = ('Doe', 'Smith', 'Sharma', 'Becker', 'Chen', 'Garcia', 'Okafor', 'Brown', 'Rossi', 'Tanaka')
+SKILLS = ('Python', 'JavaScript', 'TypeScript', 'React', 'Node.js', 'Django', 'Flask', 'PostgreSQL', 'MongoDB',
+          'Docker', 'Kubernetes', 'AWS', 'Terraform', 'Kafka', 'Redis', 'GraphQL', 'Java', 'Spring Boot', 'Go',
+          'Machine Learning', 'Pandas', 'Scrum', 'CI/CD', 'Linux')
+HEADINGS = {
+    'summary': ('Professional Summary', 'SUMMARY', 'Profile', 'About Me'),
+    'education': ('Education', 'EDUCATION', 'Academic Background'),
+    'experience': ('Professional Experience', 'Work Experience', 'EXPERIENCE', 'Employment History'),
+    'projects': ('Projects', 'Selected Projects', 'PROJECTS'),
+    'skills': ('Skills', 'Technical Skills', 'CORE COMPETENCIES', 'Key Skills'),
+}
+ORDERS = (('summary', 'experience', 'education', 'projects', 'skills'),
+          ('summary', 'skills', 'experience', 'projects', 'education'),
+          ('summary', 'education', 'experience', 'skills', 'projects'))
+
+
+def sample_resume(rng, index):
+    name = f'{rng.choice(FIRST)} {rng.choice(LAST)}'
+    skills = rng.sample(SKILLS, rng.randint(5, 12))
+    jobs = []
+    for year in range(2024, 2024 - 3 * rng.randint(1, 4), -3):
+        uses = rng.sample(skills, 2)
+        jobs.append(f'Software Engineer | Company {rng.randrange(100)} | {year - 3} - {year}\n'
+                    f'- Built services in {uses[0]} and {uses[1]} for {rng.randint(2, 90)}k users\n'
+                    f'- Reduced deployment time by {rng.randint(10, 70)}%')
+    return {
+        'full_name': name,
+        'email': f'{name.lower().replace(" ", ".")}{index}@example.com',
+        'phone': f'+1 555 {rng.randrange(100, 999)} {rng.randrange(1000, 9999)}',
+        'linkedin': f'https://linkedin.com/in/{name.lower().replace(" ", "-")}-{index}',
+        'summary': f'Engineer with {rng.randint(2, 15)} years of experience building web platforms and teams.',
+        'education': f'BSc Computer Science, University {rng.randrange(50)}, {rng.randint(2000, 2020)}',
+        'experience': '\n'.join(jobs),
+        'projects': f'Open source tool - {rng.choice(skills)}\nPortfolio site with {rng.choice(skills)}',
+        'skills': ', '.join(skills),
+    }
+
+
+def plain_html(resume, rng):
+    """A generic single-column CV, sections in a random order under varied headings"""
+    separator = rng.choice((', ', ' | ', ' • '))
+    body = []
+    for field in rng.choice(ORDERS):
+        text = resume[field].replace(', ', separator) if field == 'skills' else resume[field]
+        body.append(f'<h3>{rng.choice(HEADINGS[field])}</h3><p>{text.replace(chr(10), "<br/>")}</p>')
+    return (f'<html><body><h1>{resume["full_name"]}</h1><p>{resume["email"]} | {resume["phone"]} | '
+            f'{resume["linkedin"]}</p>{"".join(body)}</body></html>')
+
+
+def docx_file(resume, rng):
+    from docx import Document
+    document = Document()
+    document.add_heading(resume['full_name'], 0)
+    document.add_paragraph(f"{resume['email']} · {resume['phone']} · {resume['linkedin']}")
+    for field in rng.choice(ORDERS):
+        document.add_heading(rng.choice(HEADINGS[field]), 1)
+        if field == 'skills' and rng.random() < 0.5:
+            table = document.add_table(rows=1, cols=2)
+            table.cell(0, 0).text = 'Tools:'
+            table.cell(0, 1).text = resume['skills']
+            continue
+        for line in resume[field].split('\n'):
+            if line.startswith('- '):
+                document.add_paragraph(line[2:], style='List Bullet')
+            else:
+                document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_corpus(count, seed=1):
+    """[(format, bytes, source resume)]"""
+    rng = random.Random(seed)
+    corpus = []
+    for index in range(count):
+        resume = sample_resume(rng, index)
+        if index % 2:
+            corpus.append(('docx', docx_file(resume, rng), resume))
+        elif index % 4:
+            corpus.append(('pdf', render_pdf(plain_html(resume, rng)), resume))
+        else:
+            corpus.append(('pdf', render_pdf(build_resume_html(resume)), resume))
+    return corpus
+
+
+def load_corpus(directory):
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        if name.lower().endswith(('.pdf', '.docx')):
+            with open(os.path.join(directory, name), 'rb') as f:
+                corpus.append((name.rsplit('.', 1)[1].lower(), f.read(), None))
+    return corpus
+
+
+def _normalized(text):
+    # Words in order; line breaks and bullets differ between layouts
+    return ' '.join(word for word in text.lower().split() if word not in ('-', '|'))
+
+
+def accuracy(corpus, results):
+    sections = found = contacts = contacts_found = 0
+    expected_skills = detected = correct = 0
+    for (_, _, source), result in zip(corpus, results):
+        parsed = result['resume']
+        for field in ('summary', 'education', 'experience', 'projects'):
+            sections += 1
+            found += _normalized(parsed.get(field, '')) == _normalized(source[field])
+        for field in ('full_name', 'email', 'phone', 'linkedin'):
+            contacts += 1
+            contacts_found += parsed.get(field, '') == source[field]
+        truth = {skill.lower() for skill in source['skills'].split(', ')}
+        listed = {skill.lower() for skill in parsed.get('skills', '').split(', ') if skill}
+        expected_skills += len(truth)
+        detected += len(listed)
+        correct += len(truth & listed)
+    return {'sections': round(found / sections, 3), 'contact_fields': round(contacts_found / contacts, 3),
+            'skill_recall': round(correct / expected_skills, 3), 'skill_precision': round(correct / max(detected, 1), 3)}
+
+
+def wait(importer, jobs, user_id):
+    pending = set(jobs)
+    while pending:
+        pending = {job for job in pending if importer.status(job, user_id)['status'] not in ('done', 'failed')}
+        time.sleep(0.002)
+
+
+def run_pool(corpus, workers):
+    importer = resume_import.ResumeImporter(LocalCache(), workers=workers, max_pending=len(corpus))
+    try:
+        # One file per worker first: forks the pool and imports the parsers outside the timing
+        wait(importer, [importer.submit('warm-up', corpus[0][1])['id'] for _ in range(workers)], 'warm-up')
+        started = time.perf_counter()
+        jobs = [importer.submit('bench', data)['id'] for _, data, _ in corpus]
+        wait(importer, jobs, 'bench')
+        elapsed = time.perf_counter() - started
+        failed = sum(importer.status(job, 'bench')['status'] == 'failed' for job in jobs)
+        return {'workers': workers, 'files_per_sec': round(len(corpus) / elapsed, 1),
+                'elapsed_s': round(elapsed, 2), 'failed': failed}
+    finally:
+        importer.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure resume import parsing throughput and accuracy')
+    parser.add_argument('--files', type=int, default=200, help='generated corpus size')
+    parser.add_argument('--workers', default='1,2,4', help='comma-separated pool sizes')
+    parser.add_argument('--corpus', help='directory of .pdf/.docx resumes to parse instead')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else build_corpus(args.files)
+    if not corpus:
+        sys.exit('no .pdf or .docx files in the corpus')
+    sizes = {kind: sum(len(data) for k, data, _ in corpus if k == kind) for kind in ('pdf', 'docx')}
+    print(f"{len(corpus)} files: " + ', '.join(
+        f"{sum(k == kind for k, _, _ in corpus)} {kind} ({size / 1024:.0f} KB)" for kind, size in sizes.items()))
+
+    latencies, results, failures = {'pdf': [], 'docx': []}, [], 0
+    resume_import.parse_resume(corpus[0][1])  # Imports pypdf/python-docx outside the timing
+    for kind, data, _ in corpus:
+        started = time.perf_counter()
+        try:
+            results.append(resume_import.parse_resume(data))
+        except resume_import.ResumeImportError:
+            failures += 1
+            results.append({'resume': {}})
+        latencies[kind].append(time.perf_counter() - started)
+    rows = {f'parse_{kind}': summarize(values) for kind, values in latencies.items() if values}
+    print_table('parse_resume(), inline', rows)
+
+    pool = [run_pool(corpus, int(workers)) for workers in args.workers.split(',')]
+    print(f"\n{'workers':>8}{'files/s':>10}{'seconds':>9}{'failed':>8}   ({os.cpu_count()} cores)")
+    for row in pool:
+        print(f"{row['workers']:>8}{row['files_per_sec']:>10}{row['elapsed_s']:>9}{row['failed']:>8}")
+
+    report = {'benchmark': 'resume_import', 'environment': environment(),
+              'params': {'files': len(corpus), 'corpus': args.corpus or 'generated'},
+              'latency': rows, 'pool': pool, 'parse_failures': failures}
+    if not args.corpus:
+        report['accuracy'] = accuracy(corpus, results)
+        print('\naccuracy: ' + ', '.join(f'{name} {value:.1%}' for name, value in report['accuracy'].items()))
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
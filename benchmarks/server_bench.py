@@ -0,0 +1,203 @@
+"""
+Serving benchmark - requests/sec of gunicorn versus the Werkzeug dev server
+
+    python -m benchmarks.server_bench [--servers dev,gunicorn] [--connections 16]
+                                      [--duration 10] [--pdf-ratio 0.05] [--output server.json]
+
+Each server runs simple_app in a subprocess on a local port, with
+STORAGE_BACKEND=sqlite in a temporary directory so that several gunicorn
+workers share data:
+
+    dev       `python simple_app.py` with FLASK_DEBUG=1 (debugger and
+              reloader on, as every app variant used to run)
+    gunicorn  `gunicorn -c gunicorn.conf.py wsgi:app` (skipped if gunicorn
+              is not installed); WEB_CONCURRENCY/GUNICORN_THREADS pass through
+
+Load comes from --client-procs processes with keep-alive sessions. Each
+connection logs in once and then requests job listings and profiles,
+plus a PDF download with probability --pdf-ratio.
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.harness import summarize, print_table, write_report, environment
+
+SERVERS = {
+    'dev': lambda port: ([sys.executable, 'simple_app.py'], {'PORT': str(port), 'FLASK_DEBUG': '1'}),
+    'gunicorn': lambda port: ([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                              {'BIND': f'127.0.0.1:{port}'})
+}
+
+RESUME = {
+    'full_name': 'Server Bench',
+    'summary': 'Experienced developer. ' * 5,
+    'experience': 'Developer at Company\n- Built services\n' * 5,
+    'skills': 'Python, Flask, MongoDB, Docker'
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(name, port, workdir):
+    import requests
+    command, extra_env = SERVERS[name](port)
+    env = dict(os.environ, STORAGE_BACKEND='sqlite', LOG_LEVEL='WARNING',
+               SQLITE_PATH=os.path.join(workdir, f'{name}.db'),
+               SHARED_CACHE_PATH=os.path.join(workdir, f'{name}-cache.db'), **extra_env)
+    # Own process group: the dev server's reloader forks a child that must be stopped too
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL, start_new_session=True)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{name} server exited with status {process.returncode}')
+        try:
+            requests.get(f'http://127.0.0.1:{port}/api/jobs', timeout=1)
+            return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    stop_server(process)
+    raise RuntimeError(f'{name} server did not start within 30s')
+
+
+def stop_server(process):
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=15)
+    except (ProcessLookupError, subprocess.TimeoutExpired):
+        os.killpg(process.pid, signal.SIGKILL)
+
+
+def connection_loop(base_url, index, deadline, pdf_ratio, latencies, errors):
+    import requests
+    session = requests.Session()
+    rng = random.Random(index)
+    credentials = {'email': f'server-bench-{index}-{os.getpid()}@example.com', 'password': 'benchmark123'}
+    session.post(f'{base_url}/api/auth/register', json=dict(credentials, name='Server Bench'))
+    session.post(f'{base_url}/api/auth/login', json=credentials)
+    resume_id = session.post(f'{base_url}/api/resumes', json=RESUME).json().get('resume_id')
+
+    while time.monotonic() < deadline:
+        roll = rng.random()
+        if roll < pdf_ratio:
+            name, path = 'download_pdf', f'/api/resumes/{resume_id}/download'
+        elif roll < 0.6:
+            name, path = 'list_jobs', '/api/jobs'
+        else:
+            name, path = 'profile', '/api/user/profile'
+        started = time.perf_counter()
+        try:
+            ok = session.get(base_url + path, timeout=30).status_code < 400
+        except requests.RequestException:
+            ok = False
+        latencies.setdefault(name, []).append(time.perf_counter() - started)
+        if not ok:
+            errors[name] = errors.get(name, 0) + 1
+
+
+def client_process(args):
+    """Run `connections` keep-alive connections in threads; returns (latencies, errors)"""
+    base_url, offset, connections, duration, pdf_ratio = args
+    deadline = time.monotonic() + duration
+    results = [({}, {}) for _ in range(connections)]
+    threads = [threading.Thread(target=connection_loop,
+                                args=(base_url, offset + i, deadline, pdf_ratio) + results[i])
+               for i in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def run_load(base_url, connections, client_procs, duration, pdf_ratio):
+    per_proc = [connections // client_procs + (1 if i < connections % client_procs else 0)
+                for i in range(client_procs)]
+    jobs = [(base_url, sum(per_proc[:i]), n, duration, pdf_ratio) for i, n in enumerate(per_proc) if n]
+    started = time.perf_counter()
+    with multiprocessing.Pool(len(jobs)) as pool:
+        results = [pair for chunk in pool.map(client_process, jobs) for pair in chunk]
+    elapsed = time.perf_counter() - started
+
+    latencies, errors = {}, {}
+    for conn_latencies, conn_errors in results:
+        for name, values in conn_latencies.items():
+            latencies.setdefault(name, []).extend(values)
+        for name, count in conn_errors.items():
+            errors[name] = errors.get(name, 0) + count
+    everything = [value for values in latencies.values() for value in values]
+    operations = {name: summarize(values, elapsed) for name, values in sorted(latencies.items())}
+    operations['all'] = summarize(everything, elapsed)
+    return {'operations': operations, 'errors': errors}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gunicorn with the Werkzeug dev server')
+    parser.add_argument('--servers', default='dev,gunicorn')
+    parser.add_argument('--connections', type=int, default=16, help='concurrent keep-alive connections')
+    parser.add_argument('--client-procs', type=int, default=2, help='processes generating load')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--pdf-ratio', type=float, default=0.05, help='fraction of requests that download a PDF')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    servers = [name for name in args.servers.split(',') if name]
+    if 'gunicorn' in servers:
+        try:
+            import gunicorn  # noqa: F401
+        except ImportError:
+            print("⚠️ gunicorn is not installed; skipping it (pip install gunicorn)")
+            servers.remove('gunicorn')
+
+    report = {
+        'benchmark': 'server',
+        'environment': environment(),
+        'params': {'connections': args.connections, 'client_procs': args.client_procs,
+                   'duration': args.duration, 'pdf_ratio': args.pdf_ratio,
+                   'web_concurrency': os.environ.get('WEB_CONCURRENCY'),
+                   'gunicorn_threads': os.environ.get('GUNICORN_THREADS')},
+        'servers': {}
+    }
+    workdir = tempfile.mkdtemp(prefix='server_bench_')
+    try:
+        for name in servers:
+            port = free_port()
+            process = start_server(name, port, workdir)
+            try:
+                results = run_load(f'http://127.0.0.1:{port}', args.connections, args.client_procs,
+                                   args.duration, args.pdf_ratio)
+            finally:
+                stop_server(process)
+            report['servers'][name] = results
+            print_table(f"Server: {name}", results['operations'])
+            if results['errors']:
+                print(f"⚠️ Errors: {results['errors']}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if len(report['servers']) > 1:
+        print()
+        for name, results in report['servers'].items():
+            print(f"{name:<10}{results['operations']['all']['ops_per_sec']:>10} req/s")
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Startup benchmark - cold import time per entry point, with a budget
+
+    python -m benchmarks.startup_bench [--repeat 5] [--top 15] [--output startup.json]
+                                       [--budget simple_app=400 ...]
+
+Each target is imported in a fresh interpreter --repeat times and the
+median import time is compared with its budget (exit status 1 if any
+target is over). One extra run per target uses `python -X importtime`, and
+the report lists the packages that spent the most time importing (self
+time summed per top-level package), so a regression points at the import
+that caused it.
+
+    worker_after_preload   what a gunicorn worker pays when the master has
+                           already run preload.preload(): importing wsgi,
+                           including its self-check (one warm PDF render)
+    wsgi_cold              the same without the preload step
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.harness import write_report, environment
+
+# name: (setup code, untimed; timed import statement)
+TARGETS = {
+    'simple_app': ('', 'import simple_app'),
+    'app_simple': ('', 'import app_simple'),
+    'async_api': ('', 'import async_api'),
+    'preload': ('', 'import preload; preload.preload()'),
+    'wsgi_cold': ('', 'import wsgi'),
+    'worker_after_preload': ('import preload; preload.preload()', 'import wsgi')
+}
+
+# Median import time allowed per target, in ms
+BUDGETS = {
+    'simple_app': 400,
+    'app_simple': 400,
+    'async_api': 800,
+    'worker_after_preload': 500
+}
+
+TIMER = """
+import time
+{setup}
+started = time.perf_counter()
+{statement}
+print('STARTUP_MS', (time.perf_counter() - started) * 1000)
+"""
+
+
+def run_target(setup, statement, importtime=False):
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', TIMER.format(setup=setup, statement=statement)]
+    env = dict(os.environ, LOG_LEVEL='WARNING', STORAGE_BACKEND='memory')
+    result = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(f'{statement!r} failed:\n{result.stderr[-2000:]}')
+    elapsed = next(float(line.split()[1]) for line in result.stdout.splitlines() if line.startswith('STARTUP_MS'))
+    return elapsed, result.stderr
+
+
+def parse_importtime(stderr, top):
+    """Self import time summed per top-level package (µs -> ms), largest first"""
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        head, _, name = line.split('|')
+        package = name.strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(head.split(':')[1]) / 1000.0
+    ranked = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {name: round(ms, 1) for name, ms in ranked}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold-start import time of each entry point')
+    parser.add_argument('--targets', default=','.join(TARGETS))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to list per target')
+    parser.add_argument('--budget', action='append', default=[], metavar='TARGET=MS',
+                        help='override a budget (repeatable)')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS)
+    for override in args.budget:
+        name, _, ms = override.partition('=')
+        budgets[name] = float(ms)
+
+    report = {'benchmark': 'startup', 'environment': environment(),
+              'params': {'repeat': args.repeat, 'budgets_ms': budgets}, 'targets': {}}
+    over_budget = []
+    print(f"{'target':<24}{'median ms':>10}{'min ms':>9}{'budget':>9}")
+    for name in [t for t in args.targets.split(',') if t]:
+        setup, statement = TARGETS[name]
+        runs = [run_target(setup, statement)[0] for _ in range(args.repeat)]
+        _, stderr = run_target(setup, statement, importtime=True)
+        median = statistics.median(runs)
+        budget = budgets.get(name)
+        report['targets'][name] = {
+            'median_ms': round(median, 1),
+            'min_ms': round(min(runs), 1),
+            'runs_ms': [round(run, 1) for run in runs],
+            'budget_ms': budget,
+            'slowest_imports_ms': parse_importtime(stderr, args.top)
+        }
+        flag = ''
+        if budget is not None and median > budget:
+            over_budget.append(f'{name}: {median:.0f} ms > {budget:.0f} ms')
+            flag = '  ❌'
+        print(f"{name:<24}{median:>10.1f}{min(runs):>9.1f}{budget if budget is not None else '-':>9}{flag}")
+
+    for name, result in report['targets'].items():
+        print(f"\n{name}: slowest packages to import (ms)")
+        for module, ms in result['slowest_imports_ms'].items():
+            print(f"   {module:<40}{ms:>8.1f}")
+
+    write_report(args.output, report)
+    if over_budget:
+        print(f"\n❌ Over budget: {'; '.join(over_budget)}")
+        sys.exit(1)
+    print("\n✅ All targets within budget")
+
+
+if __name__ == '__main__':
+    main()
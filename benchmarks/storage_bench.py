@@ -0,0 +1,139 @@
+"""
+Storage engine benchmark - runs the same workload on every backend
+
+    python -m benchmarks.storage_bench [--users 1000] [--resumes 3]
+                                       [--mongo mongodb://localhost:27017/smart_resume_bench]
+                                       [--output storage.json]
+
+The in-memory and SQLite engines always run (SQLite in a temporary file).
+The MongoDB engine is only benchmarked when --mongo (or MONGODB_BENCH_URI)
+is given; point it at a throwaway database, it is dropped afterwards.
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import summarize, time_calls, print_table, write_report, environment, peak_rss_mb
+from seed_data import seed_jobs
+from storage import InMemoryStorage, SQLiteStorage
+
+# Precomputed bcrypt hash - hashing is benchmarked separately, not here
+PASSWORD_HASH = '$2b$12$C6UzMDM.H6dfI/f/IKxGhu4jP7ZzVh0x0bWZ3SxZ4o0Q9k9hJ0mG.'
+
+RESUME_TEMPLATE = {
+    'full_name': 'Benchmark User',
+    'email': 'bench@example.com',
+    'phone': '+1 (555) 123-4567',
+    'linkedin': 'https://linkedin.com/in/bench',
+    'address': 'San Francisco, CA',
+    'summary': 'Experienced software developer. ' * 5,
+    'education': 'BSc Computer Science\nUniversity of Technology\n2018 - 2022',
+    'experience': 'Software Developer at Tech Corp\n- Built things\n' * 5,
+    'projects': 'Smart Resume Builder\n- Flask, MongoDB\n' * 3,
+    'skills': 'Python, JavaScript, React, Flask, MongoDB, Docker, AWS',
+    'skill_ratings': {'Python': 8, 'JavaScript': 7, 'React': 7},
+    'template_type': 'modern'
+}
+
+
+def run_workload(storage, users, resumes_per_user, seed=42):
+    """Run the standard workload and return {operation: summary}"""
+    rng = random.Random(seed)
+    results = {}
+
+    def record(name, fn, args_list):
+        latencies, elapsed = time_calls(fn, args_list)
+        results[name] = summarize(latencies, elapsed)
+
+    seed_jobs(storage)
+
+    emails = [f'user{i}@bench.example.com' for i in range(users)]
+    record('create_user', storage.create_user, [(f'User {i}', email, PASSWORD_HASH) for i, email in enumerate(emails)])
+    user_ids = [storage.get_user_by_email(email)['id'] for email in emails]
+
+    lookups = [(rng.choice(emails),) for _ in range(users * 2)]
+    record('get_user_by_email', storage.get_user_by_email, lookups)
+    record('get_user', storage.get_user, [(rng.choice(user_ids),) for _ in range(users * 2)])
+
+    record('create_resume', storage.create_resume,
+           [(user_id, RESUME_TEMPLATE) for user_id in user_ids for _ in range(resumes_per_user)])
+    resume_refs = [(resume['id'], user_id) for user_id in user_ids for resume in storage.list_resumes(user_id)]
+
+    record('list_resumes', storage.list_resumes, [(rng.choice(user_ids),) for _ in range(users * 2)])
+    record('count_resumes', storage.count_resumes, [(rng.choice(user_ids),) for _ in range(users * 2)])
+    record('get_resume', storage.get_resume, [rng.choice(resume_refs) for _ in range(users * 4)])
+    record('update_resume', storage.update_resume,
+           [rng.choice(resume_refs) + ({'summary': f'Updated summary {i}'},) for i in range(users * 2)])
+    record('patch_resume', storage.patch_resume,
+           [rng.choice(resume_refs) + ({'summary': f'Patched summary {i}'},) for i in range(users * 2)])
+    # Autosave of an unchanged editor: compared field by field, nothing written
+    record('patch_resume_noop', storage.patch_resume,
+           [rng.choice(resume_refs) + ({'skills': RESUME_TEMPLATE['skills']},) for _ in range(users * 2)])
+
+    job_ids = [job['id'] for job in storage.list_jobs()]
+    record('list_jobs', storage.list_jobs, [() for _ in range(users * 2)])
+    record('get_job', storage.get_job, [(rng.choice(job_ids),) for _ in range(users * 2)])
+
+    rng.shuffle(resume_refs)
+    record('delete_resume', storage.delete_resume, resume_refs[:users])
+    return results
+
+
+def sqlite_storage():
+    """SQLite engine in a temporary directory and a cleanup that removes it"""
+    directory = tempfile.mkdtemp(prefix='storage_bench_')
+    return SQLiteStorage(os.path.join(directory, 'bench.db')), lambda: shutil.rmtree(directory)
+
+
+def mongo_storage(uri):
+    """Connect MongoEngine to a benchmark database and return (storage, cleanup)"""
+    import mongoengine
+    from storage import MongoStorage
+
+    connection = mongoengine.connect(host=uri)
+    database = mongoengine.connection.get_db()
+    for collection in database.list_collection_names():
+        database.drop_collection(collection)
+
+    def cleanup():
+        connection.drop_database(database.name)
+        mongoengine.disconnect()
+
+    return MongoStorage(), cleanup
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark storage engines with the same workload')
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--resumes', type=int, default=3, help='resumes per user')
+    parser.add_argument('--mongo', default=os.environ.get('MONGODB_BENCH_URI'),
+                        help='MongoDB URI of a throwaway benchmark database')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    engines = {'memory': (InMemoryStorage(), None), 'sqlite': sqlite_storage()}
+    if args.mongo:
+        engines['mongodb'] = mongo_storage(args.mongo)
+
+    report = {'benchmark': 'storage', 'environment': environment(),
+              'params': {'users': args.users, 'resumes_per_user': args.resumes}, 'engines': {}}
+    for name, (storage, cleanup) in engines.items():
+        try:
+            results = run_workload(storage, args.users, args.resumes)
+        finally:
+            if cleanup:
+                cleanup()
+        report['engines'][name] = results
+        print_table(f"Engine: {name}", results)
+
+    report['peak_rss_mb'] = peak_rss_mb()
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+"""
+Warm-up benchmark - per-worker memory and first-request latency, with and
+without the pre-fork warm-up
+
+    python -m benchmarks.warmup_bench [--workers 2] [--requests 20] [--output warmup.json]
+
+Runs `gunicorn -c gunicorn.conf.py wsgi:app` twice, with
+STORAGE_BACKEND=sqlite in a temporary directory:
+
+    cold  PRELOAD=0 SELF_CHECK=0: every worker imports the app and the PDF
+          stack itself, and its first PDF request pays for the rest
+    warm  the defaults: preload_app, preload.preload()/warm_up() in the
+          master and gc.freeze() before each fork
+
+For each variant it reports how long the server took to answer /health,
+the first round of PDF downloads (--workers * 2 at once, each on a new
+connection so they spread over the workers), later downloads, and the
+memory of every worker from /proc/<pid>/smaps_rollup (Linux only):
+USS is the memory only that worker holds, PSS also counts a share of the
+pages it shares with the master and the other workers.
+"""
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.harness import summarize, write_report, environment
+
+VARIANTS = {
+    'cold': {'PRELOAD': '0', 'SELF_CHECK': '0'},
+    'warm': {'PRELOAD': '1', 'SELF_CHECK': '1'}
+}
+
+RESUME = {
+    'full_name': 'Warmup Bench',
+    'summary': 'Experienced developer. ' * 5,
+    'experience': 'Developer at Company\n- Built services\n' * 5,
+    'skills': 'Python, Flask, MongoDB, Docker'
+}
+
+
+def free_port():
+    import socket
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(variant, port, workers, workdir):
+    import requests
+    env = dict(os.environ, STORAGE_BACKEND='sqlite', LOG_LEVEL='WARNING', BIND=f'127.0.0.1:{port}',
+               WEB_CONCURRENCY=str(workers), SQLITE_PATH=os.path.join(workdir, f'{variant}.db'),
+               SHARED_CACHE_PATH=os.path.join(workdir, f'{variant}-cache.db'), **VARIANTS[variant])
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'{variant} server exited with status {process.returncode}')
+        try:
+            requests.get(f'http://127.0.0.1:{port}/health', timeout=1)
+            return process, time.perf_counter() - started
+        except requests.RequestException:
+            time.sleep(0.1)
+    os.killpg(process.pid, signal.SIGKILL)
+    raise RuntimeError(f'{variant} server did not start within 60s')
+
+
+def worker_pids(master_pid, expected, timeout=30):
+    """Children of the gunicorn master, once all `expected` workers are up"""
+    deadline = time.monotonic() + timeout
+    while True:
+        with open(f'/proc/{master_pid}/task/{master_pid}/children') as f:
+            pids = [int(pid) for pid in f.read().split()]
+        if len(pids) >= expected or time.monotonic() > deadline:
+            return pids
+        time.sleep(0.1)
+
+
+def memory_mb(pid):
+    """RSS, PSS and USS of a process in MB, from smaps_rollup"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    uss = fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0)
+    return {'rss_mb': round(fields.get('Rss', 0) / 1024, 1), 'pss_mb': round(fields.get('Pss', 0) / 1024, 1),
+            'uss_mb': round(uss / 1024, 1)}
+
+
+def download(base_url, cookies, resume_id):
+    """One PDF download on a new connection; returns seconds"""
+    import requests
+    started = time.perf_counter()
+    response = requests.get(f'{base_url}/api/resumes/{resume_id}/download', cookies=cookies,
+                            headers={'Connection': 'close'}, timeout=60)
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+def run_variant(variant, workers, count, workdir):
+    import requests
+    port = free_port()
+    base_url = f'http://127.0.0.1:{port}'
+    process, ready_s = start_server(variant, port, workers, workdir)
+    try:
+        pids = worker_pids(process.pid, workers)
+        # Closed before the downloads: an idle keep-alive connection holds
+        # its worker for graceful_timeout when the server is stopped
+        with requests.Session() as session:
+            credentials = {'email': f'warmup-bench-{variant}@example.com', 'password': 'benchmark123'}
+            session.post(f'{base_url}/api/auth/register', json=dict(credentials, name='Warmup Bench'))
+            session.post(f'{base_url}/api/auth/login', json=credentials).raise_for_status()
+            resume_id = session.post(f'{base_url}/api/resumes', json=RESUME).json()['resume_id']
+            cookies = session.cookies.get_dict()
+
+        first_round = workers * 2
+        with ThreadPoolExecutor(first_round) as pool:
+            first = list(pool.map(lambda _: download(base_url, cookies, resume_id), range(first_round)))
+        later = [download(base_url, cookies, resume_id) for _ in range(count)]
+
+        return {
+            'ready_s': round(ready_s, 2),
+            'first_downloads': summarize(first),
+            'later_downloads': summarize(later),
+            'master_memory': memory_mb(process.pid),
+            'worker_memory': [memory_mb(pid) for pid in pids]
+        }
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gunicorn workers with and without the pre-fork warm-up')
+    parser.add_argument('--variants', default='cold,warm')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--requests', type=int, default=20, help='PDF downloads after the first round')
+    parser.add_argument('--output', help='write JSON results to this file')
+    args = parser.parse_args()
+
+    report = {'benchmark': 'warmup', 'environment': environment(),
+              'params': {'workers': args.workers, 'requests': args.requests}, 'variants': {}}
+    workdir = tempfile.mkdtemp(prefix='warmup_bench_')
+    try:
+        for variant in [v for v in args.variants.split(',') if v]:
+            report['variants'][variant] = run_variant(variant, args.workers, args.requests, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(f"{'variant':<8}{'ready s':>9}{'first max ms':>14}{'first p50':>11}{'later p50':>11}"
+          f"{'worker USS':>12}{'worker PSS':>12}{'total PSS':>11}")
+    for variant, result in report['variants'].items():
+        workers = result['worker_memory']
+        uss = sum(w['uss_mb'] for w in workers) / len(workers)
+        pss = sum(w['pss_mb'] for w in workers) / len(workers)
+        total = sum(w['pss_mb'] for w in workers) + result['master_memory']['pss_mb']
+        print(f"{variant:<8}{result['ready_s']:>9}{result['first_downloads']['max_ms']:>14}"
+              f"{result['first_downloads']['p50_ms']:>11}{result['later_downloads']['p50_ms']:>11}"
+              f"{uss:>11.1f}M{pss:>11.1f}M{total:>10.1f}M")
+    write_report(args.output, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+"""
+HTTP response compression for Smart Resume
+
+JSON listings and the print-view HTML compress 5-10x but used to go out
+as they were. This module negotiates Accept-Encoding (brotli when the
+optional `brotli` package is installed, otherwise gzip) and compresses
+responses of a compressible type once they reach COMPRESS_MIN_SIZE bytes:
+
+    compression.init_app(app)              # Flask: after_request hook
+    compression.aiohttp_middleware         # async_api.py
+
+Flask compresses on the request thread. zlib and brotli release the GIL,
+so that already runs in parallel with other requests. The aiohttp
+middleware sends bodies of COMPRESS_OFFLOAD_SIZE bytes or more to the
+default thread pool so they do not stall the event loop.
+
+Artifacts that only change with a known version (the job catalogue, a
+resume's print view) are served from a precompressed cache instead. Each
+encoding is produced once per version, at a higher level than dynamic
+responses get, and repeat requests skip both building and compressing.
+Entries also carry an ETag (a hash of the body), so a matching
+If-None-Match gets a 304 straight from the cache (see conditional.py):
+
+    return compression.precompressed_response(('jobs', version), build, 'application/json')
+
+Bytes in/out, CPU seconds and cache hits per endpoint and encoding are
+exported at /internal/metrics (http_compression_*).
+
+Environment
+-----------
+    COMPRESS_MIN_SIZE       smallest body worth compressing (default 1024)
+    COMPRESS_OFFLOAD_SIZE   aiohttp: compress on the thread pool from this
+                            size (default 65536)
+    COMPRESS_CACHE_MB       precompressed cache size (default 32)
+"""
+import asyncio
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import conditional
+import metrics
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip only
+    brotli = None
+
+MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+OFFLOAD_SIZE = int(os.environ.get('COMPRESS_OFFLOAD_SIZE', 64 * 1024))
+CACHE_BYTES = int(os.environ.get('COMPRESS_CACHE_MB', 32)) * 1024 * 1024
+
+COMPRESSIBLE_TYPES = frozenset({
+    'application/json', 'text/html', 'text/plain', 'text/css', 'text/javascript',
+    'application/javascript', 'image/svg+xml'
+})
+
+# Dynamic responses are compressed per request, so favour speed; cached
+# artifacts are compressed once. Brotli 11 is left out: ~9 s for the
+# 2.8 MB 10k-job catalogue (see benchmarks/compression_bench.py)
+DYNAMIC_LEVELS = {'br': 4, 'gzip': 6}
+STATIC_LEVELS = {'br': 9, 'gzip': 9}
+
+compression_input = metrics.counter(
+    'http_compression_input_bytes_total',
+    'Response bytes before compression',
+    ('endpoint', 'encoding')
+)
+compression_output = metrics.counter(
+    'http_compression_output_bytes_total',
+    'Response bytes after compression',
+    ('endpoint', 'encoding')
+)
+compression_cpu = metrics.counter(
+    'http_compression_cpu_seconds_total',
+    'CPU time spent compressing responses',
+    ('endpoint', 'encoding')
+)
+precompressed_lookups = metrics.counter(
+    'http_compression_cache_total',
+    'Precompressed cache lookups by result (hit/miss)',
+    ('endpoint', 'result')
+)
+
+
+def negotiate(accept_encoding):
+    """Best coding the client accepts: 'br', 'gzip' or None (identity)"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.lower().split(','):
+        coding, _, params = part.partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding.strip()] = quality
+    best, best_quality = None, 0.0
+    for coding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+        quality = accepted.get(coding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body, coding, levels=DYNAMIC_LEVELS):
+    if coding == 'br':
+        return brotli.compress(body, quality=levels['br'])
+    compressor = zlib.compressobj(levels['gzip'], zlib.DEFLATED, 31)  # wbits 31: gzip container
+    return compressor.compress(body) + compressor.flush()
+
+
+def timed_compress(body, coding, endpoint, levels=DYNAMIC_LEVELS):
+    """compress() plus the http_compression_* metrics"""
+    started = time.thread_time()
+    compressed = compress(body, coding, levels)
+    compression_cpu.inc(time.thread_time() - started, endpoint, coding)
+    compression_input.inc(len(body), endpoint, coding)
+    compression_output.inc(len(compressed), endpoint, coding)
+    return compressed
+
+
+def is_compressible(mimetype, size, headers):
+    return (mimetype in COMPRESSIBLE_TYPES and size >= MIN_SIZE
+            and 'Content-Encoding' not in headers
+            and 'no-transform' not in headers.get('Cache-Control', ''))
+
+
+class PrecompressedCache:
+    """Encoded bodies per artifact key, LRU-bounded by total bytes.
+
+    Keys must change whenever the artifact does (include a version or
+    updated_at); superseded versions simply age out. `ttl` bounds how long
+    an entry is trusted when the version is only eventually consistent
+    (MongoStorage's catalogue_version is per process).
+    """
+
+    def __init__(self, max_bytes=CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> {'expires': t, 'etag': tag, coding or None: bytes}
+        self._size = 0
+
+    def get(self, key, coding, build, endpoint, ttl=None):
+        """(body, coding, etag) for `key`; build() -> bytes runs once per key"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires'] < now:
+                self._evict(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if coding in entry:
+                    precompressed_lookups.inc(1, endpoint, 'hit')
+                    return self._pick(entry, coding)
+        precompressed_lookups.inc(1, endpoint, 'miss')
+
+        # Built and compressed outside the lock; concurrent misses may
+        # duplicate the work once, but never block each other
+        if entry is None:
+            body = build()
+            entry = {'expires': now + ttl if ttl else float('inf'), 'etag': conditional.etag_for_body(body), None: body}
+        body = entry[None]
+        if coding is not None:
+            compressed = timed_compress(body, coding, endpoint, STATIC_LEVELS)
+            # A copy: the cached entry is only changed under the lock, where
+            # its size is accounted. Not worth it (tiny or incompressible):
+            # remember to send identity
+            entry = dict(entry)
+            entry[coding] = compressed if len(compressed) < len(body) else None
+        with self._lock:
+            current = self._entries.get(key)
+            if current is not None and current['etag'] == entry['etag']:
+                # Add just this encoding to the stored entry
+                if coding is not None and coding not in current:
+                    current[coding] = entry[coding]
+                    self._size += len(entry[coding] or b'')
+                self._entries.move_to_end(key)
+            else:
+                if current is not None:
+                    self._evict(key)
+                self._entries[key] = entry
+                self._size += self._entry_size(entry)
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                self._evict(next(iter(self._entries)))
+        return self._pick(entry, coding)
+
+    @staticmethod
+    def _pick(entry, coding):
+        if coding is not None and entry.get(coding) is not None:
+            return entry[coding], coding, entry['etag']
+        return entry[None], None, entry['etag']
+
+    @staticmethod
+    def _entry_size(entry):
+        return sum(len(value) for value in entry.values() if isinstance(value, bytes))
+
+    def _evict(self, key):
+        self._size -= self._entry_size(self._entries.pop(key))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+precompressed = PrecompressedCache()
+
+
+def precompressed_response(key, build, mimetype, ttl=None, last_modified=None, private=True):
+    """Flask response for a versioned artifact; build() returns its body (str or bytes).
+
+    Answers 304 when the request's If-None-Match / If-Modified-Since match.
+    """
+    from flask import current_app, request
+
+    def build_bytes():
+        body = build()
+        return body.encode('utf-8') if isinstance(body, str) else body
+
+    coding = negotiate(request.headers.get('Accept-Encoding', ''))
+    body, coding, etag = precompressed.get(key, coding, build_bytes, request.endpoint or 'unmatched', ttl)
+    response = conditional.not_modified(etag, last_modified, private)
+    if response is None:
+        response = current_app.response_class(body, mimetype=mimetype)
+        if coding is not None:
+            response.headers['Content-Encoding'] = coding
+        conditional.add_validators(response, etag, last_modified, private)
+    response.vary.add('Accept-Encoding')
+    return response
+
+
+def init_app(app):
+    """Compress eligible Flask responses.
+
+    Register after metrics.instrument_flask() so the response size metric
+    sees the bytes actually sent (after_request hooks run in reverse).
+    """
+    from flask import request
+
+    @app.after_request
+    def _compress_response(response):
+        if response.direct_passthrough or response.is_streamed or not 200 <= response.status_code < 300:
+            return response
+        if not is_compressible(response.mimetype, response.content_length or 0, response.headers):
+            return response
+        response.vary.add('Accept-Encoding')
+        coding = negotiate(request.headers.get('Accept-Encoding', ''))
+        if coding is None:
+            return response
+        body = response.get_data()
+        compressed = timed_compress(body, coding, request.endpoint or 'unmatched')
+        if len(compressed) < len(body):
+            response.set_data(compressed)
+            response.headers['Content-Encoding'] = coding
+        return response
+
+    return app
+
+
+async def aiohttp_middleware(request, handler):
+    """aiohttp version of init_app(): compresses web.Response bodies"""
+    from aiohttp import web
+
+    response = await handler(request)
+    body = getattr(response, 'body', None)
+    if (not isinstance(response, web.Response) or not isinstance(body, bytes)
+            or not 200 <= response.status < 300
+            or not is_compressible(response.content_type, len(body), response.headers)):
+        return response
+    response.headers.add('Vary', 'Accept-Encoding')
+    coding = negotiate(request.headers.get('Accept-Encoding', ''))
+    if coding is None:
+        return response
+    endpoint = getattr(request.match_info.handler, '__name__', 'unmatched')
+    if len(body) >= OFFLOAD_SIZE:
+        compressed = await asyncio.get_running_loop().run_in_executor(None, timed_compress, body, coding, endpoint)
+    else:
+        compressed = timed_compress(body, coding, endpoint)
+    if len(compressed) < len(body):
+        response.body = compressed
+        response.headers['Content-Encoding'] = coding
+    return response
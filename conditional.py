@@ -0,0 +1,87 @@
+"""
+Conditional GET (ETag / Last-Modified) for Smart Resume
+
+Dashboards poll the resume, job and profile endpoints, and the payload
+rarely changes. Read routes derive validators from a cheap version lookup
+(a resume's updated_at, the count and latest updated_at of a user's
+resumes, the cached catalogue) and answer a matching If-None-Match or
+If-Modified-Since with 304 before loading or serializing anything:
+
+    version = storage.resume_version(resume_id, user_id)
+    etag = conditional.etag_for('resume', resume_id, version)
+    return conditional.not_modified(etag, version) or conditional.add_validators(
+        jsonify(...), etag, version)
+
+ETags are weak (W/"..."): one tag covers every Content-Encoding of the
+same representation, which is what If-None-Match compares anyway.
+Responses also get Cache-Control: no-cache, so clients revalidate on
+every poll instead of guessing a freshness lifetime from Last-Modified.
+"""
+import hashlib
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from flask import current_app, request
+from werkzeug.http import http_date
+
+
+def etag_for(*parts):
+    """ETag value (unquoted) for the representation identified by `parts`"""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=10).hexdigest()
+
+
+def etag_for_body(body):
+    """ETag value (unquoted) for a response body (bytes)"""
+    return hashlib.blake2b(body, digest_size=10).hexdigest()
+
+
+def _http_date(value):
+    """ISO string or datetime (naive = UTC) -> aware datetime, whole seconds"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+
+@lru_cache(maxsize=4096)
+def _last_modified_header(value):
+    """HTTP-date for a Last-Modified value; polls repeat the same few values"""
+    return http_date(_http_date(value))
+
+
+def not_modified(etag, last_modified=None, private=True):
+    """304 response if the request's validators still match, otherwise None.
+
+    If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    """
+    environ = request.environ
+    # Most requests carry no validators: skip werkzeug's header parsing
+    if 'HTTP_IF_NONE_MATCH' not in environ and 'HTTP_IF_MODIFIED_SINCE' not in environ:
+        return None
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    if request.if_none_match:
+        matched = request.if_none_match.contains_weak(etag)
+    elif last_modified and request.if_modified_since:
+        matched = _http_date(last_modified) <= request.if_modified_since
+    else:
+        return None
+    if not matched:
+        return None
+    return add_validators(current_app.response_class(status=304), etag, last_modified, private)
+
+
+def add_validators(response, etag, last_modified=None, private=True):
+    """Set ETag, Last-Modified and Cache-Control on a 200 (or 304) response.
+
+    Headers are written directly: response.cache_control and set_etag()
+    parse and re-serialize them, which costs more than the rest of a
+    small handler.
+    """
+    headers = response.headers
+    headers['ETag'] = f'W/"{etag}"'
+    if last_modified:
+        headers['Last-Modified'] = _last_modified_header(last_modified)
+    headers['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+    return response
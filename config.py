@@ -5,6 +5,19 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+# Connection pool sizing - size MONGODB_MAX_POOL_SIZE to at least the number
+# of threads per worker, since every concurrent request can hold a connection
+MONGODB_POOL_SETTINGS = {
+    'maxPoolSize': _env_int('MONGODB_MAX_POOL_SIZE', 10),
+    'minPoolSize': _env_int('MONGODB_MIN_POOL_SIZE', 2),
+    'maxIdleTimeMS': _env_int('MONGODB_MAX_IDLE_TIME_MS', 300000),
+    'waitQueueTimeoutMS': _env_int('MONGODB_WAIT_QUEUE_TIMEOUT_MS', 5000)
+}
+
 class Config:
     # WORKING MongoDB Atlas Configuration
     # Based on successful connection test from diagnose_mongodb_simple.py
@@ -15,10 +28,13 @@ class Config:
         'serverSelectionTimeoutMS': 30000,  # Increased timeout for reliability
         'socketTimeoutMS': 20000,
         'connectTimeoutMS': 20000,
-        'maxPoolSize': 10,
-        'retryWrites': True
+        'retryWrites': True,
+        **MONGODB_POOL_SETTINGS
     }
 
+    # Number of pooled connections to open at startup (defaults to minPoolSize)
+    MONGODB_WARMUP_CONNECTIONS = _env_int('MONGODB_WARMUP_CONNECTIONS', MONGODB_POOL_SETTINGS['minPoolSize'])
+
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'super-secret-key-for-smart-resume'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
@@ -0,0 +1,123 @@
+"""
+Gunicorn settings for Smart Resume
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Worker model
+------------
+Requests come in two shapes:
+
+- PDF downloads are CPU-bound. xhtml2pdf holds the GIL for the whole render
+  (50-250 ms depending on resume size, see benchmarks/pdf_bench.py), so
+  renders only run in parallel across processes. Hence one worker process
+  per core.
+- Everything else mostly waits on storage (MongoDB round trips, SQLite
+  locks) or on bcrypt, which releases the GIL. Threads cover that, so each
+  worker runs GUNICORN_THREADS threads (gthread worker).
+
+A PDF render therefore blocks only the other threads of its own worker,
+and those stay responsive for the I/O-bound requests.
+
+With STORAGE_BACKEND=memory every process has its own users and sessions,
+so this config forces a single worker. Use sqlite or mongodb to scale
+out.
+
+Environment
+-----------
+    BIND                  address:port (default 0.0.0.0:8000)
+    WEB_CONCURRENCY       worker processes (default: one per CPU core)
+    GUNICORN_THREADS      threads per worker (default 4)
+    GUNICORN_KEEPALIVE    seconds an idle keep-alive connection is held
+                          (default 5; behind a load balancer, set it above
+                          the balancer's idle timeout)
+    GUNICORN_TIMEOUT      seconds before a stuck worker is killed (default 60)
+    GUNICORN_MAX_REQUESTS recycle a worker after this many requests, to cap
+                          slow leaks in the PDF stack (default 1000, 0 = off)
+    GUNICORN_ACCESS_LOG   access log path, or '-' for stdout (default off;
+                          request metrics are at /internal/metrics)
+
+Reloads
+-------
+`kill -HUP <master pid>` starts fresh workers with the current config and
+gracefully stops the old ones after their in-flight requests finish (up to
+graceful_timeout). The application is preloaded in the master for
+memory/sqlite, so the workers share its imported code and warmed-up fonts.
+That also means new application code needs a master restart, or
+`kill -USR2` followed by `kill -TERM` of the old master. MongoDB deployments
+load the app in each worker instead, because a pymongo client must not be
+created before fork(); HUP then also picks up new code.
+
+Either way the master imports the heavy PDF libraries first and runs a
+throwaway render (preload.py), so a worker boots in about the time
+`import simple_app` takes and its first PDF request costs the same as any
+other. Right before each fork the master calls gc.freeze(): the collector
+then never touches the inherited objects, and their refcount and GC
+header writes stop un-sharing copy-on-write pages in the workers.
+PRELOAD=0 turns all of this off, including preload_app; every worker then
+loads and warms up on its own (useful for comparing, see
+benchmarks/warmup_bench.py).
+
+A stopping worker (HUP, max_requests recycling, shutdown) flushes the
+resume autosaves it still buffers before it exits (see write_behind.py).
+"""
+import gc
+import multiprocessing
+import os
+
+import preload
+
+storage_backend = os.environ.get('STORAGE_BACKEND', 'memory').lower()
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+worker_class = 'gthread'
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+if storage_backend == 'memory' and workers > 1:
+    print(f"⚠️ STORAGE_BACKEND=memory keeps data per process; using 1 worker instead of {workers}")
+    workers = 1
+
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10  # Stagger recycling across workers
+
+preload_app = storage_backend != 'mongodb' and preload.enabled()
+
+# Worker heartbeat files on tmpfs; a disk-backed /tmp can stall them in containers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG') or None
+errorlog = '-'
+proc_name = 'smart-resume'
+
+
+def on_starting(server):
+    if preload.enabled():
+        timings = preload.preload()
+        if not preload_app:  # Otherwise wsgi.py already warmed up while the app loaded
+            timings.update(preload.warm_up())
+        print(f"📦 Preloaded and warmed up in {sum(timings.values()) * 1000:.0f} ms before forking workers")
+
+
+def pre_fork(server, worker):
+    if preload.enabled():
+        gc.freeze()
+
+
+def when_ready(server):
+    print(f"🚀 Smart Resume listening on {bind}: {workers} worker(s) x {threads} thread(s), "
+          f"storage={storage_backend}, preload={'on' if preload_app else 'off'}")
+
+
+def worker_exit(server, worker):
+    # Autosaves still buffered in this worker must reach storage (write_behind.py)
+    import write_behind
+    write_behind.flush_all()
+
+
+def worker_abort(worker):
+    print(f"❌ Worker {worker.pid} timed out after {timeout}s and was aborted")
@@ -0,0 +1,97 @@
+"""
+Fast JSON encoding for Smart Resume
+
+Flask's default provider runs every response through the standard
+library encoder with sorted keys, and turns datetimes into HTTP dates
+("Mon, 19 Oct 2026 ...") rather than the ISO strings the API uses
+everywhere else. FastJSONProvider encodes with orjson when it is
+installed (optional, pip install orjson) and the standard library
+otherwise, with native handling of:
+
+    datetime / date       ISO-8601 string, same as .isoformat()
+    ObjectId, UUID        string
+    Decimal               string
+    set, frozenset        list
+
+Keys are not sorted: storage returns fields in a fixed order, so output is
+stable anyway. Values orjson rejects (integers beyond 64 bits, non-string
+dict keys) fall back to the standard library encoder.
+
+    json_provider.init_app(app)     # Flask: jsonify() and request.get_json()
+    json_provider.dumps(obj)        # UTF-8 bytes, e.g. for aiohttp
+
+See benchmarks/json_bench.py for the numbers on a 10k-job response.
+"""
+import json
+import sys
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Optional: the standard library encoder is used instead
+    orjson = None
+
+
+def _default(value):
+    """Encode the types neither encoder handles natively"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    # An ObjectId can only exist once bson is imported; checking sys.modules
+    # keeps the ~20 ms bson import out of apps that never use MongoDB
+    bson = sys.modules.get('bson')
+    if bson is not None and isinstance(value, bson.ObjectId):
+        return str(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(obj, sort_keys=False, indent=False):
+    """Encode obj as UTF-8 JSON bytes"""
+    if orjson is not None:
+        option = (orjson.OPT_SORT_KEYS if sort_keys else 0) | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(obj, default=_default, option=option)
+        except orjson.JSONEncodeError:
+            pass  # The standard library copes with big integers and non-string keys
+    return json.dumps(obj, default=_default, sort_keys=sort_keys, ensure_ascii=False,
+                      indent=2 if indent else None, separators=None if indent else (',', ':')).encode('utf-8')
+
+
+def dumps_str(obj):
+    """dumps() as a str, for APIs that expect one (aiohttp's json_response)"""
+    return dumps(obj).decode('utf-8')
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps()/loads() above"""
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                     indent=bool(kwargs.get('indent'))).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = dumps(obj, sort_keys=self.sort_keys, indent=indent) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_app(app):
+    app.json = FastJSONProvider(app)
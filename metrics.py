@@ -0,0 +1,360 @@
+"""
+In-process metrics for Smart Resume
+
+Minimal counters, gauges and histograms rendered in the Prometheus text
+exposition format, so /internal/metrics can be scraped without pulling in
+a client library.
+
+Counters and histograms aggregate per thread: each thread updates its own
+shard without taking a lock, and shards are only merged when the metrics
+are rendered. instrument_flask() adds per-endpoint request metrics and
+timed() records sub-operations (PDF rendering, bcrypt, storage calls).
+"""
+import threading
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds (1 ms .. 10 s)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Payload size buckets in bytes (100 B .. 10 MB)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_registry_lock = threading.Lock()
+_registry = {}
+
+
+def _format_labels(labelnames, labels, extra=None):
+    pairs = list(zip(labelnames, labels))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _ThreadSharded:
+    """Per-thread {labels: value} shards, merged on read.
+
+    The owning thread is the only writer of its shard, so updates need no
+    lock. Shards of threads that have exited are folded into `_retired`
+    when the metric is collected.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards_lock = threading.Lock()
+        self._shards = []  # (thread, shard)
+        self._retired = {}
+
+    def _shard(self):
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append((threading.current_thread(), shard))
+            return shard
+
+    def _collect(self):
+        """Return {labels: merged value} across every thread"""
+        with self._shards_lock:
+            live = []
+            for thread, shard in self._shards:
+                if thread.is_alive():
+                    live.append((thread, shard))
+                else:
+                    for labels, value in shard.copy().items():
+                        self._merge(self._retired, labels, value)
+            self._shards = live
+            merged = {labels: self._copy(value) for labels, value in self._retired.items()}
+            shards = [shard.copy() for _, shard in live]
+        for shard in shards:
+            for labels, value in shard.items():
+                self._merge(merged, labels, value)
+        return merged
+
+    def _merge(self, into, labels, value):
+        raise NotImplementedError
+
+    def _copy(self, value):
+        raise NotImplementedError
+
+
+class Counter(_ThreadSharded):
+    """Monotonically increasing value, optionally split by labels"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def inc(self, amount=1, *labels):
+        shard = self._shard()
+        shard[labels] = shard.get(labels, 0) + amount
+
+    def _merge(self, into, labels, value):
+        into[labels] = into.get(labels, 0) + value
+
+    def _copy(self, value):
+        return value
+
+    def samples(self):
+        for labels, value in sorted(self._collect().items()):
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class Gauge:
+    """Value that can go up and down"""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        # set() has to win over concurrent inc()s, so gauges keep a lock
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, *labels):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield self.name, _format_labels(self.labelnames, labels), value
+
+
+class UpDownCounter(Counter):
+    """Gauge that only moves by inc()/dec(), so it can stay lock-free"""
+    kind = 'gauge'
+
+    def dec(self, amount=1, *labels):
+        self.inc(-amount, *labels)
+
+
+class Histogram(_ThreadSharded):
+    """Cumulative bucketed distribution of observed values"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__()
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, *labels):
+        shard = self._shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def _merge(self, into, labels, value):
+        series = into.get(labels)
+        if series is None:
+            into[labels] = self._copy(value)
+            return
+        series[0] = [a + b for a, b in zip(series[0], value[0])]
+        series[1] += value[1]
+        series[2] += value[2]
+
+    def _copy(self, value):
+        return [list(value[0]), value[1], value[2]]
+
+    def samples(self):
+        for labels, (counts, total, count) in sorted(self._collect().items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                yield (f'{self.name}_bucket',
+                       _format_labels(self.labelnames, labels, ('le', _format_value(float(bound)))),
+                       cumulative)
+            yield f'{self.name}_sum', _format_labels(self.labelnames, labels), total
+            yield f'{self.name}_count', _format_labels(self.labelnames, labels), count
+
+
+def _get_or_create(cls, name, documentation, labelnames, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, documentation, labelnames, **kwargs)
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    """Return the registered counter called `name`, creating it if needed"""
+    return _get_or_create(Counter, name, documentation, labelnames)
+
+
+def gauge(name, documentation, labelnames=()):
+    """Return the registered gauge called `name`, creating it if needed"""
+    return _get_or_create(Gauge, name, documentation, labelnames)
+
+
+def up_down_counter(name, documentation, labelnames=()):
+    """Return the registered up/down counter called `name`, creating it if needed"""
+    return _get_or_create(UpDownCounter, name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    """Return the registered histogram called `name`, creating it if needed"""
+    return _get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+def render_prometheus():
+    """Render every registered metric in the Prometheus text format"""
+    with _registry_lock:
+        metrics = sorted(_registry.values(), key=lambda m: m.name)
+
+    lines = []
+    for metric in metrics:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for sample_name, labels, value in metric.samples():
+            lines.append(f'{sample_name}{labels} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# ---- sub-operation timers ----
+
+operation_latency = histogram(
+    'app_operation_duration_seconds',
+    'Latency of expensive operations inside a request (pdf_render, bcrypt, storage)',
+    ('operation',)
+)
+
+
+class timed:
+    """Context manager / decorator recording a block's duration:
+
+        with metrics.timed('pdf_render'):
+            pisa.pisaDocument(...)
+    """
+    __slots__ = ('operation', 'histogram', '_started')
+
+    def __init__(self, operation, histogram=operation_latency):
+        self.operation = operation
+        self.histogram = histogram
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self._started, self.operation)
+        return False
+
+    def __call__(self, fn):
+        operation, histogram = self.operation, self.histogram
+
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, operation)
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+
+# ---- Flask request metrics ----
+
+request_latency = histogram(
+    'http_request_duration_seconds',
+    'Request latency by endpoint',
+    ('method', 'endpoint')
+)
+request_total = counter(
+    'http_requests_total',
+    'Requests by endpoint and status code',
+    ('method', 'endpoint', 'status')
+)
+request_size = histogram(
+    'http_request_size_bytes',
+    'Request body size by endpoint',
+    ('method', 'endpoint'),
+    buckets=SIZE_BUCKETS
+)
+response_size = histogram(
+    'http_response_size_bytes',
+    'Response body size by endpoint (streamed responses are not counted)',
+    ('method', 'endpoint'),
+    buckets=SIZE_BUCKETS
+)
+requests_in_flight = up_down_counter(
+    'http_requests_in_flight',
+    'Requests currently being handled'
+)
+
+
+def instrument_flask(app, metrics_path='/internal/metrics'):
+    """Record per-endpoint request metrics for `app` and serve them at `metrics_path`.
+
+    Endpoints are labelled by Flask endpoint name (not URL) so resume ids
+    do not blow up label cardinality; unmatched URLs share one label.
+    """
+    from flask import request, Response
+
+    # Hooks resolve the request proxy once and avoid header parsing; this
+    # keeps the per-request cost to a few µs
+    @app.before_request
+    def _start_request_timer():
+        request._get_current_object().environ['metrics.started'] = time.perf_counter()
+        requests_in_flight.inc()
+
+    @app.after_request
+    def _record_request(response):
+        req = request._get_current_object()
+        started = req.environ.get('metrics.started')
+        if started is None:
+            return response
+        endpoint = req.endpoint or 'unmatched'
+        method = req.method
+        request_latency.observe(time.perf_counter() - started, method, endpoint)
+        request_total.inc(1, method, endpoint, str(response.status_code))
+        request_size.observe(req.content_length or 0, method, endpoint)
+        if not response.is_streamed:
+            # Buffered body: a list of byte chunks
+            response_size.observe(sum(map(len, response.response)), method, endpoint)
+        return response
+
+    @app.teardown_request
+    def _finish_request(exc=None):
+        if request._get_current_object().environ.pop('metrics.started', None) is not None:
+            requests_in_flight.dec()
+
+    def internal_metrics():
+        """Prometheus-format metrics"""
+        return Response(render_prometheus(), mimetype=PROMETHEUS_CONTENT_TYPE)
+
+    app.add_url_rule(metrics_path, 'internal_metrics', internal_metrics)
+    return app
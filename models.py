@@ -52,15 +52,32 @@ class Resume(db.Document):
     # Timestamps
     created_at = db.DateTimeField(default=datetime.utcnow)
     updated_at = db.DateTimeField(default=datetime.utcnow)
+    # Bumped on every update; PATCH /api/resumes/<id> checks it (optimistic concurrency)
+    version = db.IntField(default=0)
     
     def save(self, *args, **kwargs):
+        if self.pk:
+            self.version = (self.version or 0) + 1
         self.updated_at = datetime.utcnow()
         super(Resume, self).save(*args, **kwargs)
 
+class ResumeRevision(db.Document):
+    """One entry of a resume's edit history (see resume_history.py)"""
+    resume = db.ObjectIdField(required=True)
+    seq = db.IntField(required=True)
+    version = db.IntField()
+    kind = db.StringField(required=True, choices=['snapshot', 'delta'])
+    fields = db.ListField(db.StringField())
+    data = db.BinaryField(required=True)  # zlib-compressed JSON
+    created_at = db.DateTimeField(default=datetime.utcnow)
+
+    meta = {'indexes': [{'fields': ['resume', 'seq'], 'unique': True}]}
+
 class Job(db.Document):
     job_title = db.StringField(required=True, max_length=100)
     company = db.StringField(required=True, max_length=100)
     required_skills = db.ListField(db.StringField())  # Store as list of strings
+    apply_url = db.StringField()
     created_at = db.DateTimeField(default=datetime.utcnow)
     updated_at = db.DateTimeField(default=datetime.utcnow)
 
@@ -0,0 +1,180 @@
+"""
+MongoDB connection pool and command monitoring
+
+pymongo listeners that feed metrics.py: connection checkout wait time,
+pool size / in-use gauges, checkout failures and per-command latency.
+Call install() before the MongoEngine connection is created.
+"""
+import threading
+import time
+
+from pymongo import monitoring
+
+import metrics
+
+checkout_wait = metrics.histogram(
+    'mongodb_pool_checkout_wait_seconds',
+    'Time spent waiting to check a connection out of the pool',
+    ('address',)
+)
+checkout_failures = metrics.counter(
+    'mongodb_pool_checkout_failures_total',
+    'Connection checkouts that failed, by reason',
+    ('address', 'reason')
+)
+pool_size = metrics.gauge(
+    'mongodb_pool_connections',
+    'Open connections in the pool',
+    ('address',)
+)
+pool_in_use = metrics.gauge(
+    'mongodb_pool_connections_in_use',
+    'Connections currently checked out of the pool',
+    ('address',)
+)
+command_latency = metrics.histogram(
+    'mongodb_command_duration_seconds',
+    'MongoDB command latency',
+    ('command',)
+)
+command_failures = metrics.counter(
+    'mongodb_command_failures_total',
+    'MongoDB commands that returned an error',
+    ('command',)
+)
+
+
+def _address(event):
+    host, port = event.address
+    return f'{host}:{port}'
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Records pool size and checkout wait time.
+
+    Checkouts happen on the requesting thread, so the start time is kept in
+    a thread-local between the started and checked-out events.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def pool_created(self, event):
+        pool_size.set(0, _address(event))
+        pool_in_use.set(0, _address(event))
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pool_size.set(0, _address(event))
+        pool_in_use.set(0, _address(event))
+
+    def connection_created(self, event):
+        pool_size.inc(1, _address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pool_size.dec(1, _address(event))
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._observe_wait(event)
+        checkout_failures.inc(1, _address(event), event.reason)
+
+    def connection_checked_out(self, event):
+        self._observe_wait(event)
+        pool_in_use.inc(1, _address(event))
+
+    def connection_checked_in(self, event):
+        pool_in_use.dec(1, _address(event))
+
+    def _observe_wait(self, event):
+        started = getattr(self._local, 'started', None)
+        if started is not None:
+            checkout_wait.observe(time.perf_counter() - started, _address(event))
+            self._local.started = None
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Records per-command latency from pymongo's own timings"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        command_latency.observe(event.duration_micros / 1e6, event.command_name)
+
+    def failed(self, event):
+        command_latency.observe(event.duration_micros / 1e6, event.command_name)
+        command_failures.inc(1, event.command_name)
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install():
+    """Register the listeners globally (once) for every MongoClient created afterwards"""
+    global _installed
+    with _install_lock:
+        if not _installed:
+            monitoring.register(PoolMetricsListener())
+            monitoring.register(CommandMetricsListener())
+            _installed = True
+
+
+def warm_up_pool(client, connections):
+    """Open `connections` pooled connections by running concurrent pings.
+
+    pymongo only fills minPoolSize lazily from a background thread; doing
+    it up front means the first requests after a restart don't pay the
+    TLS handshake. Returns the number of pings that succeeded.
+    """
+    if connections <= 0:
+        return 0
+
+    ok = []
+    barrier = threading.Barrier(connections)
+
+    def ping():
+        try:
+            # Line up every thread so each needs its own connection
+            barrier.wait(timeout=5)
+        except threading.BrokenBarrierError:
+            pass
+        try:
+            client.admin.command('ping')
+            ok.append(True)
+        except Exception:
+            pass
+
+    threads = [threading.Thread(target=ping, daemon=True) for _ in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(ok)
+
+
+def warm_up_in_background(app, connections):
+    """Warm up the MongoEngine connection pool without blocking startup"""
+    def run():
+        try:
+            from mongoengine.connection import get_connection
+            with app.app_context():
+                opened = warm_up_pool(get_connection(), connections)
+            print(f"✅ MongoDB pool warm-up: {opened}/{connections} connections ready")
+        except Exception as e:
+            print(f"⚠️ MongoDB pool warm-up failed: {str(e)}")
+
+    thread = threading.Thread(target=run, name='mongo-pool-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,274 @@
+"""
+PDF rendering for resumes
+
+The PDF download used to build its HTML and call xhtml2pdf inline in the
+route. It lives here so the route and the render benchmark
+(benchmarks/pdf_bench.py) share one code path.
+
+    html = build_resume_html(resume, picture=store.path(resume['profile_picture'], 'pdf'))
+    pdf_bytes = render_pdf(html)
+"""
+from io import BytesIO
+
+# Mirrors the choices on models.Resume.template_type
+TEMPLATE_TYPES = ('modern', 'classic', 'creative', 'minimal')
+
+
+class PdfRenderError(Exception):
+    """xhtml2pdf reported errors while rendering"""
+
+
+def safe_url_display(url, max_length=60):
+    """Truncate extremely long URLs so they cannot overflow the PDF layout"""
+    if not url:
+        return ''
+    if len(url) <= max_length:
+        return url
+    # For very long URLs, show beginning + ... + end
+    # More conservative truncation for PDF
+    return f"{url[:max_length-8]}...{url[-5:]}"
+
+
+def skills_from(resume):
+    """Comma-separated skills string as a list"""
+    return [skill.strip() for skill in (resume.get('skills') or '').split(',') if skill.strip()]
+
+
+def build_resume_html(resume, picture=None):
+    """PDF-optimized HTML for a resume dict; `picture` is the local path of the
+    resized profile picture (pictures.PictureStore.path), embedded as is"""
+    skills_list = skills_from(resume)
+    # Apply URL truncation to LinkedIn if it's extremely long (more conservative for PDF)
+    linkedin_display = safe_url_display(resume.get('linkedin', ''), 60)
+    return f"""
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        @page {{
+            size: A4;
+            margin: 0.75in;
+        }}
+        body {{
+            font-family: Arial, sans-serif;
+            font-size: 10pt;
+            line-height: 1.5;
+            color: #2c3e50;
+            margin: 0;
+            padding: 0;
+        }}
+        .resume-header {{
+            text-align: center;
+            background-color: #3498db;
+            color: white;
+            padding: 20px;
+            margin-bottom: 25px;
+        }}
+        .photo {{
+            margin-bottom: 8px;
+        }}
+        .name {{
+            font-size: 24pt;
+            font-weight: bold;
+            margin-bottom: 8px;
+        }}
+        .contact-info {{
+            font-size: 10pt;
+            line-height: 1.4;
+            width: 100%;
+            max-width: 100%;
+            overflow: hidden;
+            word-wrap: break-word;
+            overflow-wrap: anywhere;
+            white-space: normal;
+        }}
+        .contact-item {{
+            display: inline-block;
+            margin: 0 10px;
+            word-wrap: break-word;
+            overflow-wrap: break-word;
+            max-width: 150px;
+            vertical-align: top;
+        }}
+        .section {{
+            margin-bottom: 20px;
+        }}
+        .section-title {{
+            font-size: 14pt;
+            font-weight: bold;
+            color: #2c3e50;
+            background-color: #ecf0f1;
+            padding: 10px 15px;
+            margin-bottom: 15px;
+            text-transform: uppercase;
+            border-left: 5px solid #3498db;
+        }}
+        .section-content {{
+            padding: 0 15px;
+            text-align: justify;
+            font-size: 10pt;
+            line-height: 1.6;
+        }}
+        .summary-content {{
+            font-style: italic;
+            color: #34495e;
+            border-left: 3px solid #3498db;
+            padding: 15px;
+            background-color: #f8f9fa;
+            margin: 10px 0;
+        }}
+        .skills-container {{
+            margin-top: 10px;
+        }}
+        .skill-item {{
+            background-color: #3498db;
+            color: white;
+            padding: 4px 12px;
+            border-radius: 15px;
+            font-size: 9pt;
+            font-weight: bold;
+            display: inline-block;
+            margin: 2px;
+        }}
+        .content-block {{
+            margin-bottom: 10px;
+        }}
+        
+        /* Enhanced CSS class for LinkedIn URLs in PDF with aggressive wrapping */
+        .linkedin-url {{
+            /* Aggressive text breaking for PDF generators */
+            word-break: break-all !important;
+            overflow-wrap: break-word !important;
+            word-wrap: break-word !important;
+            white-space: normal !important;
+            
+            /* Layout properties */
+            display: block;
+            margin-top: 5px;
+            max-width: 100% !important;
+            width: 100%;
+            
+            /* Text styling */
+            font-size: 8pt !important;
+            line-height: 1.1 !important;
+            
+            /* Overflow handling */
+            overflow: hidden;
+            text-overflow: ellipsis;
+            
+            /* PDF-specific properties */
+            box-sizing: border-box;
+            padding: 0;
+            margin-left: 0;
+            margin-right: 0;
+            
+            /* Force character-level breaking */
+            -webkit-hyphens: auto;
+            -moz-hyphens: auto;
+            hyphens: auto;
+            
+            /* Additional PDF generator compatibility */
+            overflow-wrap: anywhere !important;
+        }}
+        
+        /* Alternative approach: Multi-line with ellipsis for very long URLs */
+        .linkedin-url-multiline {{
+            word-break: break-all;
+            overflow-wrap: break-word;
+            white-space: normal;
+            display: block;
+            margin-top: 5px;
+            max-width: 100%;
+            width: 100%;
+            font-size: 8pt;
+            line-height: 1.1;
+            max-height: 2.2em;
+            overflow: hidden;
+            position: relative;
+        }}
+    </style>
+</head>
+<body>
+    <!-- Header Section -->
+    <div class="resume-header">
+        {f'<div class="photo"><img src="{picture}" width="90" height="90"></div>' if picture else ''}
+        <div class="name">{resume.get('full_name', 'Professional Resume')}</div>
+        <div class="contact-info">
+            {f'📧 {resume.get("email", "")} ' if resume.get('email') else ''}
+            {f'📞 {resume.get("phone", "")} ' if resume.get('phone') else ''}
+            {f'🏠 {resume.get("address", "")} ' if resume.get('address') else ''}
+            {f'<div class="linkedin-url">🔗 {linkedin_display}</div>' if resume.get('linkedin') else ''}
+        </div>
+    </div>
+    
+    <!-- Professional Summary -->
+    {f'''
+    <div class="section">
+        <div class="section-title">Professional Summary</div>
+        <div class="section-content">
+            <div class="summary-content">{resume.get('summary', '')}</div>
+        </div>
+    </div>
+    ''' if resume.get('summary') else ''}
+    
+    <!-- Education -->
+    {f'''
+    <div class="section">
+        <div class="section-title">Education</div>
+        <div class="section-content">
+            <div class="content-block">{resume.get('education', '')}</div>
+        </div>
+    </div>
+    ''' if resume.get('education') else ''}
+    
+    <!-- Experience -->
+    {f'''
+    <div class="section">
+        <div class="section-title">Professional Experience</div>
+        <div class="section-content">
+            <div class="content-block">{resume.get('experience', '')}</div>
+        </div>
+    </div>
+    ''' if resume.get('experience') else ''}
+    
+    <!-- Projects -->
+    {f'''
+    <div class="section">
+        <div class="section-title">Projects Portfolio</div>
+        <div class="section-content">
+            <div class="content-block">{resume.get('projects', '')}</div>
+        </div>
+    </div>
+    ''' if resume.get('projects') else ''}
+    
+    <!-- Skills -->
+    {f'''
+    <div class="section">
+        <div class="section-title">Core Skills</div>
+        <div class="section-content">
+            <div class="skills-container">
+                {' '.join([f'<span class="skill-item">{skill}</span>' for skill in skills_list])}
+            </div>
+        </div>
+    </div>
+    ''' if skills_list else ''}
+</body>
+</html>
+"""
+
+
+def render_pdf(html):
+    """Render HTML to PDF bytes; raises PdfRenderError if xhtml2pdf reports errors"""
+    from xhtml2pdf import pisa
+
+    result = BytesIO()
+    pdf = pisa.pisaDocument(BytesIO(html.encode('utf-8')), result)
+    if pdf.err:
+        raise PdfRenderError(f'xhtml2pdf reported {pdf.err} error(s)')
+    return result.getvalue()
+
+
+def render_resume_pdf(resume, picture=None):
+    """build_resume_html + render_pdf in one picklable call, for process pools"""
+    return render_pdf(build_resume_html(resume, picture))
@@ -0,0 +1,256 @@
+"""
+Profile pictures: deduplicated, content-addressed storage with resized copies
+
+Resume.profile_picture was a bare string with no upload behind it, and a
+picture would have been embedded at full resolution in every PDF. Pictures
+now go through POST /api/pictures:
+
+- The body (the raw image, or a multipart form with a `picture` file) is
+  copied to a temporary file in CHUNK_SIZE pieces and hashed (SHA-256) on
+  the way, so an upload is never held in memory as a whole.
+- The file is stored under its hash. The same picture uploaded again, by
+  any user for any resume, is recognised and kept once.
+- The square sizes the templates use (PICTURE_SIZES) are rendered once,
+  when new content arrives, as small JPEGs next to the original. The print
+  view and the PDF use those instead of the upload.
+
+    picture = store.save(request.stream)      # {'id': sha256, 'url': ..., 'created': bool, ...}
+    path = store.path(resume['profile_picture'], 'pdf')   # local JPEG for xhtml2pdf
+
+A resume refers to its picture as profile_picture = '/api/pictures/<sha256>'.
+The content under a hash never changes, so GET /api/pictures/<sha256> is
+served with a one-year immutable Cache-Control; the unguessable hash is
+what keeps it private.
+
+Resizing needs Pillow (optional, pip install Pillow). Without it uploads
+are still stored and deduplicated, every size serves the original, and
+PDFs leave the picture out.
+
+Environment
+-----------
+    UPLOAD_FOLDER     where pictures are stored (default uploads, as config.py)
+    PICTURE_MAX_MB    largest accepted upload (default 16)
+"""
+import hashlib
+import os
+import re
+import tempfile
+
+import metrics
+from app_logging import get_logger
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Optional: originals only
+    Image = None
+
+log = get_logger(__name__)
+
+UPLOAD_FOLDER = os.environ.get('UPLOAD_FOLDER', 'uploads')
+MAX_BYTES = int(os.environ.get('PICTURE_MAX_MB', 16)) * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+URL_PREFIX = '/api/pictures/'
+
+# Edge in pixels of each square copy: the editor's thumbnail, the print view
+# (shown at 110px, doubled for print resolution) and the PDF header (90pt)
+PICTURE_SIZES = {'thumb': 96, 'print': 220, 'pdf': 180}
+JPEG_QUALITY = 85
+
+# Refuse to decode images with more pixels than this (decompression bombs)
+MAX_PIXELS = 40_000_000
+
+# The formats of config.Config.ALLOWED_EXTENSIONS, recognised by content
+# rather than by file name
+FORMATS = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif')
+)
+SNIFF_BYTES = 8
+
+_PICTURE_ID = re.compile(r'[0-9a-f]{64}')
+
+uploads = metrics.counter(
+    'picture_uploads_total',
+    'Profile picture uploads by result (stored/deduplicated/rejected)',
+    ('result',)
+)
+upload_bytes = metrics.counter(
+    'picture_upload_bytes_total',
+    'Bytes of profile picture uploads by result (stored/deduplicated/rejected)',
+    ('result',)
+)
+
+
+class PictureError(ValueError):
+    """The upload was rejected; `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def sniff(head):
+    """Content type of an image from its first bytes, or None if not allowed"""
+    for magic, mimetype in FORMATS:
+        if head.startswith(magic):
+            return mimetype
+    return None
+
+
+def picture_id(ref):
+    """Hash of a stored picture from a profile_picture value
+    ('/api/pictures/<sha256>' or the bare hash), or None"""
+    if not ref:
+        return None
+    if ref.startswith(URL_PREFIX):
+        ref = ref[len(URL_PREFIX):].split('?', 1)[0]
+    return ref if _PICTURE_ID.fullmatch(ref) else None
+
+
+def picture_url(picture_id, size=None):
+    return f'{URL_PREFIX}{picture_id}' + (f'?size={size}' if size else '')
+
+
+def _flatten(image):
+    """RGB copy of `image`, transparent areas on white (JPEG has no alpha)"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+class PictureStore:
+    """Pictures on disk under root/pictures/<first 2 hex digits>/<sha256>"""
+
+    def __init__(self, root=UPLOAD_FOLDER, sizes=PICTURE_SIZES, max_bytes=MAX_BYTES):
+        self.root = os.path.abspath(os.path.join(root, 'pictures'))
+        self.sizes = dict(sizes)
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, picture_id, size=None):
+        name = picture_id if size is None else f'{picture_id}-{size}.jpg'
+        return os.path.join(self.root, picture_id[:2], name)
+
+    # ---- uploads ----
+    def save(self, stream):
+        """Store the image read from `stream`.
+
+        Returns {'id', 'url', 'sizes', 'content_type', 'bytes', 'created'};
+        created is False when the same content was already stored. Raises
+        PictureError (413 too large, 415 not an allowed image, 422 unreadable).
+        """
+        digest = hashlib.sha256()
+        size, head, mimetype = 0, b'', None
+        fd, temp_path = tempfile.mkstemp(dir=self.root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                while True:
+                    chunk = stream.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise PictureError(f'picture is larger than {self.max_bytes // (1024 * 1024)} MB', 413)
+                    if mimetype is None:
+                        head += chunk[:SNIFF_BYTES - len(head)]
+                        if len(head) == SNIFF_BYTES:
+                            mimetype = sniff(head)
+                            if mimetype is None:
+                                raise PictureError('picture must be a PNG, JPEG or GIF image', 415)
+                    digest.update(chunk)
+                    out.write(chunk)
+            mimetype = mimetype or sniff(head)
+            if mimetype is None:
+                raise PictureError('picture must be a PNG, JPEG or GIF image', 415)
+
+            picture_id = digest.hexdigest()
+            path = self._path(picture_id)
+            created = not os.path.exists(path)
+            if created:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Resized before the original is published, so an unreadable
+                # image is never stored
+                self._render_sizes(temp_path, picture_id)
+                os.replace(temp_path, path)
+                temp_path = None
+        except PictureError:
+            uploads.inc(1, 'rejected')
+            upload_bytes.inc(size, 'rejected')
+            raise
+        finally:
+            if temp_path is not None:
+                os.unlink(temp_path)
+
+        result = 'stored' if created else 'deduplicated'
+        uploads.inc(1, result)
+        upload_bytes.inc(size, result)
+        return {'id': picture_id, 'url': picture_url(picture_id),
+                'sizes': {name: picture_url(picture_id, name) for name in self.sizes},
+                'content_type': mimetype, 'bytes': size, 'created': created}
+
+    def _render_sizes(self, source, picture_id, names=None):
+        """Write the square JPEG copies of `source` (all sizes, or `names`)"""
+        if Image is None:
+            return
+        names = list(self.sizes) if names is None else names
+        try:
+            with Image.open(source) as image:
+                if image.width * image.height > MAX_PIXELS:
+                    raise PictureError(f'picture has more than {MAX_PIXELS // 1_000_000} megapixels', 422)
+                # JPEG: decode straight at 1/2..1/8 scale when the largest size allows
+                largest = max(self.sizes[name] for name in names)
+                image.draft('RGB', (largest, largest))
+                image = _flatten(ImageOps.exif_transpose(image))
+        except PictureError:
+            raise
+        except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+            raise PictureError('picture could not be read as an image', 422)
+        for name in names:
+            edge = self.sizes[name]
+            variant = ImageOps.fit(image, (edge, edge), Image.LANCZOS)
+            path = self._path(picture_id, name)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.resize-')
+            try:
+                with os.fdopen(fd, 'wb') as out:
+                    variant.save(out, 'JPEG', quality=JPEG_QUALITY, optimize=True)
+                os.replace(temp_path, path)  # Atomic: concurrent renders just overwrite each other
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+    # ---- lookups ----
+    def find(self, ref, size=None):
+        """(path, content type) of a stored picture, resized to `size` when
+        given and Pillow is installed; None if it is not stored"""
+        picture = picture_id(ref)
+        if picture is None:
+            return None
+        original = self._path(picture)
+        if size is not None and Image is not None:
+            path = self._path(picture, size)
+            if os.path.exists(path):
+                return path, 'image/jpeg'
+            if not os.path.exists(original):
+                return None
+            # A size added after the upload: rendered on first use, then kept
+            log.info('rendering missing picture size', picture_id=picture, size=size)
+            self._render_sizes(original, picture, [size])
+            return path, 'image/jpeg'
+        try:
+            with open(original, 'rb') as f:
+                return original, sniff(f.read(SNIFF_BYTES))
+        except FileNotFoundError:
+            return None
+
+    def path(self, ref, size):
+        """Local file of the resized picture for templates, or None (not
+        stored, or Pillow missing: full-size originals are never embedded)"""
+        if Image is None:
+            return None
+        found = self.find(ref, size)
+        return found[0] if found else None
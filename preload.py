@@ -0,0 +1,81 @@
+"""
+Deferred heavy imports and pre-fork warm-up for Smart Resume
+
+Handlers import the PDF stack lazily (xhtml2pdf alone takes ~0.85 s to
+import), so `import simple_app` stays around 0.2 s and a fresh worker
+passes health checks quickly. The cost then moves to the first PDF
+request of every worker. preload() pays it once, up front:
+
+    preload.preload()        # returns {module: seconds}
+    preload.warm_up(app)     # returns {step: seconds}
+
+warm_up() does the rest of the first-request work: one throwaway render
+that touches every section of the resume template (xhtml2pdf's default
+CSS, reportlab's fonts, the html5lib tree builder) and, given a Flask
+app, compiling its Jinja templates.
+
+gunicorn.conf.py calls both in the master before any worker is forked and
+then gc.freeze()s the heap, so the workers share these pages copy-on-write
+instead of each building a private copy. PRELOAD=0 skips all of it.
+"""
+import importlib
+import os
+import sys
+import time
+
+# Imported lazily by the request path; slowest first
+HEAVY_MODULES = (
+    'xhtml2pdf.pisa',
+    'xhtml2pdf.document',
+    'reportlab.pdfgen.canvas',
+    'html5lib',
+    'bcrypt'
+)
+
+# Fills every section of pdf_render's template, so every style is parsed
+WARM_UP_RESUME = {
+    'full_name': 'Warm Up',
+    'email': 'warm-up@example.com',
+    'phone': '+1 555 0100',
+    'address': 'Remote',
+    'linkedin': 'https://www.linkedin.com/in/warm-up',
+    'summary': 'Summary',
+    'education': 'Education',
+    'experience': 'Experience',
+    'projects': 'Projects',
+    'skills': 'Python, Flask'
+}
+
+
+def enabled():
+    return os.environ.get('PRELOAD', '1') != '0'
+
+
+def preload(modules=HEAVY_MODULES):
+    """Import `modules` now; returns the seconds each took (0 if already loaded)"""
+    timings = {}
+    for name in modules:
+        if name in sys.modules:
+            timings[name] = 0.0
+            continue
+        started = time.perf_counter()
+        importlib.import_module(name)
+        timings[name] = time.perf_counter() - started
+    return timings
+
+
+def warm_up(app=None):
+    """Render a throwaway PDF and compile `app`'s Jinja templates; returns {step: seconds}"""
+    from pdf_render import render_resume_pdf
+
+    timings = {}
+    started = time.perf_counter()
+    render_resume_pdf(WARM_UP_RESUME)
+    timings['pdf_render'] = time.perf_counter() - started
+
+    if app is not None:
+        started = time.perf_counter()
+        for name in app.jinja_env.list_templates():
+            app.jinja_env.get_template(name)
+        timings['jinja_templates'] = time.perf_counter() - started
+    return timings
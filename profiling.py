@@ -0,0 +1,237 @@
+"""
+Opt-in request profiling for Smart Resume
+
+Slow requests ("PDF download took 10 seconds") are hard to reproduce, so
+they can be profiled while they happen. A single background thread samples
+the stack of each profiled request every few milliseconds (py-spy style,
+via sys._current_frames()). The request threads themselves only register
+and unregister. The result is written as a collapsed-stack file
+(`frame;frame;frame count` per line), which flamegraph.pl, speedscope and
+inferno read directly.
+
+A request is profiled when any of these applies:
+    - it carries the `X-Profile: 1` header (from an authorised client)
+    - it is picked by PROFILE_SAMPLE_RATE
+    - it takes longer than PROFILE_SLOW_MS (then every request is sampled,
+      and only the slow ones are written)
+
+Requests shorter than the sampling interval (PROFILE_INTERVAL_MS, default
+5 ms) may collect no samples and are not written.
+
+Profiles go to PROFILE_DIR, which keeps at most PROFILE_MAX_FILES files.
+They can be listed and downloaded at /internal/profiles. Access needs the
+X-Admin-Token header to match PROFILE_ADMIN_TOKEN, or, when no token is
+set, a request from localhost.
+
+Nothing is registered unless PROFILE_ENABLED=1.
+"""
+import hmac
+import itertools
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILE_EXTENSION = '.collapsed'
+
+_NAME_RE = re.compile(r'^(\d+)_([\w.-]+)_(\d+)ms_(\d+-\d+)\.collapsed$')
+
+
+def _env_flag(name):
+    return os.environ.get(name, '').lower() in ('1', 'true', 'yes', 'on')
+
+
+class StackSampler:
+    """Samples the stacks of registered threads from one daemon thread"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._targets = {}  # thread id -> Counter of collapsed stacks
+        self._active = threading.Event()
+        self._labels = {}  # code object -> frame label
+        self._thread = None
+        self._pid = None
+
+    def _ensure_running(self):
+        # Also restarts the thread in pre-forked workers
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+            self._thread.start()
+
+    def start(self, thread_id):
+        stacks = Counter()
+        with self._lock:
+            self._ensure_running()
+            self._targets[thread_id] = stacks
+            self._active.set()
+        return stacks
+
+    def stop(self, thread_id):
+        with self._lock:
+            stacks = self._targets.pop(thread_id, Counter())
+            if not self._targets:
+                self._active.clear()
+        return stacks
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = (
+                f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+            )
+        return label
+
+    def _collapse(self, frame):
+        labels = []
+        while frame is not None:
+            labels.append(self._label(frame.f_code))
+            frame = frame.f_back
+        labels.reverse()
+        return ';'.join(labels)
+
+    def _run(self):
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                targets = list(self._targets.items())
+            samples = [(thread_id, stacks, self._collapse(frames[thread_id]))
+                       for thread_id, stacks in targets if thread_id in frames]
+            with self._lock:
+                # Counted under the lock, and only for requests that have not
+                # stopped (stop() hands the Counter to the writer) or restarted
+                for thread_id, stacks, stack in samples:
+                    if self._targets.get(thread_id) is stacks:
+                        stacks[stack] += 1
+
+
+class RequestProfiler:
+    """Flask integration: decides which requests to profile and stores the results"""
+
+    def __init__(self, directory, sample_rate=0.0, slow_ms=0, max_files=50,
+                 interval_ms=5, admin_token=None):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.max_files = max_files
+        self.admin_token = admin_token
+        self.sampler = StackSampler(interval_ms / 1000.0)
+        self._write_lock = threading.Lock()
+        self._sequence = itertools.count()
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            directory=os.environ.get('PROFILE_DIR', 'profiles'),
+            sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', 0)),
+            slow_ms=int(os.environ.get('PROFILE_SLOW_MS', 0)),
+            max_files=int(os.environ.get('PROFILE_MAX_FILES', 50)),
+            interval_ms=int(os.environ.get('PROFILE_INTERVAL_MS', 5)),
+            admin_token=os.environ.get('PROFILE_ADMIN_TOKEN') or None
+        )
+
+    def is_authorised(self, request):
+        if self.admin_token:
+            return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), self.admin_token)
+        return request.remote_addr in ('127.0.0.1', '::1')
+
+    # ---- request hooks ----
+    def before_request(self, request):
+        forced = request.headers.get('X-Profile') == '1' and self.is_authorised(request)
+        keep = forced or (self.sample_rate > 0 and random.random() < self.sample_rate)
+        if not keep and not self.slow_ms:
+            return
+        request.environ['profiling.state'] = (threading.get_ident(), time.perf_counter(), keep)
+        self.sampler.start(threading.get_ident())
+
+    def teardown_request(self, request):
+        state = request.environ.pop('profiling.state', None)
+        if state is None:
+            return
+        thread_id, started, keep = state
+        stacks = self.sampler.stop(thread_id)
+        duration_ms = int((time.perf_counter() - started) * 1000)
+        if stacks and (keep or duration_ms >= self.slow_ms):
+            self.write(request.endpoint or 'unmatched', duration_ms, stacks)
+
+    # ---- storage ----
+    def write(self, endpoint, duration_ms, stacks):
+        """Write one collapsed-stack file and prune the oldest beyond max_files"""
+        name = f'{int(time.time() * 1000)}_{endpoint}_{duration_ms}ms_{os.getpid()}-{next(self._sequence)}{PROFILE_EXTENSION}'
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        with self._write_lock:
+            for old in self.list_profiles()[self.max_files:]:
+                try:
+                    os.remove(os.path.join(self.directory, old['name']))
+                except OSError:
+                    pass
+        return name
+
+    def list_profiles(self):
+        """Profiles newest first, with metadata parsed from the file name"""
+        profiles = []
+        for name in os.listdir(self.directory):
+            match = _NAME_RE.match(name)
+            if not match:
+                continue
+            try:
+                size = os.path.getsize(os.path.join(self.directory, name))
+            except OSError:
+                continue  # Pruned by another worker
+            profiles.append({
+                'name': name,
+                'created_at': int(match.group(1)) / 1000.0,
+                'endpoint': match.group(2),
+                'duration_ms': int(match.group(3)),
+                'size': size
+            })
+        profiles.sort(key=lambda p: p['created_at'], reverse=True)
+        return profiles
+
+
+def init_app(app, profiler=None):
+    """Install the profiler on `app` if PROFILE_ENABLED is set (or a profiler is given)"""
+    if profiler is None:
+        if not _env_flag('PROFILE_ENABLED'):
+            return None
+        profiler = RequestProfiler.from_env()
+
+    from flask import request, jsonify, send_from_directory, abort
+
+    @app.before_request
+    def _start_profile():
+        profiler.before_request(request._get_current_object())
+
+    @app.teardown_request
+    def _finish_profile(exc=None):
+        profiler.teardown_request(request._get_current_object())
+
+    def list_profiles():
+        """Recent request profiles, newest first"""
+        if not profiler.is_authorised(request):
+            abort(403)
+        return jsonify({'profiles': profiler.list_profiles()})
+
+    def download_profile(name):
+        """Download one collapsed-stack profile"""
+        if not profiler.is_authorised(request):
+            abort(403)
+        if not _NAME_RE.match(name):
+            abort(404)
+        return send_from_directory(os.path.abspath(profiler.directory), name,
+                                   mimetype='text/plain', as_attachment=True)
+
+    app.add_url_rule('/internal/profiles', 'list_profiles', list_profiles)
+    app.add_url_rule('/internal/profiles/<name>', 'download_profile', download_profile)
+    app.extensions['request_profiler'] = profiler
+    return profiler
@@ -0,0 +1,192 @@
+"""
+Compact records for the in-memory storage engine
+
+InMemoryStorage used to keep every user, resume and job as the dict the
+API returns. Each of those dicts carries its own hash table of a dozen
+keys plus two 26-character ISO timestamps, which dominates memory once
+there are hundreds of thousands of records (see benchmarks/memory_bench.py).
+
+The records here are slotted dataclasses instead:
+
+- no per-record __dict__; field names live once, on the class
+- timestamps are ints (microseconds since the epoch) and turn back into
+  the exact ISO string storage._now() produced
+- skill names and template types are interned, so every resume rating
+  "Python" points at one string
+- skill_ratings is one flat tuple (skill, rating, skill, rating, ...)
+
+Records never leave the storage engine: to_dict() rebuilds the JSON
+shape every other backend returns, so handlers cannot tell the engines
+apart, and a caller mutating the dict it got back cannot corrupt storage.
+"""
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def to_timestamp(value):
+    """Naive ISO-8601 string -> int microseconds since the epoch.
+
+    Values that would not round-trip to the same string (other formats,
+    time zones, non-strings) are kept as they are.
+    """
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+        if parsed.tzinfo is None and parsed.isoformat() == value:
+            return (parsed - EPOCH) // MICROSECOND
+    return value
+
+
+def from_timestamp(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return (EPOCH + value * MICROSECOND).isoformat()
+    return value
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def pack_ratings(ratings):
+    """skill_ratings dict -> flat tuple of interned skills and their ratings"""
+    if not ratings:
+        return ()
+    return tuple(item for skill, rating in dict(ratings).items() for item in (_intern(skill), rating))
+
+
+def unpack_ratings(packed):
+    return dict(zip(packed[::2], packed[1::2]))
+
+
+@dataclass(slots=True)
+class UserRecord:
+    id: str
+    name: str
+    email: str
+    password: str
+    created_at: object
+
+    @classmethod
+    def from_dict(cls, user):
+        return cls(user['id'], user['name'], user['email'], user['password'],
+                   to_timestamp(user['created_at']))
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'email': self.email,
+            'password': self.password,
+            'created_at': from_timestamp(self.created_at)
+        }
+
+
+@dataclass(slots=True)
+class ResumeRecord:
+    id: str
+    user_id: str
+    full_name: str
+    email: str
+    phone: str
+    linkedin: str
+    address: str
+    summary: str
+    education: str
+    experience: str
+    projects: str
+    skills: str
+    skill_ratings: tuple
+    profile_picture: str
+    template_type: str
+    is_public: bool
+    created_at: object
+    updated_at: object
+    version: int = 0
+
+    @classmethod
+    def from_dict(cls, resume):
+        """Build a record from a complete resume dict (see storage.resume_from_fields)"""
+        created_at = to_timestamp(resume['created_at'])
+        updated_at = created_at if resume['updated_at'] == resume['created_at'] else to_timestamp(resume['updated_at'])
+        return cls(
+            resume['id'], sys.intern(resume['user_id']), resume['full_name'], resume['email'],
+            resume['phone'], resume['linkedin'], resume['address'], resume['summary'],
+            resume['education'], resume['experience'], resume['projects'], resume['skills'],
+            pack_ratings(resume['skill_ratings']), resume['profile_picture'],
+            _intern(resume['template_type']), resume['is_public'], created_at, updated_at,
+            resume.get('version', 0)
+        )
+
+    def get(self, field):
+        """One RESUME_FIELDS value in its API form"""
+        value = getattr(self, field)
+        return unpack_ratings(value) if field == 'skill_ratings' else value
+
+    def set(self, field, value):
+        """Assign one RESUME_FIELDS value, compacting it like from_dict does"""
+        if field == 'skill_ratings':
+            value = pack_ratings(value)
+        elif field == 'template_type':
+            value = _intern(value)
+        setattr(self, field, value)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'user_id': self.user_id,
+            'full_name': self.full_name,
+            'email': self.email,
+            'phone': self.phone,
+            'linkedin': self.linkedin,
+            'address': self.address,
+            'summary': self.summary,
+            'education': self.education,
+            'experience': self.experience,
+            'projects': self.projects,
+            'skills': self.skills,
+            'skill_ratings': unpack_ratings(self.skill_ratings),
+            'profile_picture': self.profile_picture,
+            'template_type': self.template_type,
+            'is_public': self.is_public,
+            'version': self.version,
+            'created_at': from_timestamp(self.created_at),
+            'updated_at': from_timestamp(self.updated_at)
+        }
+
+
+@dataclass(slots=True)
+class JobRecord:
+    id: str
+    job_title: str
+    company: str
+    required_skills: tuple
+    created_at: object
+    updated_at: object
+    apply_url: str = None
+
+    @classmethod
+    def from_dict(cls, job):
+        created_at = to_timestamp(job['created_at'])
+        updated_at = created_at if job['updated_at'] == job['created_at'] else to_timestamp(job['updated_at'])
+        return cls(job['id'], job['job_title'], job['company'],
+                   tuple(_intern(skill) for skill in job['required_skills']),
+                   created_at, updated_at, job.get('applyUrl'))
+
+    def to_dict(self):
+        job = {
+            'id': self.id,
+            'job_title': self.job_title,
+            'company': self.company,
+            'required_skills': list(self.required_skills),
+            'created_at': from_timestamp(self.created_at),
+            'updated_at': from_timestamp(self.updated_at)
+        }
+        if self.apply_url:
+            job['applyUrl'] = self.apply_url
+        return job
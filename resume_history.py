@@ -0,0 +1,337 @@
+"""
+Resume version history stored as compact deltas
+
+update_resume() and patch_resume() overwrite the previous text, so a
+section deleted by mistake could not be brought back. ResumeHistory wraps
+a StorageBackend and records every change to the long text sections
+(HISTORY_FIELDS) as a numbered revision:
+
+    history = resume_history.ResumeHistory(instrument_storage(create_storage()))
+    storage = write_behind.wrap(history)
+
+- Revision 0 is a full snapshot, taken at create_resume() (or just before
+  the first edit of a resume created before history existed).
+- Every later revision stores, for each field it changed, a character
+  delta against the previous revision: copy n / skip n / insert "text".
+  An edit touches one or a few spots, so a delta stays a few dozen bytes
+  however long the section is.
+- Every SNAPSHOT_EVERY-th revision is a full snapshot again. Rebuilding
+  revision n reads the snapshot at n - n % SNAPSHOT_EVERY and replays the
+  deltas after it: at most SNAPSHOT_EVERY revisions, whatever the length
+  of the history.
+- Payloads are JSON, zlib-compressed.
+
+Revisions are numbered per resume (seq), separately from the resume's
+version, and storage rejects a duplicate seq: two workers appending at
+once cannot fork the chain, the loser reloads the head and retries. Each
+revision records the resume version it produced. Behind the write-behind
+buffer, one flush of coalesced autosaves is one revision. async_api.py
+records through ExecutorStorage; on MongoDB it writes through Motor, and
+those writes are not recorded.
+
+The head (text of the latest revision) of recently edited resumes is
+cached per process, so recording an edit costs a diff and one insert.
+
+Environment
+-----------
+    RESUME_HISTORY_SNAPSHOT_EVERY   revisions between full snapshots
+                                    (default 50)
+    RESUME_HISTORY_CACHE            resumes whose head text each process
+                                    keeps (default 1024)
+"""
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from difflib import SequenceMatcher
+
+import json_provider
+import metrics
+from app_logging import get_logger
+from storage import _now
+
+log = get_logger(__name__)
+
+HISTORY_FIELDS = ('summary', 'education', 'experience', 'projects', 'skills')
+
+SNAPSHOT_EVERY = max(1, int(os.environ.get('RESUME_HISTORY_SNAPSHOT_EVERY', 50)))
+CACHE_SIZE = int(os.environ.get('RESUME_HISTORY_CACHE', 1024))
+
+# Attempts to append when other writers keep taking the next seq
+APPEND_ATTEMPTS = 3
+
+revisions_recorded = metrics.counter(
+    'resume_history_revisions_total',
+    'Resume history revisions written, by kind (snapshot/delta)',
+    ('kind',)
+)
+revision_bytes = metrics.counter(
+    'resume_history_bytes_total',
+    'Compressed bytes of resume history revisions written, by kind',
+    ('kind',)
+)
+
+
+# ---- deltas ----
+def _common_prefix(a, b):
+    # Binary search on slice comparisons: runs in C, unlike a per-character loop
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _common_suffix(a, b):
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[-mid:] == b[-mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _emit(ops, op):
+    if not op:
+        return
+    last = ops[-1] if ops else None
+    if isinstance(op, str) and isinstance(last, str) or (
+            isinstance(op, int) and isinstance(last, int) and (op > 0) == (last > 0)):
+        ops[-1] = last + op
+    else:
+        ops.append(op)
+
+
+def _diff_into(ops, old, new, by_lines):
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old[prefix:], new[prefix:])
+    _emit(ops, prefix)
+    old, new = old[prefix:len(old) - suffix], new[prefix:len(new) - suffix]
+    if by_lines and '\n' in old and '\n' in new:
+        # Edits in several places: match unchanged lines in between, then
+        # trim each changed block the same way
+        old_lines, new_lines = old.splitlines(True), new.splitlines(True)
+        matcher = SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                _emit(ops, sum(map(len, old_lines[i1:i2])))
+            else:
+                _diff_into(ops, ''.join(old_lines[i1:i2]), ''.join(new_lines[j1:j2]), False)
+    else:
+        _emit(ops, -len(old))
+        _emit(ops, new)
+    _emit(ops, suffix)
+
+
+def diff(old, new):
+    """Ops turning `old` into `new`: n >= 0 copies n characters, -n skips n, a string is inserted"""
+    ops = []
+    _diff_into(ops, old, new, True)
+    return ops
+
+
+def apply(old, ops):
+    """Inverse of diff(): apply(old, diff(old, new)) == new"""
+    parts, position = [], 0
+    for op in ops:
+        if isinstance(op, str):
+            parts.append(op)
+        elif op > 0:
+            parts.append(old[position:position + op])
+            position += op
+        else:
+            position -= op
+    return ''.join(parts)
+
+
+def _text(value):
+    return '' if value is None else str(value)
+
+
+def history_texts(resume):
+    """The HISTORY_FIELDS of a resume dict, as strings"""
+    return {field: _text(resume.get(field)) for field in HISTORY_FIELDS}
+
+
+def _encode(payload):
+    return zlib.compress(json_provider.dumps(payload))
+
+
+def _decode(data):
+    return json_provider.loads(zlib.decompress(data))
+
+
+def replay(revisions):
+    """Texts after `revisions` (consecutive, the first one a snapshot)"""
+    texts = None
+    for revision in revisions:
+        payload = _decode(revision['data'])
+        if revision['kind'] == 'snapshot':
+            texts = dict.fromkeys(HISTORY_FIELDS, '')
+            texts.update(payload)
+        else:
+            for field, ops in payload.items():
+                texts[field] = apply(texts[field], ops)
+    return texts
+
+
+class ResumeHistory:
+    """StorageBackend proxy that records resume text changes as revisions"""
+
+    def __init__(self, storage, snapshot_every=SNAPSHOT_EVERY, cache_size=CACHE_SIZE):
+        self.storage = storage
+        self.name = storage.name
+        self.snapshot_every = snapshot_every
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._heads = OrderedDict()  # resume_id -> (seq, texts), least recently used first
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    # ---- head cache ----
+    def _cached_head(self, resume_id):
+        with self._lock:
+            head = self._heads.get(resume_id)
+            if head is not None:
+                self._heads.move_to_end(resume_id)
+            return head
+
+    def _cache(self, resume_id, head):
+        with self._lock:
+            self._heads[resume_id] = head
+            self._heads.move_to_end(resume_id)
+            while len(self._heads) > self.cache_size:
+                self._heads.popitem(last=False)
+
+    def _forget(self, resume_id):
+        with self._lock:
+            self._heads.pop(resume_id, None)
+
+    def _head(self, resume_id, user_id):
+        """(seq, texts) of the latest revision; records revision 0 from the
+        stored resume if there is none. None if the resume does not exist."""
+        head = self._cached_head(resume_id)
+        if head is not None:
+            return head
+        for _ in range(APPEND_ATTEMPTS):
+            latest = self.storage.list_resume_revisions(resume_id, limit=1)
+            if latest:
+                seq = latest[0]['seq']
+                texts = self.texts_at(resume_id, seq)
+                if texts is None:  # Deleted meanwhile
+                    return None
+                head = (seq, texts)
+                self._cache(resume_id, head)
+                return head
+            resume = self.storage.get_resume(resume_id, user_id)
+            if resume is None:
+                return None
+            head = self._append(resume_id, 0, resume['version'], 'snapshot', HISTORY_FIELDS, history_texts(resume))
+            if head is not None:
+                return head
+        return None
+
+    # ---- recording ----
+    def _append(self, resume_id, seq, version, kind, fields, payload, texts=None):
+        data = _encode(payload)
+        revision = {'seq': seq, 'version': version, 'kind': kind, 'fields': list(fields),
+                    'data': data, 'created_at': _now()}
+        if not self.storage.add_resume_revision(resume_id, revision):
+            self._forget(resume_id)
+            return None
+        revisions_recorded.inc(1, kind)
+        revision_bytes.inc(len(data), kind)
+        head = (seq, payload if texts is None else texts)
+        self._cache(resume_id, head)
+        return head
+
+    def _record(self, resume_id, user_id, head, values, version):
+        """Append a revision for the HISTORY_FIELDS in `values` that differ from `head`"""
+        for _ in range(APPEND_ATTEMPTS):
+            if head is None:
+                return
+            seq, texts = head
+            changed = {field: _text(values[field]) for field in HISTORY_FIELDS
+                       if field in values and _text(values[field]) != texts[field]}
+            if not changed:
+                return
+            new_texts = dict(texts, **changed)
+            seq += 1
+            if seq % self.snapshot_every == 0:
+                appended = self._append(resume_id, seq, version, 'snapshot', changed, new_texts)
+            else:
+                delta = {field: diff(texts[field], text) for field, text in changed.items()}
+                appended = self._append(resume_id, seq, version, 'delta', changed, delta, new_texts)
+            if appended is not None:
+                return
+            head = self._head(resume_id, user_id)  # Another writer appended first
+        log.warning('resume history append kept conflicting; edit not recorded', resume_id=resume_id)
+
+    @staticmethod
+    def _touches_history(fields):
+        return any(field in fields for field in HISTORY_FIELDS)
+
+    def create_resume(self, user_id, fields):
+        resume = self.storage.create_resume(user_id, fields)
+        if resume is not None:
+            self._append(resume['id'], 0, resume.get('version', 0), 'snapshot', HISTORY_FIELDS,
+                         history_texts(resume))
+        return resume
+
+    def update_resume(self, resume_id, user_id, fields):
+        head = self._head(resume_id, user_id) if self._touches_history(fields) else None
+        resume = self.storage.update_resume(resume_id, user_id, fields)
+        if resume is not None and head is not None:
+            self._record(resume_id, user_id, head, resume, resume['version'])
+        return resume
+
+    def patch_resume(self, resume_id, user_id, changes, expected_version=None):
+        head = self._head(resume_id, user_id) if self._touches_history(changes) else None
+        result = self.storage.patch_resume(resume_id, user_id, changes, expected_version)
+        if result is not None and head is not None and result['changed']:
+            values = {field: changes[field] for field in result['changed']}
+            self._record(resume_id, user_id, head, values, result['version'])
+        return result
+
+    def bulk_patch_resumes(self, writes):
+        heads = {write['id']: self._head(write['id'], write['user_id'])
+                 for write in writes if self._touches_history(write['changes'])}
+        written = self.storage.bulk_patch_resumes(writes)
+        applied = set(written)  # Not resumes deleted meanwhile, nor writes the engine rejected
+        for write in writes:
+            head = heads.get(write['id'])
+            if head is not None and write['id'] in applied:
+                self._record(write['id'], write['user_id'], head, write['changes'], write.get('version'))
+        return written
+
+    def delete_resume(self, resume_id, user_id):
+        deleted = self.storage.delete_resume(resume_id, user_id)
+        if deleted:
+            self._forget(resume_id)
+        return deleted
+
+    # ---- reading ----
+    def revisions(self, resume_id, limit=None, before_seq=None):
+        """Revision metadata, newest first (see StorageBackend.list_resume_revisions)"""
+        return self.storage.list_resume_revisions(resume_id, limit, before_seq)
+
+    def texts_at(self, resume_id, seq):
+        """{field: text} as of revision `seq`, or None if there is no such revision"""
+        if seq < 0:
+            return None
+        base = seq - seq % self.snapshot_every
+        revisions = self.storage.get_resume_revisions(resume_id, base, seq)
+        if not revisions or revisions[-1]['seq'] != seq:
+            return None
+        if revisions[0]['seq'] != base or revisions[0]['kind'] != 'snapshot':
+            # Written with another RESUME_HISTORY_SNAPSHOT_EVERY: replay from revision 0
+            revisions = self.storage.get_resume_revisions(resume_id, 0, seq)
+            start = max(i for i, revision in enumerate(revisions) if revision['kind'] == 'snapshot')
+            revisions = revisions[start:]
+        return replay(revisions)
@@ -0,0 +1,443 @@
+"""
+Resume import: fields extracted from an uploaded PDF or DOCX resume
+
+Users retyped their whole CV into the editor. POST /api/resumes/import
+takes the file and answers 202 with a job id straight away; the parsing
+runs on a bounded pool of worker processes, and the editor polls
+GET /api/resumes/import/<job_id> for the fields to pre-fill:
+
+    importer = ResumeImporter(cache)
+    job = importer.submit(user_id, data, skills)   # {'id', 'status': 'queued', ...}
+    job = importer.status(job['id'], user_id)      # ... 'done' with 'result', or 'failed' with 'error'
+
+Parsing a resume (parse_resume) is three steps:
+
+- Text extraction: pypdf for PDF (installed with xhtml2pdf), python-docx
+  for DOCX (paragraphs and table cells, in document order).
+- Segmentation: lines that name a section ("Work Experience",
+  "EDUCATION", "Skills:") switch the section the following lines go to;
+  the contact block before the first one gives the name, email, phone and
+  LinkedIn URL.
+- Skill detection: SKILL_DICTIONARY plus the skills the job catalogue
+  asks for, matched as whole words across the document.
+
+Extraction holds the GIL for tens of milliseconds per page, so it runs in
+WORKERS forked processes (as PDF rendering does in async_api.py) and never
+on a request thread. At most MAX_PENDING files wait or run per process;
+beyond that submit() refuses with 503 rather than queueing without bound.
+Job status lives in the app cache (shared_cache.py), so with the shared
+cache any worker process can answer the poll.
+
+Environment
+-----------
+    RESUME_IMPORT_WORKERS   parsing processes (default: one per core)
+    RESUME_IMPORT_QUEUE     files queued or parsing per app process
+                            (default 4 per worker)
+    RESUME_IMPORT_MAX_MB    largest accepted file (default 10)
+"""
+import io
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+import metrics
+from app_logging import get_logger
+from storage import _now
+
+log = get_logger(__name__)
+
+WORKERS = int(os.environ.get('RESUME_IMPORT_WORKERS', os.cpu_count() or 1))
+MAX_PENDING = int(os.environ.get('RESUME_IMPORT_QUEUE', WORKERS * 4))
+MAX_BYTES = int(os.environ.get('RESUME_IMPORT_MAX_MB', 10)) * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+JOB_TTL = 3600  # Seconds a finished job can still be polled
+MAX_PAGES = 20  # A CV is a few pages; longer PDFs are not parsed past this
+
+# Lengths of the models.Resume string fields that have one
+FIELD_LIMITS = {'full_name': 100, 'phone': 20, 'summary': 1000}
+
+SKILL_DICTIONARY = (
+    # Languages
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'C', 'C++', 'C#', 'Go', 'Rust', 'Ruby', 'PHP', 'Swift',
+    'Kotlin', 'Scala', 'R', 'MATLAB', 'Perl', 'Elixir', 'Haskell', 'Dart', 'Objective-C', 'SQL', 'Bash',
+    'PowerShell', 'HTML', 'CSS', 'Sass',
+    # Frameworks and libraries
+    'React', 'Angular', 'Vue.js', 'Next.js', 'Node.js', 'Express.js', 'Django', 'Flask', 'FastAPI',
+    'Spring', 'Spring Boot', 'Ruby on Rails', 'Laravel', '.NET', 'ASP.NET', 'jQuery', 'Redux', 'GraphQL',
+    'REST APIs', 'gRPC', 'Bootstrap', 'Tailwind CSS', 'Pandas', 'NumPy', 'SciPy', 'scikit-learn',
+    'TensorFlow', 'PyTorch', 'Keras', 'Spark', 'Hadoop', 'Airflow', 'Celery', 'React Native', 'Flutter',
+    # Data stores
+    'PostgreSQL', 'MySQL', 'SQLite', 'MongoDB', 'Redis', 'Elasticsearch', 'Cassandra', 'DynamoDB',
+    'Oracle', 'SQL Server', 'Snowflake', 'BigQuery', 'Kafka', 'RabbitMQ',
+    # Infrastructure and tools
+    'AWS', 'Azure', 'GCP', 'Google Cloud', 'Docker', 'Kubernetes', 'Terraform', 'Ansible', 'Jenkins',
+    'GitHub Actions', 'GitLab CI', 'CI/CD', 'Git', 'Linux', 'Nginx', 'Microservices', 'Serverless',
+    'Prometheus', 'Grafana', 'Jira', 'Figma', 'Photoshop', 'Excel', 'Tableau', 'Power BI',
+    # Practices and fields
+    'Machine Learning', 'Deep Learning', 'Data Analysis', 'Data Science', 'NLP', 'Computer Vision',
+    'API Development', 'Unit Testing', 'TDD', 'Agile', 'Scrum', 'Kanban', 'DevOps', 'UI/UX',
+    'Project Management', 'Product Management', 'Leadership', 'Communication', 'Mentoring',
+)
+
+# Dictionary entries that are also ordinary words or letters ("go", "R"):
+# only counted inside a Skills section
+SKILLS_SECTION_ONLY = frozenset({'C', 'R', 'Go', 'Swift', 'Rust', 'Spring', 'Dart', 'Excel', 'Oracle',
+                                 'Leadership', 'Communication'})
+
+# Section headings as they appear on CVs, lowercased, mapped to the
+# models.Resume field they fill; None drops the section's lines
+SECTION_HEADINGS = {
+    'summary': 'summary', 'professional summary': 'summary', 'career summary': 'summary',
+    'profile': 'summary', 'professional profile': 'summary', 'personal profile': 'summary',
+    'about': 'summary', 'about me': 'summary', 'objective': 'summary', 'career objective': 'summary',
+    'education': 'education', 'education and training': 'education', 'academic background': 'education',
+    'qualifications': 'education', 'certifications': 'education', 'education and certifications': 'education',
+    'experience': 'experience', 'work experience': 'experience', 'professional experience': 'experience',
+    'employment': 'experience', 'employment history': 'experience', 'work history': 'experience',
+    'career history': 'experience', 'relevant experience': 'experience',
+    'projects': 'projects', 'personal projects': 'projects', 'selected projects': 'projects',
+    'key projects': 'projects', 'projects portfolio': 'projects', 'side projects': 'projects',
+    'skills': 'skills', 'technical skills': 'skills', 'core skills': 'skills', 'key skills': 'skills',
+    'core competencies': 'skills', 'competencies': 'skills', 'technologies': 'skills',
+    'tools and technologies': 'skills', 'skills and tools': 'skills',
+    'interests': None, 'hobbies': None, 'hobbies and interests': None, 'references': None,
+    'languages': None, 'publications': None, 'awards': None, 'volunteering': None,
+}
+SECTIONS = ('summary', 'education', 'experience', 'projects', 'skills')
+
+_EMAIL = re.compile(r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+')
+_PHONE = re.compile(r'(?:\+|\(\+?)?\d[\d ().-]{6,}\d')
+_LINKEDIN = re.compile(r'(?:https?://)?(?:[a-z]{2,3}\.)?linkedin\.com/[^\s|,;]+', re.IGNORECASE)
+_BULLET = re.compile(r'^\s*[•●▪■◦·*–-]\s*')
+_NAME = re.compile(r"[^\W\d_][^\W\d_.'-]*(?:[ .'-]+[^\W\d_][^\W\d_.'-]*){1,4}\.?")
+_SKILL_SEPARATORS = re.compile(r'[,;|\n•●▪■◦·]')
+
+imports = metrics.counter(
+    'resume_imports_total',
+    'Resume file imports by result (done/failed/rejected/busy)',
+    ('result',)
+)
+parse_latency = metrics.histogram(
+    'resume_import_parse_seconds',
+    'Time to extract and segment an imported resume in a worker, by format',
+    ('format',)
+)
+
+
+class ResumeImportError(ValueError):
+    """The file was refused; `status` is the HTTP status to answer with"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def sniff(data):
+    """'pdf' or 'docx' from a file's first bytes, or None"""
+    if data.startswith(b'%PDF-'):
+        return 'pdf'
+    if data.startswith(b'PK\x03\x04'):  # A zip; python-docx checks it is a Word document
+        return 'docx'
+    return None
+
+
+def read_upload(stream, max_bytes=MAX_BYTES):
+    """The whole upload from `stream`; ResumeImportError 413 beyond `max_bytes`"""
+    data = bytearray()
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return bytes(data)
+        data += chunk
+        if len(data) > max_bytes:
+            raise ResumeImportError(f'resume file is larger than {max_bytes // (1024 * 1024)} MB', 413)
+
+
+# ---- parsing (runs in the worker processes) ----
+def extract_text(data, kind):
+    """(text, pages) of a PDF or DOCX file; ResumeImportError 422 if unreadable"""
+    if kind == 'pdf':
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            raise ResumeImportError('PDF import needs pypdf (pip install pypdf)', 422)
+        try:
+            reader = PdfReader(io.BytesIO(data))
+            if reader.is_encrypted:
+                raise ResumeImportError('the PDF is password protected', 422)
+            pages = reader.pages[:MAX_PAGES]
+            return '\n'.join(page.extract_text() or '' for page in pages), len(pages)
+        except ResumeImportError:
+            raise
+        except Exception:  # pypdf raises a wide range of errors on damaged files
+            raise ResumeImportError('the file could not be read as a PDF', 422)
+    from docx import Document
+    try:
+        document = Document(io.BytesIO(data))
+    except Exception:
+        raise ResumeImportError('the file could not be read as a DOCX document', 422)
+    lines = []
+    for block in document.element.body.iterchildren():
+        tag = block.tag.rsplit('}', 1)[-1]
+        if tag == 'p':
+            lines.append(''.join(node.text or '' for node in block.iter() if node.tag.endswith('}t')))
+        elif tag == 'tbl':  # Two-column CV layouts: read each cell as its own lines
+            for cell in block.iter():
+                if cell.tag.endswith('}tc'):
+                    for paragraph in cell.iter():
+                        if paragraph.tag.endswith('}p'):
+                            lines.append(''.join(node.text or '' for node in paragraph.iter()
+                                                 if node.tag.endswith('}t')))
+    return '\n'.join(lines), None
+
+
+def _heading(line):
+    """(field or None, rest of the line) if `line` starts a section, else False"""
+    label, colon, rest = line.partition(':')
+    key = re.sub(r'[^a-z ]+', ' ', label.lower().replace('&', ' and ')).split()
+    key = ' '.join(key)
+    if key in SECTION_HEADINGS and (len(line) <= 40 or colon):
+        return SECTION_HEADINGS[key], rest.strip()
+    return False
+
+
+def _header_fields(lines, text):
+    """Name and contact details from the lines before the first section"""
+    fields = {}
+    header = '\n'.join(lines)
+    for field, pattern in (('email', _EMAIL), ('phone', _PHONE), ('linkedin', _LINKEDIN)):
+        match = pattern.search(header) or (field != 'phone' and pattern.search(text))
+        if match:
+            fields[field] = match.group(0).strip()
+    if 'linkedin' in fields and not fields['linkedin'].lower().startswith('http'):
+        fields['linkedin'] = 'https://' + fields['linkedin']
+    for line in lines:
+        if _NAME.fullmatch(line) and not _heading(line):
+            fields['full_name'] = line.title() if line.isupper() else line
+            break
+    # Without a Summary heading, the prose under the contact block is the summary
+    prose = [line for line in lines if len(line) > 60 and not any(
+        pattern.search(line) for pattern in (_EMAIL, _PHONE, _LINKEDIN))]
+    if prose:
+        fields['summary'] = ' '.join(prose)
+    return fields
+
+
+def segment(text):
+    """{field: text} for the RESUME_FIELDS found in a resume's text"""
+    header, sections, current = [], {field: [] for field in SECTIONS}, 'header'
+    for raw in text.splitlines():
+        line = ' '.join(_BULLET.sub('- ', raw).split())
+        if not line:
+            continue
+        heading = _heading(line)
+        if heading is not False:
+            current, rest = heading
+            if rest and current:
+                sections[current].append(rest)
+            continue
+        if current == 'header':
+            header.append(line)
+        elif current:
+            sections[current].append(line)
+    fields = _header_fields(header, text)
+    for field, lines in sections.items():
+        if lines:
+            fields[field] = '\n'.join(lines)
+    for field, limit in FIELD_LIMITS.items():
+        if field in fields:
+            fields[field] = fields[field][:limit].strip()
+    return fields
+
+
+@lru_cache(maxsize=8)
+def _skill_patterns(dictionary):
+    """(everywhere, skills section) regexes and the canonical spelling of each skill"""
+    canonical = {skill.lower(): skill for skill in dictionary}
+
+    def compile_for(skills):
+        # Longest first, so "Spring Boot" wins over "Spring"
+        alternatives = '|'.join(re.escape(skill) for skill in sorted(skills, key=len, reverse=True))
+        return re.compile(rf'(?<![\w+#.])(?:{alternatives})(?![\w+#]|\.\w)', re.IGNORECASE)
+
+    anywhere = compile_for([skill for skill in canonical.values() if skill not in SKILLS_SECTION_ONLY])
+    return anywhere, compile_for(canonical.values()), canonical
+
+
+def _dictionary(extra_skills):
+    return tuple(dict.fromkeys(SKILL_DICTIONARY + tuple(extra_skills)))
+
+
+def detect_skills(fields, extra_skills=()):
+    """Dictionary skills named in the resume, in order of first mention"""
+    anywhere, in_section, canonical = _skill_patterns(_dictionary(extra_skills))
+    found = {}
+    for field in SECTIONS:
+        pattern = in_section if field == 'skills' else anywhere
+        for match in pattern.finditer(fields.get(field, '')):
+            found.setdefault(canonical[match.group(0).lower()], None)
+    return list(found)
+
+
+def _listed_skills(section, extra_skills=()):
+    """Items of a Skills section: "Languages: Python, Go" -> ['Python', 'Go']"""
+    _, in_section, canonical = _skill_patterns(_dictionary(extra_skills))
+    items = []
+    for part in _SKILL_SEPARATORS.split(section):
+        part = _BULLET.sub('', part.rpartition(':')[2]).strip(' .')
+        known = [canonical[match.group(0).lower()] for match in in_section.finditer(part)]
+        if len(known) > 1 and not in_section.sub('', part).strip(' /&-'):
+            items.extend(known)  # Skills set side by side without separators ("Python Go Docker")
+        elif part and len(part) <= 40 and len(part.split()) <= 4:
+            items.append(canonical.get(part.lower(), part))
+    return list(dict.fromkeys(items))
+
+
+def parse_resume(data, skills=()):
+    """Resume fields from a PDF or DOCX file; the pool's task.
+
+    Returns {'resume': {field: text}, 'detected_skills', 'sections',
+    'format', 'pages', 'characters', 'parse_seconds'}.
+    """
+    started = time.perf_counter()
+    kind = sniff(data)
+    if kind is None:
+        raise ResumeImportError('resume must be a PDF or DOCX file', 415)
+    text, pages = extract_text(data, kind)
+    if not text.strip():
+        raise ResumeImportError('no text found in the file (a scanned image?)', 422)
+    fields = segment(text)
+    detected = detect_skills(fields, skills)
+    # The Skills section as listed, then the dictionary skills named elsewhere
+    listed = _listed_skills(fields.get('skills', ''), skills)
+    seen = {skill.lower() for skill in listed}
+    fields['skills'] = ', '.join(listed + [skill for skill in detected if skill.lower() not in seen])
+    return {'resume': fields, 'detected_skills': detected,
+            'sections': [field for field in SECTIONS if fields.get(field)], 'format': kind, 'pages': pages,
+            'characters': len(text), 'parse_seconds': round(time.perf_counter() - started, 4)}
+
+
+# ---- jobs (in the app process) ----
+class ResumeImporter:
+    """Runs parse_resume() on a process pool and tracks each file as a job"""
+
+    def __init__(self, cache, workers=WORKERS, max_pending=MAX_PENDING, ttl=JOB_TTL):
+        self.cache = cache
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._pool = None
+        self._futures = {}  # job id -> future, for jobs of this process still queued or parsing
+
+    @staticmethod
+    def _key(job_id):
+        return f'resume_import:{job_id}'
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                import multiprocessing
+                # Forked lazily, in the process that serves the requests (not
+                # a gunicorn master), from code that is already imported
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('fork'))
+            return self._pool
+
+    def submit(self, user_id, data, skills=()):
+        """Queue a file for parsing; returns the job. Raises ResumeImportError
+        (415 not a PDF/DOCX, 503 too many files already queued)."""
+        if sniff(data) is None:
+            imports.inc(1, 'rejected')
+            raise ResumeImportError('resume must be a PDF or DOCX file', 415)
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                imports.inc(1, 'busy')
+                raise ResumeImportError('too many resume imports in progress, retry shortly', 503)
+            job = {'id': uuid.uuid4().hex, 'user_id': user_id, 'status': 'queued', 'bytes': len(data),
+                   'created_at': _now()}
+            self._futures[job['id']] = None  # Holds the slot while the pool starts
+        try:
+            self.cache.set(self._key(job['id']), job, ttl=self.ttl)
+            pool = self._executor()
+            try:
+                future = pool.submit(parse_resume, data, tuple(skills))
+            except BrokenProcessPool:
+                self._reset_pool(pool)
+                pool = self._executor()
+                future = pool.submit(parse_resume, data, tuple(skills))
+        except Exception:
+            # Free the slot, or enough of these would answer 503 to every import
+            log.exception('resume import could not be queued', job_id=job['id'])
+            with self._lock:
+                self._futures.pop(job['id'], None)
+            self._fail(job, 'the import could not be started')
+            raise ResumeImportError('resume import is unavailable, retry shortly', 503)
+        with self._lock:
+            self._futures[job['id']] = future
+        future.add_done_callback(lambda done: self._finish(job, done, pool))
+        return job
+
+    def _fail(self, job, error):
+        imports.inc(1, 'failed')
+        try:
+            self.cache.set(self._key(job['id']), dict(job, status='failed', error=error, finished_at=_now()),
+                           ttl=self.ttl)
+        except Exception:
+            log.exception('resume import status not saved', job_id=job['id'])
+
+    def _finish(self, job, future, pool):
+        """Record the outcome; runs on the pool's management thread"""
+        try:
+            result = future.result()
+            job = dict(job, status='done', result=result)
+            parse_latency.observe(result['parse_seconds'], result['format'])
+        except ResumeImportError as e:
+            job = dict(job, status='failed', error=str(e))
+        except BrokenProcessPool:
+            log.error('resume import worker died', job_id=job['id'])
+            self._reset_pool(pool)
+            job = dict(job, status='failed', error='the file could not be parsed')
+        except Exception:
+            log.exception('resume import failed', job_id=job['id'])
+            job = dict(job, status='failed', error='the file could not be parsed')
+        job['finished_at'] = _now()
+        imports.inc(1, job['status'])
+        try:
+            self.cache.set(self._key(job['id']), job, ttl=self.ttl)
+        except Exception:
+            log.exception('resume import status not saved', job_id=job['id'])
+        finally:
+            with self._lock:
+                self._futures.pop(job['id'], None)
+
+    def _reset_pool(self, broken):
+        # A crashed worker breaks the whole pool: replace it for the next file.
+        # Every future of the broken pool lands here; only the first one resets,
+        # and never a pool started since.
+        with self._lock:
+            if self._pool is not broken:
+                return
+            self._pool = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def status(self, job_id, user_id):
+        """The job, if it exists and belongs to `user_id`; 'running' once a worker has it"""
+        job = self.cache.get(self._key(job_id))
+        if job is None or job['user_id'] != user_id:
+            return None
+        with self._lock:
+            future = self._futures.get(job_id)
+        if job['status'] == 'queued' and future is not None and future.running():
+            job['status'] = 'running'
+        return job
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
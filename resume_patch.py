@@ -0,0 +1,109 @@
+"""
+Partial resume updates (PATCH /api/resumes/<id>)
+
+The editor autosaves every few seconds. PUT sends every field and the
+storage engines rewrote all of them; PATCH sends only what the user
+touched, in either of two forms:
+
+    application/merge-patch+json (or application/json), RFC 7396 at the
+    top level only
+        {"summary": "...", "skill_ratings": {"Python": 9, "Go": 6}, "version": 7}
+
+    application/json-patch+json, RFC 6902
+        [{"op": "test", "path": "/version", "value": 7},
+         {"op": "replace", "path": "/summary", "value": "..."}]
+
+Paths name top-level resume fields; null (merge patch) and "remove" reset
+a field to its default. A field given is replaced whole: skill_ratings is
+not merged key by key, so send every rating the resume should keep. Values
+must have the field's type (a string, an object of numbers for
+skill_ratings, a boolean for is_public). `version` (or a "test" of
+/version) makes the update conditional: storage.patch_resume() raises
+ResumeConflict, and the route answers 409, if someone else saved in
+between.
+
+Storage writes only the fields whose value actually changes ($set on
+MongoDB, the changed columns on SQLite). A patch that changes nothing
+keeps version and updated_at, so the resume's ETag and its precompressed
+print view (both keyed on updated_at) stay valid.
+"""
+from storage import RESUME_FIELDS, RESUME_DEFAULTS, check_resume_values
+
+JSON_PATCH_MIMETYPE = 'application/json-patch+json'
+
+# Keys of a GET response a client may echo back unchanged
+READ_ONLY_FIELDS = frozenset({'id', 'user_id', 'created_at', 'updated_at'})
+
+
+class PatchError(ValueError):
+    """The PATCH body is malformed or touches a field that cannot be patched"""
+
+
+def _field(name):
+    if name not in RESUME_FIELDS:
+        raise PatchError(f"'{name}' is not a resume field")
+    return name
+
+
+def _default(name):
+    default = RESUME_DEFAULTS[name]
+    return dict(default) if isinstance(default, dict) else default  # Never hand out the shared {}
+
+
+def _value(name, value):
+    try:
+        check_resume_values({name: value})
+    except ValueError as e:
+        raise PatchError(str(e)) from None
+    return value
+
+
+def _version(value):
+    if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+        raise PatchError('version must be a non-negative integer')
+    return value
+
+
+def _merge_patch(data):
+    changes, expected_version = {}, None
+    for key, value in data.items():
+        if key == 'version':
+            expected_version = _version(value)
+        elif key not in READ_ONLY_FIELDS:
+            field = _field(key)
+            changes[field] = _default(field) if value is None else _value(field, value)
+    return changes, expected_version
+
+
+def _json_patch(operations):
+    changes, expected_version = {}, None
+    for operation in operations:
+        if not isinstance(operation, dict) or not isinstance(operation.get('path'), str):
+            raise PatchError('each JSON Patch operation needs an op and a path')
+        op, path = operation.get('op'), operation['path']
+        name = path[1:].replace('~1', '/').replace('~0', '~')
+        if not path.startswith('/') or '/' in path[1:]:
+            raise PatchError(f"unsupported path '{path}': only top-level fields can be patched")
+        if op == 'test' and name == 'version':
+            expected_version = _version(operation.get('value'))
+        elif op in ('add', 'replace'):
+            if 'value' not in operation:
+                raise PatchError(f"'{op}' needs a value")
+            field = _field(name)
+            changes[field] = _value(field, operation['value'])
+        elif op == 'remove':
+            changes[_field(name)] = _default(name)
+        else:
+            raise PatchError(f"unsupported operation '{op}' on '{path}'")
+    return changes, expected_version
+
+
+def parse(data, mimetype):
+    """Decoded PATCH body -> (changes, expected_version or None)"""
+    if mimetype == JSON_PATCH_MIMETYPE:
+        if not isinstance(data, list):
+            raise PatchError('a JSON Patch body must be an array of operations')
+        return _json_patch(data)
+    if not isinstance(data, dict):
+        raise PatchError('request body must be a JSON object')
+    return _merge_patch(data)
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Demo-data seeding for Smart Resume
+
+Sample jobs used to be created lazily inside GET /api/jobs, which added a
+count query to every listing and raced when the first requests arrived
+together. Seeding now runs once at startup (or from the command line) and
+the job listing is a pure read.
+
+Usage:
+    python seed_data.py            # seed the MongoDB job catalogue
+"""
+import threading
+from datetime import datetime, timedelta
+
+# Sample jobs shown in demo mode and seeded into an empty database.
+# 'days_ago' backdates created_at/updated_at so the list has a stable order.
+SAMPLE_JOBS = [
+    {
+        'job_title': 'Frontend Developer',
+        'company': 'TechCorp Inc.',
+        'required_skills': ['JavaScript', 'React', 'HTML', 'CSS'],
+        'applyUrl': 'https://techcorp.example.com/careers/frontend-developer',
+        'days_ago': 2
+    },
+    {
+        'job_title': 'Python Developer',
+        'company': 'DataSoft Solutions',
+        'required_skills': ['Python', 'Django', 'PostgreSQL', 'API Development'],
+        'days_ago': 1
+    },
+    {
+        'job_title': 'Full Stack Developer',
+        'company': 'Innovation Labs',
+        'required_skills': ['JavaScript', 'Python', 'React', 'Node.js', 'MongoDB'],
+        'days_ago': 0
+    },
+    {
+        'job_title': 'DevOps Engineer',
+        'company': 'CloudTech Systems',
+        'required_skills': ['Docker', 'Kubernetes', 'AWS', 'Python', 'Linux'],
+        'days_ago': 0
+    },
+    {
+        'job_title': 'Data Scientist',
+        'company': 'AI Innovations',
+        'required_skills': ['Python', 'Machine Learning', 'Pandas', 'Scikit-learn', 'SQL'],
+        'days_ago': 0
+    }
+]
+
+_seed_lock = threading.Lock()
+_seeded_backends = set()
+
+
+def sample_jobs(now=None):
+    """Return the sample jobs as job records with created_at/updated_at set"""
+    now = now or datetime.utcnow()
+    records = []
+    for sample in SAMPLE_JOBS:
+        timestamp = (now - timedelta(days=sample['days_ago'])).isoformat()
+        record = {key: value for key, value in sample.items() if key != 'days_ago'}
+        record['required_skills'] = list(sample['required_skills'])
+        record['created_at'] = timestamp
+        record['updated_at'] = timestamp
+        records.append(record)
+    return records
+
+
+def seed_jobs(storage):
+    """Seed a storage backend (see storage.py) with the sample jobs.
+
+    Idempotent and lock-protected: runs at most once per backend in this
+    process, and backends only insert jobs that are not present yet, so
+    concurrent workers and repeated runs never create duplicates.
+    Returns the number of jobs added.
+    """
+    with _seed_lock:
+        if id(storage) in _seeded_backends:
+            return 0
+        added = storage.seed_jobs(sample_jobs())
+        _seeded_backends.add(id(storage))
+    return added
+
+
+if __name__ == "__main__":
+    from app import create_app
+    from storage import MongoStorage
+
+    print("🚀 Seeding sample jobs...")
+    with create_app().app_context():
+        added = seed_jobs(MongoStorage())
+    print(f"✅ Added {added} sample jobs ({len(SAMPLE_JOBS) - added} already present)")
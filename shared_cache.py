@@ -0,0 +1,286 @@
+"""
+Cross-worker cache and session store for Smart Resume
+
+With STORAGE_BACKEND=sqlite several worker processes share one database,
+but Flask's cookie session and any per-process caches still diverge between
+workers. SharedCache keeps small JSON values (sessions, profile summaries,
+job-match results) in a SQLite file that every worker on the host opens,
+with TTLs, a bounded entry count and atomic read-modify-write updates.
+LocalCache offers the same interface for single-process deployments.
+
+Values must be JSON-serialisable.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+DEFAULT_TTL = 300
+DEFAULT_MAX_ENTRIES = 10000
+
+
+class LocalCache:
+    """Process-local LRU cache with per-entry TTL"""
+    shared = False
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+
+    def _expiry(self, ttl):
+        ttl = self.default_ttl if ttl is None else ttl
+        return time.time() + ttl if ttl else None
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        encoded = json.dumps(value)
+        with self._lock:
+            self._entries[key] = (self._expiry(ttl), encoded)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def update(self, key, fn, ttl=None):
+        """Atomically replace the value with fn(current value or None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            current = None
+            if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                current = json.loads(entry[1])
+            value = fn(current)
+            self._entries[key] = (self._expiry(ttl), json.dumps(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return value
+
+    def incr(self, key, amount=1, ttl=None):
+        return self.update(key, lambda value: (value or 0) + amount, ttl)
+
+    def get_or_set(self, key, compute, ttl=None):
+        """Return the cached value, computing and storing it on a miss"""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+SHARED_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL,
+    written_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_cache_written ON cache (written_at);
+"""
+
+
+class SharedCache(LocalCache):
+    """Cache shared by every process on the host through a SQLite file.
+
+    Same interface as LocalCache. Updates run in BEGIN IMMEDIATE
+    transactions, so update()/incr() are atomic across processes. Memory is
+    bounded by evicting expired entries and then the oldest-written ones;
+    the check runs every `evict_every` writes per process, so the table can
+    briefly exceed max_entries by that many entries per worker.
+    """
+    shared = True
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, default_ttl=DEFAULT_TTL,
+                 evict_every=64, busy_timeout_ms=5000):
+        super().__init__(max_entries, default_ttl)
+        self.path = path
+        self.evict_every = evict_every
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._writes = 0
+        self._connection().executescript(SHARED_CACHE_SCHEMA)
+
+    def _connection(self):
+        """Return this thread's connection, reopening it after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def _read(self, conn, key):
+        row = conn.execute(
+            'SELECT value FROM cache WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write(self, conn, key, value, ttl):
+        conn.execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at, written_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), self._expiry(ttl), time.time()))
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        if evict:
+            self._evict(conn)
+
+    def _evict(self, conn):
+        conn.execute('DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),))
+        conn.execute(
+            'DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY written_at '
+            'LIMIT max(0, (SELECT COUNT(*) FROM cache) - ?))', (self.max_entries,))
+
+    def get(self, key, default=None):
+        value = self._read(self._connection(), key)
+        return default if value is None else value
+
+    def set(self, key, value, ttl=None):
+        with self._transaction() as conn:
+            self._write(conn, key, value, ttl)
+
+    def delete(self, key):
+        self._connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def update(self, key, fn, ttl=None):
+        with self._transaction() as conn:
+            value = fn(self._read(conn, key))
+            self._write(conn, key, value, ttl)
+        return value
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+
+
+def create_cache():
+    """Build the cache selected by CACHE_BACKEND (local | shared).
+
+    Defaults to the shared cache when STORAGE_BACKEND=sqlite, since that is
+    the multi-worker setup.
+    """
+    default = 'shared' if os.environ.get('STORAGE_BACKEND', 'memory').lower() == 'sqlite' else 'local'
+    backend = os.environ.get('CACHE_BACKEND', default).lower()
+    max_entries = int(os.environ.get('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES))
+    if backend == 'local':
+        return LocalCache(max_entries)
+    if backend == 'shared':
+        return SharedCache(os.environ.get('SHARED_CACHE_PATH', 'smart_resume_cache.db'), max_entries)
+    raise ValueError(f"Unknown CACHE_BACKEND '{backend}' (expected 'local' or 'shared')")
+
+
+class CachedSession(CallbackDict, SessionMixin):
+    """Server-side session; only its random id travels in the cookie"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+        self.opened_user_id = self.get('user_id')
+        self.stale_sid = None
+
+    def regenerate(self):
+        """Move the session to a new random id (at login); the old one is
+        deleted on save, so an id planted before login never gets the login"""
+        if not self.new and self.stale_sid is None:
+            self.stale_sid = self.sid
+        self.sid = secrets.token_urlsafe(32)
+        self.modified = True
+
+
+class SharedSessionInterface(SessionInterface):
+    """Flask session interface that stores session data in a cache.
+
+    With a SharedCache every worker process sees the same sessions, so a
+    login handled by one worker is honoured by the others.
+    """
+    session_class = CachedSession
+    key_prefix = 'session:'
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _ttl(self, app):
+        return int(app.permanent_session_lifetime.total_seconds())
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            data = self.cache.get(self.key_prefix + sid)
+            if data is not None:
+                return self.session_class(data, sid=sid)
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if session.get('user_id') != session.opened_user_id and not session.new and session.stale_sid is None:
+            session.regenerate()  # Logged in (or switched user) without the route asking for it
+        if session.stale_sid is not None:
+            self.cache.delete(self.key_prefix + session.stale_sid)
+        if not session:
+            if session.modified:
+                self.cache.delete(self.key_prefix + session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+        if not self.should_set_cookie(app, session):
+            return
+        self.cache.set(self.key_prefix + session.sid, dict(session), ttl=self._ttl(app))
+        response.set_cookie(
+            name, session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
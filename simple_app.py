@@ -1,12 +1,36 @@
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for
+from flask import Flask, render_template, jsonify, request, session, redirect, url_for, send_file
 from flask_cors import CORS
+import os
 import bcrypt
-import uuid
+from collections import Counter
 from datetime import datetime
+from seed_data import seed_jobs
+from storage import create_storage, instrument_storage, RESUME_FIELDS, ResumeConflict
+from pdf_render import build_resume_html, render_pdf, PdfRenderError
+from shared_cache import create_cache, SharedSessionInterface, CachedSession
+from app_logging import get_logger
+import compression
+import conditional
+import json_provider
+import metrics
+import pictures
+import profiling
+import resume_import
+import resume_history
+import resume_patch
+import streaming
+import write_behind
 
 app = Flask(__name__)
+log = get_logger(__name__)
 app.secret_key = 'your-secret-key-change-in-production'  # Required for sessions
 CORS(app)
+metrics.instrument_flask(app)  # Request metrics, served at /internal/metrics
+profiling.init_app(app)  # Opt-in with PROFILE_ENABLED=1
+json_provider.init_app(app)  # orjson-backed jsonify (see json_provider.py)
+compression.init_app(app)  # gzip/brotli for large JSON and HTML
+# Bodies read with get_json()/request.files; uploads and imports stream with their own limits
+app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
 
 # Add current_user context processor for templates
 @app.context_processor
@@ -26,10 +50,74 @@ def inject_current_user():
         user_data=user_data
     )
 
-# Simple in-memory storage for testing
-users = []
-resumes = []
-jobs = []
+# In-memory by default; STORAGE_BACKEND=sqlite persists to SQLITE_PATH and
+# lets several worker processes share one database file (see storage.py).
+# Edits to the text sections are kept as revisions (see resume_history.py), and
+# autosave PATCHes are coalesced before they reach the database (see write_behind.py)
+history = resume_history.ResumeHistory(instrument_storage(create_storage()))
+storage = write_behind.wrap(history)
+
+# Uploaded profile pictures, stored once per content hash (see pictures.py)
+picture_store = pictures.PictureStore()
+
+# Seed demo jobs once at startup instead of on the first GET /api/jobs
+seed_jobs(storage)
+
+# Shared between worker processes when STORAGE_BACKEND=sqlite (see shared_cache.py);
+# sessions then live server-side so every worker sees the same logins
+cache = create_cache()
+if cache.shared:
+    app.session_interface = SharedSessionInterface(cache)
+
+PROFILE_CACHE_TTL = 60
+
+# MongoStorage's catalogue_version only tracks this process's writes; re-read
+# after this many seconds to pick up jobs added by other workers
+JOBS_CATALOGUE_TTL = 60
+
+def profile_summary(user_id):
+    """User record plus resume count, cached per user"""
+    def load():
+        user = storage.get_user(user_id)
+        if not user:
+            return None
+        return {
+            'id': user['id'],
+            'name': user['name'],
+            'email': user['email'],
+            'is_admin': user.get('is_admin', False),
+            'created_at': user.get('created_at', datetime.utcnow().isoformat()),
+            'resume_count': storage.count_resumes(user_id)
+        }
+    return cache.get_or_set(f'profile:{user_id}', load, ttl=PROFILE_CACHE_TTL)
+
+def invalidate_profile(user_id):
+    cache.delete(f'profile:{user_id}')
+
+# Parses uploaded CVs on a process pool; job status is kept in the cache
+resume_importer = resume_import.ResumeImporter(cache)
+_import_skills = (None, ())
+
+def catalogue_skills(limit=500):
+    """The skills the job catalogue asks for most, for resume imports to
+    detect alongside resume_import.SKILL_DICTIONARY; rebuilt per catalogue version"""
+    global _import_skills
+    version, skills = _import_skills
+    if version != storage.catalogue_version():
+        version = storage.catalogue_version()
+        counts = Counter(skill for job in storage.list_jobs() for skill in job.get('required_skills') or ())
+        skills = tuple(skill for skill, _ in counts.most_common(limit))
+        _import_skills = (version, skills)
+    return skills
+
+ENGINE_NAMES = {'sqlite': 'SQLite', 'mongodb': 'MongoDB'}
+
+def database_label():
+    if storage.name == 'sqlite':
+        return f"sqlite ({storage.path})"
+    if storage.name == 'mongodb':
+        return "mongodb"
+    return "in-memory (testing mode)"
 
 # Session management
 def get_current_user_id():
@@ -83,7 +171,7 @@ def api_status():
     return jsonify({
         "message": "Smart Resume API is running!",
         "status": "success",
-        "database": "in-memory (testing mode)",
+        "database": database_label(),
         "endpoints": {
             "home": "/",
             "login": "/login",
@@ -99,20 +187,18 @@ def api_status():
 def health():
     return jsonify({
         "status": "healthy",
-        "database": "in-memory (testing mode)"
+        "database": database_label()
     })
 
 @app.route('/test-db')
 def test_db():
     return jsonify({
         "database_status": "working",
-        "mode": "in-memory testing",
+        "mode": database_label(),
         "collections": {
-            "users": f"{len(users)} documents",
-            "resumes": f"{len(resumes)} documents",
-            "jobs": f"{len(jobs)} documents"
+            name: f"{count} documents" for name, count in storage.counts().items()
         },
-        "message": "In-memory database is working fine!"
+        "message": f"{ENGINE_NAMES.get(storage.name, 'In-memory')} database is working fine!"
     })
 
 # Authentication endpoints
@@ -123,50 +209,41 @@ def login():
         email = data.get('email', '').strip().lower()
         password = data.get('password', '')
         
-        print(f"=== LOGIN ATTEMPT ===")
-        print(f"Email: {email}")
-        print(f"Total users in system: {len(users)}")
-        
         # Validate input
         if not email or not password:
             return jsonify({'message': 'Email and password are required'}), 400
         
         # Find user by email
-        user = None
-        for u in users:
-            if u['email'].lower() == email:
-                user = u
-                break
+        user = storage.get_user_by_email(email)
         
         if not user:
-            print(f"User not found with email: {email}")
-            print("Creating demo user for direct login...")
             # Create a demo user automatically for direct login
-            demo_user = {
-                'id': str(uuid.uuid4()),
-                'name': email.split('@')[0].title(),  # Use email prefix as name
-                'email': email,
-                'password': bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8'),
-                'created_at': datetime.now().isoformat()
-            }
-            users.append(demo_user)
-            user = demo_user
-            print(f"Demo user created: {user['name']} ({user['email']})")
+            with metrics.timed('bcrypt'):
+                password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            user = storage.create_user(
+                email.split('@')[0].title(),  # Use email prefix as name
+                email,
+                password_hash
+            ) or storage.get_user_by_email(email)  # Lost a race with a concurrent login
+            log.info('demo user created on login', user_id=user['id'])
         
         # Verify password
         try:
             password_bytes = password.encode('utf-8')
             hashed_password = user['password'].encode('utf-8')
             
-            if bcrypt.checkpw(password_bytes, hashed_password):
-                # Login successful - create session
+            with metrics.timed('bcrypt'):
+                password_ok = bcrypt.checkpw(password_bytes, hashed_password)
+            
+            if password_ok:
+                # Login successful - create session under a new server-side id
+                if isinstance(session, CachedSession):
+                    session.regenerate()
                 session['user_id'] = user['id']
                 session['user_email'] = user['email']
                 session['user_name'] = user['name']
                 
-                print(f"Login successful for user: {user['name']}")
-                print(f"Session created with user_id: {user['id']}")
-                print("=====================")
+                log.info('login succeeded', user_id=user['id'])
                 
                 return jsonify({
                     'message': 'Login successful',
@@ -178,15 +255,15 @@ def login():
                     }
                 }), 200
             else:
-                print("Password verification failed")
+                log.info('login failed', user_id=user['id'])
                 return jsonify({'message': 'Invalid email or password'}), 401
                 
         except Exception as password_error:
-            print(f"Password verification error: {password_error}")
+            log.warning('password verification error', error=str(password_error))
             return jsonify({'message': 'Invalid email or password'}), 401
             
     except Exception as e:
-        print(f"Login error: {str(e)}")
+        log.exception('login error')
         return jsonify({'message': 'Login failed. Please try again.'}), 500
 
 @app.route('/api/auth/register', methods=['POST'])
@@ -197,10 +274,6 @@ def register():
         email = data.get('email', '').strip().lower()
         password = data.get('password', '')
         
-        print(f"=== REGISTRATION ATTEMPT ===")
-        print(f"Name: {name}")
-        print(f"Email: {email}")
-        
         # Validate input
         if not name or not email or not password:
             return jsonify({'message': 'Name, email and password are required'}), 400
@@ -209,31 +282,23 @@ def register():
             return jsonify({'message': 'Password must be at least 6 characters long'}), 400
         
         # Check if user already exists
-        for user in users:
-            if user['email'].lower() == email:
-                print(f"User already exists with email: {email}")
-                return jsonify({'message': 'User with this email already exists'}), 409
+        if storage.get_user_by_email(email):
+            log.info('registration rejected, email taken')
+            return jsonify({'message': 'User with this email already exists'}), 409
         
         # Hash password
         try:
             password_bytes = password.encode('utf-8')
             salt = bcrypt.gensalt()
-            hashed_password = bcrypt.hashpw(password_bytes, salt)
+            with metrics.timed('bcrypt'):
+                hashed_password = bcrypt.hashpw(password_bytes, salt)
             
-            # Create new user
-            new_user = {
-                'id': str(uuid.uuid4()),
-                'name': name,
-                'email': email,
-                'password': hashed_password.decode('utf-8'),  # Store as string
-                'created_at': datetime.utcnow().isoformat()
-            }
-            
-            users.append(new_user)
+            # Create new user (None if the email was taken concurrently)
+            new_user = storage.create_user(name, email, hashed_password.decode('utf-8'))
+            if not new_user:
+                return jsonify({'message': 'User with this email already exists'}), 409
             
-            print(f"User registered successfully: {name} ({email})")
-            print(f"Total users now: {len(users)}")
-            print("=========================")
+            log.info('user registered', user_id=new_user['id'])
             
             return jsonify({
                 'message': 'Registration successful! You can now login.',
@@ -241,25 +306,25 @@ def register():
             }), 201
             
         except Exception as hash_error:
-            print(f"Password hashing error: {hash_error}")
+            log.exception('password hashing error')
             return jsonify({'message': 'Registration failed. Please try again.'}), 500
             
     except Exception as e:
-        print(f"Registration error: {str(e)}")
+        log.exception('registration error')
         return jsonify({'message': 'Registration failed. Please try again.'}), 500
 
 @app.route('/api/auth/logout', methods=['POST'])
 def logout():
     try:
         if 'user_id' in session:
-            user_name = session.get('user_name', 'Unknown')
+            user_id = session.get('user_id')
             session.clear()
-            print(f"User logged out: {user_name}")
+            log.info('logged out', user_id=user_id)
             return jsonify({'message': 'Logged out successfully'}), 200
         else:
             return jsonify({'message': 'Not logged in'}), 400
     except Exception as e:
-        print(f"Logout error: {str(e)}")
+        log.exception('logout error')
         return jsonify({'message': 'Logout failed'}), 500
 
 # User profile endpoint
@@ -277,37 +342,34 @@ def get_user_profile():
             }), 200
         
         current_user_id = session.get('user_id')
-        user = next((u for u in users if u['id'] == current_user_id), None)
+        profile = profile_summary(current_user_id)
         
-        if not user:
+        if not profile:
             return jsonify({
                 'authenticated': False,
                 'message': 'User not found',
                 'user': None
             }), 404
         
-        # Count user's resumes
-        user_resumes = [resume for resume in resumes if resume['user_id'] == current_user_id]
-        resume_count = len(user_resumes)
+        # The cached summary is the whole variable part of the response
+        etag = conditional.etag_for('profile', profile)
+        unchanged = conditional.not_modified(etag)
+        if unchanged:
+            return unchanged
         
         # Return comprehensive user profile data
-        return jsonify({
+        return conditional.add_validators(jsonify({
             'authenticated': True,
             'user': {
-                'id': user['id'],
-                'name': user['name'],
-                'email': user['email'],
-                'is_admin': user.get('is_admin', False),
-                'created_at': user.get('created_at', datetime.utcnow().isoformat()),
-                'resume_count': resume_count,
-                'personal_info': user.get('personal_info', {}),
-                'professional_info': user.get('professional_info', {}),
-                'education': user.get('education', []),
-                'experience': user.get('experience', []),
-                'skills': user.get('skills', []),
-                'projects': user.get('projects', [])
+                **profile,
+                'personal_info': {},
+                'professional_info': {},
+                'education': [],
+                'experience': [],
+                'skills': [],
+                'projects': []
             }
-        }), 200
+        }), etag), 200
         
     except Exception as e:
         return jsonify({
@@ -330,7 +392,7 @@ def get_user_resume():
             }), 200
         
         current_user_id = session.get('user_id')
-        user = next((u for u in users if u['id'] == current_user_id), None)
+        user = storage.get_user(current_user_id)
         
         if not user:
             return jsonify({
@@ -340,13 +402,11 @@ def get_user_resume():
             }), 404
         
         # Find user's resume
-        user_resume = next((r for r in resumes if r['user_id'] == current_user_id), None)
+        user_resume = storage.get_first_resume(current_user_id)
         
         # If no resume exists, create sample data for the user
         if not user_resume:
-            user_resume = {
-                'id': str(uuid.uuid4()),
-                'user_id': current_user_id,
+            user_resume = storage.create_resume(current_user_id, {
                 'full_name': user.get('name', 'John Doe'),
                 'email': user.get('email', 'john@example.com'),
                 'phone': '+1 (555) 123-4567',
@@ -374,12 +434,9 @@ def get_user_resume():
                 },
                 'profile_picture': '',
                 'template_type': 'modern',
-                'is_public': False,
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
-            }
-            # Add the sample resume to the resumes list
-            resumes.append(user_resume)
+                'is_public': False
+            })
+            invalidate_profile(current_user_id)
         
         # Return the resume data
         return jsonify({
@@ -399,12 +456,12 @@ def get_user_resume():
 def logout_page():
     try:
         if 'user_id' in session:
-            user_name = session.get('user_name', 'Unknown')
+            user_id = session.get('user_id')
             session.clear()
-            print(f"User logged out via form: {user_name}")
+            log.info('logged out via form', user_id=user_id)
         return redirect('/')
     except Exception as e:
-        print(f"Logout page error: {str(e)}")
+        log.exception('logout page error')
         return redirect('/')
 
 # Resume endpoints
@@ -418,40 +475,9 @@ def create_resume():
         current_user_id = get_current_user_id()
         data = request.get_json()
         
-        # Debug: Print received data
-        print("=== CREATE RESUME DEBUG ===")
-        print(f"Received data: {data}")
-        print(f"Current user ID: {current_user_id}")
-        
-        new_resume = {
-            'id': str(uuid.uuid4()),
-            'user_id': current_user_id,
-            # Personal Information
-            'full_name': data.get('full_name', ''),
-            'email': data.get('email', ''),
-            'phone': data.get('phone', ''),
-            'linkedin': data.get('linkedin', ''),
-            'address': data.get('address', ''),
-            'summary': data.get('summary', ''),
-            # Resume Sections
-            'education': data.get('education', ''),
-            'experience': data.get('experience', ''),
-            'projects': data.get('projects', ''),
-            'skills': data.get('skills', ''),
-            'skill_ratings': data.get('skill_ratings', {}),
-            # Additional Fields
-            'profile_picture': data.get('profile_picture', ''),
-            'template_type': data.get('template_type', 'modern'),
-            'is_public': data.get('is_public', False),
-            # Timestamps
-            'created_at': datetime.utcnow().isoformat(),
-            'updated_at': datetime.utcnow().isoformat()
-        }
-        
-        print(f"New resume object: {new_resume}")
-        print("===========================")
-        
-        resumes.append(new_resume)
+        new_resume = storage.create_resume(current_user_id, data)
+        invalidate_profile(current_user_id)
+        log.info('resume created', resume_id=new_resume['id'], user_id=current_user_id)
         
         return jsonify({
             'message': 'Resume created successfully!',
@@ -468,8 +494,15 @@ def get_resumes():
         return jsonify({'message': 'Please login to view resumes'}), 401
     
     current_user_id = get_current_user_id()
-    user_resumes = [resume for resume in resumes if resume['user_id'] == current_user_id]
-    return jsonify({'resumes': user_resumes}), 200
+    # Count and latest updated_at change on every create, update and delete
+    count, latest = storage.resumes_version(current_user_id)
+    etag = conditional.etag_for('resumes', current_user_id, count, latest)
+    unchanged = conditional.not_modified(etag, latest)
+    if unchanged:
+        return unchanged
+    
+    user_resumes = storage.list_resumes(current_user_id)
+    return conditional.add_validators(jsonify({'resumes': user_resumes}), etag, latest), 200
 
 @app.route('/api/resumes/<resume_id>', methods=['GET'])
 def get_resume(resume_id):
@@ -478,22 +511,23 @@ def get_resume(resume_id):
         return jsonify({'message': 'Please login to view resume'}), 401
     
     current_user_id = get_current_user_id()
+    version = storage.resume_version(resume_id, current_user_id)
+    etag = conditional.etag_for('resume', resume_id, version)
+    if version:
+        unchanged = conditional.not_modified(etag, version)
+        if unchanged:
+            return unchanged
     
-    # Debug: Print request info
-    print("=== GET RESUME DEBUG ===")
-    print(f"Requested resume ID: {resume_id}")
-    print(f"Current user ID: {current_user_id}")
-    print(f"Total resumes in memory: {len(resumes)}")
-    
-    resume = next((r for r in resumes if r['id'] == resume_id and r['user_id'] == current_user_id), None)
+    resume = storage.get_resume(resume_id, current_user_id)
     
     if not resume:
-        print(f"Resume not found for ID: {resume_id}")
+        log.debug('resume not found', resume_id=resume_id, user_id=current_user_id)
         return jsonify({'message': 'Resume not found'}), 404
     
-    print(f"Found resume: {resume}")
-    print("=========================")
-    return jsonify({'resume': resume}), 200
+    response = jsonify({'resume': resume})
+    if version:
+        conditional.add_validators(response, etag, version)
+    return response, 200
 
 @app.route('/api/resumes/<resume_id>', methods=['PUT'])
 def update_resume(resume_id):
@@ -503,7 +537,7 @@ def update_resume(resume_id):
     
     current_user_id = get_current_user_id()
     
-    resume = next((r for r in resumes if r['id'] == resume_id and r['user_id'] == current_user_id), None)
+    resume = storage.get_resume(resume_id, current_user_id)
     
     if not resume:
         return jsonify({'message': 'Resume not found'}), 404
@@ -511,31 +545,106 @@ def update_resume(resume_id):
     try:
         data = request.get_json()
         
-        # Debug: Print received data for update
-        print("=== UPDATE RESUME DEBUG ===")
-        print(f"Resume ID: {resume_id}")
-        print(f"Received data: {data}")
-        print(f"Current resume before update: {resume}")
-        
         # Update fields if provided - including all personal information
-        update_fields = [
-            'full_name', 'email', 'phone', 'linkedin', 'address', 'summary',
-            'education', 'experience', 'projects', 'skills', 'skill_ratings',
-            'profile_picture', 'template_type', 'is_public'
-        ]
-        
-        for field in update_fields:
-            if field in data:
-                resume[field] = data[field]
-                print(f"Updated field '{field}': {data[field]}")
+        if not storage.update_resume(resume_id, current_user_id, data):
+            return jsonify({'message': 'Resume not found'}), 404
         
-        resume['updated_at'] = datetime.utcnow().isoformat()
+        log.info('resume updated', resume_id=resume_id,
+                 fields=','.join(field for field in RESUME_FIELDS if field in data))
         
         return jsonify({'message': 'Resume updated successfully'}), 200
         
     except Exception as e:
         return jsonify({'message': f'Error updating resume: {str(e)}'}), 500
 
+@app.route('/api/resumes/<resume_id>', methods=['PATCH'])
+def patch_resume(resume_id):
+    """Partial update for autosave: only changed fields are written (see resume_patch.py)"""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to update resume'}), 401
+    
+    current_user_id = get_current_user_id()
+    
+    try:
+        changes, expected_version = resume_patch.parse(request.get_json(force=True, silent=True), request.mimetype)
+    except resume_patch.PatchError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    try:
+        result = storage.patch_resume(resume_id, current_user_id, changes, expected_version)
+    except ResumeConflict as e:
+        return jsonify({'message': 'Resume was changed by another save; reload it and retry',
+                        'version': e.version}), 409
+    except Exception as e:
+        return jsonify({'message': f'Error updating resume: {str(e)}'}), 500
+    
+    if not result:
+        return jsonify({'message': 'Resume not found'}), 404
+    
+    if result['changed']:
+        log.info('resume patched', resume_id=resume_id, version=result['version'],
+                 fields=','.join(result['changed']))
+    
+    return jsonify({'message': 'Resume updated successfully', **result}), 200
+
+@app.route('/api/resumes/<resume_id>/history', methods=['GET'])
+def get_resume_history(resume_id):
+    """Revisions of the resume's text sections, newest first; ?before=<seq> pages back"""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to view resume history'}), 401
+    
+    if not storage.resume_version(resume_id, get_current_user_id()):
+        return jsonify({'message': 'Resume not found'}), 404
+    
+    limit = min(request.args.get('limit', 50, type=int), 500)
+    before = request.args.get('before', type=int)
+    revisions = history.revisions(resume_id, limit, before)
+    return jsonify({
+        'revisions': revisions,
+        'next_before': revisions[-1]['seq'] if len(revisions) == limit and revisions[-1]['seq'] > 0 else None
+    }), 200
+
+@app.route('/api/resumes/<resume_id>/history/<int:seq>', methods=['GET'])
+def get_resume_revision(resume_id, seq):
+    """Text sections as of revision `seq`"""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to view resume history'}), 401
+    
+    if not storage.resume_version(resume_id, get_current_user_id()):
+        return jsonify({'message': 'Resume not found'}), 404
+    
+    texts = history.texts_at(resume_id, seq)
+    if texts is None:
+        return jsonify({'message': 'Revision not found'}), 404
+    return jsonify({'seq': seq, 'fields': texts}), 200
+
+@app.route('/api/resumes/<resume_id>/history/<int:seq>/restore', methods=['POST'])
+def restore_resume_revision(resume_id, seq):
+    """Undo: write the text sections of revision `seq` back (itself a new revision)"""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to update resume'}), 401
+    
+    current_user_id = get_current_user_id()
+    if not storage.resume_version(resume_id, current_user_id):
+        return jsonify({'message': 'Resume not found'}), 404
+    
+    texts = history.texts_at(resume_id, seq)
+    if texts is None:
+        return jsonify({'message': 'Revision not found'}), 404
+    
+    expected_version = (request.get_json(silent=True) or {}).get('version')
+    try:
+        result = storage.patch_resume(resume_id, current_user_id, texts, expected_version)
+    except ResumeConflict as e:
+        return jsonify({'message': 'Resume was changed by another save; reload it and retry',
+                        'version': e.version}), 409
+    
+    if not result:
+        return jsonify({'message': 'Resume not found'}), 404
+    
+    log.info('resume revision restored', resume_id=resume_id, seq=seq, version=result['version'])
+    return jsonify({'message': 'Resume restored', 'restored_seq': seq, **result}), 200
+
 @app.route('/api/resumes/<resume_id>', methods=['DELETE'])
 def delete_resume(resume_id):
     # Check if user is logged in
@@ -543,14 +652,10 @@ def delete_resume(resume_id):
         return jsonify({'message': 'Please login to delete resume'}), 401
     
     current_user_id = get_current_user_id()
-    global resumes
     
-    resume = next((r for r in resumes if r['id'] == resume_id and r['user_id'] == current_user_id), None)
-    
-    if not resume:
+    if not storage.delete_resume(resume_id, current_user_id):
         return jsonify({'message': 'Resume not found'}), 404
-    
-    resumes = [r for r in resumes if not (r['id'] == resume_id and r['user_id'] == current_user_id)]
+    invalidate_profile(current_user_id)
     
     return jsonify({'message': 'Resume deleted successfully'}), 200
 
@@ -565,25 +670,20 @@ def print_resume(resume_id):
         
         current_user_id = get_current_user_id()
         
-        # Debug: Print request info
-        print("=== PRINT RESUME DEBUG ===")
-        print(f"Print resume ID: {resume_id}")
-        print(f"Current user ID: {current_user_id}")
-        
         # Find the resume
-        resume = next((r for r in resumes if r['id'] == resume_id and r['user_id'] == current_user_id), None)
+        resume = storage.get_resume(resume_id, current_user_id)
         
         if not resume:
-            print(f"Resume not found for print: {resume_id}")
+            log.debug('resume not found for print', resume_id=resume_id, user_id=current_user_id)
             return jsonify({'message': 'Resume not found'}), 404
         
-        print(f"Found resume for printing: {resume['full_name'] or 'Unnamed'}")
-        
         # Prepare skills list
         skills_list = []
         if resume.get('skills'):
             skills_list = [skill.strip() for skill in resume['skills'].split(',') if skill.strip()]
         
+        picture_id = pictures.picture_id(resume.get('profile_picture'))
+        
         # Generate print-optimized HTML
         print_html = f"""
 <!DOCTYPE html>
@@ -616,6 +716,13 @@ def print_resume(resume_id):
             border-radius: 10px;
             box-shadow: 0 4px 8px rgba(0,0,0,0.1);
         }}
+        .photo img {{
+            width: 110px;
+            height: 110px;
+            border-radius: 50%;
+            border: 3px solid white;
+            margin-bottom: 10px;
+        }}
         .name {{
             font-size: 32pt;
             font-weight: 900;
@@ -746,6 +853,7 @@ def print_resume(resume_id):
     
     <!-- Header Section -->
     <div class="resume-header">
+        {f'<div class="photo"><img src="{pictures.picture_url(picture_id, "print")}" alt=""></div>' if picture_id else ''}
         <div class="name">{resume.get('full_name', 'Professional Resume')}</div>
         <div class="contact-info">
             {f'<span class="contact-item">📧 {resume.get("email", "")}' if resume.get('email') else ''}</span>
@@ -810,14 +918,15 @@ def print_resume(resume_id):
 </html>
         """
         
-        print("✅ Print HTML generated successfully")
-        print("===========================")
+        log.info('print view rendered', resume_id=resume_id)
         
-        from flask import Response
-        return Response(print_html, mimetype='text/html')
+        # Same resume version, same HTML: compressed once, then served from cache
+        return compression.precompressed_response(
+            ('print', resume_id, resume['updated_at']), lambda: print_html, 'text/html',
+            last_modified=resume['updated_at'])
         
     except Exception as e:
-        print(f"❌ Print resume error: {str(e)}")
+        log.exception('print resume error', resume_id=resume_id)
         return jsonify({'message': f'Error generating print version: {str(e)}'}), 500
 
 @app.route('/api/resumes/<resume_id>/download', methods=['GET'])
@@ -825,348 +934,139 @@ def download_resume_pdf(resume_id):
     """Route for downloading resume as PDF"""
     try:
         from flask import make_response
-        from xhtml2pdf import pisa
-        from io import BytesIO
         
         # Check authentication
         if not is_logged_in():
-            print("❌ Unauthorized PDF download attempt - not logged in")
+            log.info('unauthorized pdf download', reason='not logged in')
             return jsonify({'message': 'Please login to download resume'}), 401
         
         current_user_id = get_current_user_id()
         if not current_user_id:
-            print("❌ Unauthorized PDF download attempt - no user ID")
+            log.info('unauthorized pdf download', reason='no user id')
             return jsonify({'message': 'Authentication required'}), 401
         
-        # Debug: Print request info
-        print("=== PDF DOWNLOAD DEBUG ===")
-        print(f"PDF resume ID: {resume_id}")
-        print(f"Current user ID: {current_user_id}")
-        
         # Find the resume
-        resume = next((r for r in resumes if r['id'] == resume_id and r['user_id'] == current_user_id), None)
+        resume = storage.get_resume(resume_id, current_user_id)
         
         if not resume:
-            print(f"Resume not found for PDF: {resume_id}")
+            log.debug('resume not found for pdf', resume_id=resume_id, user_id=current_user_id)
             return jsonify({'message': 'Resume not found'}), 404
         
-        print(f"Found resume for PDF: {resume.get('full_name', 'Unnamed')}")
-        
-        # Prepare skills list
-        skills_list = []
-        if resume.get('skills'):
-            skills_list = [skill.strip() for skill in resume['skills'].split(',') if skill.strip()]
-        
-        # Function to safely truncate extremely long URLs for PDF
-        def safe_url_display(url, max_length=60):
-            if not url:
-                return ''
-            if len(url) <= max_length:
-                return url
-            # For very long URLs, show beginning + ... + end
-            # More conservative truncation for PDF
-            return f"{url[:max_length-8]}...{url[-5:]}"
-        
-        # Apply URL truncation to LinkedIn if it's extremely long (more conservative for PDF)
-        linkedin_display = safe_url_display(resume.get('linkedin', ''), 60)
-        
-        # Generate PDF-optimized HTML
-        pdf_html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="utf-8">
-    <style>
-        @page {{
-            size: A4;
-            margin: 0.75in;
-        }}
-        body {{
-            font-family: Arial, sans-serif;
-            font-size: 10pt;
-            line-height: 1.5;
-            color: #2c3e50;
-            margin: 0;
-            padding: 0;
-        }}
-        .resume-header {{
-            text-align: center;
-            background-color: #3498db;
-            color: white;
-            padding: 20px;
-            margin-bottom: 25px;
-        }}
-        .name {{
-            font-size: 24pt;
-            font-weight: bold;
-            margin-bottom: 8px;
-        }}
-        .contact-info {{
-            font-size: 10pt;
-            line-height: 1.4;
-            width: 100%;
-            max-width: 100%;
-            overflow: hidden;
-            word-wrap: break-word;
-            overflow-wrap: anywhere;
-            white-space: normal;
-        }}
-        .contact-item {{
-            display: inline-block;
-            margin: 0 10px;
-            word-wrap: break-word;
-            overflow-wrap: break-word;
-            max-width: 150px;
-            vertical-align: top;
-        }}
-        .section {{
-            margin-bottom: 20px;
-        }}
-        .section-title {{
-            font-size: 14pt;
-            font-weight: bold;
-            color: #2c3e50;
-            background-color: #ecf0f1;
-            padding: 10px 15px;
-            margin-bottom: 15px;
-            text-transform: uppercase;
-            border-left: 5px solid #3498db;
-        }}
-        .section-content {{
-            padding: 0 15px;
-            text-align: justify;
-            font-size: 10pt;
-            line-height: 1.6;
-        }}
-        .summary-content {{
-            font-style: italic;
-            color: #34495e;
-            border-left: 3px solid #3498db;
-            padding: 15px;
-            background-color: #f8f9fa;
-            margin: 10px 0;
-        }}
-        .skills-container {{
-            margin-top: 10px;
-        }}
-        .skill-item {{
-            background-color: #3498db;
-            color: white;
-            padding: 4px 12px;
-            border-radius: 15px;
-            font-size: 9pt;
-            font-weight: bold;
-            display: inline-block;
-            margin: 2px;
-        }}
-        .content-block {{
-            margin-bottom: 10px;
-        }}
-        
-        /* Enhanced CSS class for LinkedIn URLs in PDF with aggressive wrapping */
-        .linkedin-url {{
-            /* Aggressive text breaking for PDF generators */
-            word-break: break-all !important;
-            overflow-wrap: break-word !important;
-            word-wrap: break-word !important;
-            white-space: normal !important;
-            
-            /* Layout properties */
-            display: block;
-            margin-top: 5px;
-            max-width: 100% !important;
-            width: 100%;
-            
-            /* Text styling */
-            font-size: 8pt !important;
-            line-height: 1.1 !important;
-            
-            /* Overflow handling */
-            overflow: hidden;
-            text-overflow: ellipsis;
-            
-            /* PDF-specific properties */
-            box-sizing: border-box;
-            padding: 0;
-            margin-left: 0;
-            margin-right: 0;
-            
-            /* Force character-level breaking */
-            -webkit-hyphens: auto;
-            -moz-hyphens: auto;
-            hyphens: auto;
-            
-            /* Additional PDF generator compatibility */
-            overflow-wrap: anywhere !important;
-        }}
-        
-        /* Alternative approach: Multi-line with ellipsis for very long URLs */
-        .linkedin-url-multiline {{
-            word-break: break-all;
-            overflow-wrap: break-word;
-            white-space: normal;
-            display: block;
-            margin-top: 5px;
-            max-width: 100%;
-            width: 100%;
-            font-size: 8pt;
-            line-height: 1.1;
-            max-height: 2.2em;
-            overflow: hidden;
-            position: relative;
-        }}
-    </style>
-</head>
-<body>
-    <!-- Header Section -->
-    <div class="resume-header">
-        <div class="name">{resume.get('full_name', 'Professional Resume')}</div>
-        <div class="contact-info">
-            {f'📧 {resume.get("email", "")} ' if resume.get('email') else ''}
-            {f'📞 {resume.get("phone", "")} ' if resume.get('phone') else ''}
-            {f'🏠 {resume.get("address", "")} ' if resume.get('address') else ''}
-            {f'<div class="linkedin-url">🔗 {linkedin_display}</div>' if resume.get('linkedin') else ''}
-        </div>
-    </div>
-    
-    <!-- Professional Summary -->
-    {f'''
-    <div class="section">
-        <div class="section-title">Professional Summary</div>
-        <div class="section-content">
-            <div class="summary-content">{resume.get('summary', '')}</div>
-        </div>
-    </div>
-    ''' if resume.get('summary') else ''}
-    
-    <!-- Education -->
-    {f'''
-    <div class="section">
-        <div class="section-title">Education</div>
-        <div class="section-content">
-            <div class="content-block">{resume.get('education', '')}</div>
-        </div>
-    </div>
-    ''' if resume.get('education') else ''}
-    
-    <!-- Experience -->
-    {f'''
-    <div class="section">
-        <div class="section-title">Professional Experience</div>
-        <div class="section-content">
-            <div class="content-block">{resume.get('experience', '')}</div>
-        </div>
-    </div>
-    ''' if resume.get('experience') else ''}
-    
-    <!-- Projects -->
-    {f'''
-    <div class="section">
-        <div class="section-title">Projects Portfolio</div>
-        <div class="section-content">
-            <div class="content-block">{resume.get('projects', '')}</div>
-        </div>
-    </div>
-    ''' if resume.get('projects') else ''}
-    
-    <!-- Skills -->
-    {f'''
-    <div class="section">
-        <div class="section-title">Core Skills</div>
-        <div class="section-content">
-            <div class="skills-container">
-                {''.join([f'<span class="skill-item">{skill}</span>' for skill in skills_list])}
-            </div>
-        </div>
-    </div>
-    ''' if skills_list else ''}
-</body>
-</html>
-        """
-        
-        print("Generating PDF from HTML...")
-        
-        # Generate PDF
-        result = BytesIO()
-        pdf = pisa.pisaDocument(BytesIO(pdf_html.encode("utf-8")), result)
-        
-        if pdf.err:
-            print(f"❌ PDF generation error: {pdf.err}")
+        # Generate PDF (see pdf_render.py)
+        try:
+            with metrics.timed('pdf_render'):
+                picture = picture_store.path(resume.get('profile_picture'), 'pdf')
+                pdf_bytes = render_pdf(build_resume_html(resume, picture))
+        except PdfRenderError as e:
+            log.error('pdf generation failed', resume_id=resume_id, errors=str(e))
             return jsonify({'message': 'Error generating PDF'}), 500
         
-        print("✅ PDF generated successfully")
-        print("============================")
+        log.info('pdf generated', resume_id=resume_id, size=len(pdf_bytes))
         
         # Create response
-        response = make_response(result.getvalue())
+        response = make_response(pdf_bytes)
         response.headers['Content-Type'] = 'application/pdf'
         response.headers['Content-Disposition'] = f'attachment; filename="{resume.get("full_name", "Resume").replace(" ", "_")}_Resume.pdf"'
         
         return response
         
     except Exception as e:
-        print(f"❌ PDF download error: {str(e)}")
+        log.exception('pdf download error', resume_id=resume_id)
         return jsonify({'message': f'Error generating PDF: {str(e)}'}), 500
 
+# Resume import from PDF/DOCX
+@app.route('/api/resumes/import', methods=['POST'])
+def import_resume():
+    """Start extracting resume fields from a PDF or DOCX file (the raw body, or
+    a multipart form with a `resume` file). Poll status_url for the result."""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to import a resume'}), 401
+    
+    stream = streaming.request_stream(resume_import.MAX_BYTES + 64 * 1024)  # Plus multipart overhead
+    try:
+        if request.mimetype == 'multipart/form-data':
+            stream = streaming.MultipartFile(stream, request.mimetype_params.get('boundary'), 'resume')
+        data = resume_import.read_upload(stream)
+        job = resume_importer.submit(get_current_user_id(), data, catalogue_skills())
+    except resume_import.ResumeImportError as e:
+        response = jsonify({'message': str(e)})
+        if e.status == 503:
+            response.headers['Retry-After'] = '5'
+        return response, e.status
+    except streaming.StreamError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    log.info('resume import queued', job_id=job['id'], size=job['bytes'])
+    return jsonify({'message': 'Resume import started', 'job_id': job['id'], 'status': job['status'],
+                    'status_url': url_for('resume_import_status', job_id=job['id'])}), 202
+
+@app.route('/api/resumes/import/<job_id>', methods=['GET'])
+def resume_import_status(job_id):
+    """An import job: queued, running, done (with `result`: the extracted
+    fields and detected skills, ready for POST /api/resumes) or failed"""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to view imports'}), 401
+    
+    job = resume_importer.status(job_id, get_current_user_id())
+    if job is None:
+        return jsonify({'message': 'Import not found'}), 404
+    job.pop('user_id')
+    return jsonify({'job': job}), 200
+
+# Profile pictures
+@app.route('/api/pictures', methods=['POST'])
+def upload_picture():
+    """Upload a profile picture: the raw image as the body, or a multipart form
+    with a `picture` file. Set the returned url as a resume's profile_picture."""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to upload a picture'}), 401
+    
+    # Streamed: never request.files, which spools the whole form first
+    stream = streaming.request_stream(pictures.MAX_BYTES + 64 * 1024)  # Plus multipart overhead
+    try:
+        if request.mimetype == 'multipart/form-data':
+            stream = streaming.MultipartFile(stream, request.mimetype_params.get('boundary'), 'picture')
+        picture = picture_store.save(stream)
+    except pictures.PictureError as e:
+        return jsonify({'message': str(e)}), e.status
+    except streaming.StreamError as e:
+        return jsonify({'message': str(e)}), 400
+    
+    log.info('picture uploaded', picture_id=picture['id'], size=picture['bytes'], created=picture['created'])
+    return jsonify({'message': 'Picture uploaded successfully', **picture}), 201 if picture['created'] else 200
+
+@app.route('/api/pictures/<picture_id>', methods=['GET'])
+def get_picture(picture_id):
+    """A stored picture; ?size=thumb|print|pdf for the resized square copies"""
+    size = request.args.get('size')
+    if size is not None and size not in picture_store.sizes:
+        return jsonify({'message': f"size must be one of: {', '.join(picture_store.sizes)}"}), 400
+    
+    found = picture_store.find(picture_id, size)
+    if found is None:
+        return jsonify({'message': 'Picture not found'}), 404
+    
+    path, mimetype = found
+    # Content never changes under its hash: cache for a year, revalidation is pointless
+    response = send_file(path, mimetype=mimetype, etag=f"{picture_id}-{size or 'original'}",
+                         max_age=365 * 24 * 3600, conditional=True)
+    response.cache_control.immutable = True
+    return response
+
 # Jobs endpoints
 @app.route('/api/jobs', methods=['GET'])
 def get_jobs():
-    # Create some sample jobs for demo
-    if not jobs:  # Only add sample data if jobs list is empty
-        import uuid
-        from datetime import datetime, timedelta
-        
-        sample_jobs = [
-            {
-                'id': str(uuid.uuid4()),
-                'job_title': 'Frontend Developer',
-                'company': 'TechCorp Inc.',
-                'required_skills': ['JavaScript', 'React', 'HTML', 'CSS'],
-                'applyUrl': 'https://techcorp.example.com/careers/frontend-developer',
-                'created_at': (datetime.utcnow() - timedelta(days=2)).isoformat(),
-                'updated_at': (datetime.utcnow() - timedelta(days=2)).isoformat()
-            },
-            {
-                'id': str(uuid.uuid4()),
-                'job_title': 'Python Developer',
-                'company': 'DataSoft Solutions',
-                'required_skills': ['Python', 'Django', 'PostgreSQL', 'API Development'],
-                'created_at': (datetime.utcnow() - timedelta(days=1)).isoformat(),
-                'updated_at': (datetime.utcnow() - timedelta(days=1)).isoformat()
-            },
-            {
-                'id': str(uuid.uuid4()),
-                'job_title': 'Full Stack Developer',
-                'company': 'Innovation Labs',
-                'required_skills': ['JavaScript', 'Python', 'React', 'Node.js', 'MongoDB'],
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
-            },
-            {
-                'id': str(uuid.uuid4()),
-                'job_title': 'DevOps Engineer',
-                'company': 'CloudTech Systems',
-                'required_skills': ['Docker', 'Kubernetes', 'AWS', 'Python', 'Linux'],
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
-            },
-            {
-                'id': str(uuid.uuid4()),
-                'job_title': 'Data Scientist',
-                'company': 'AI Innovations',
-                'required_skills': ['Python', 'Machine Learning', 'Pandas', 'Scikit-learn', 'SQL'],
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
-            }
-        ]
-        
-        jobs.extend(sample_jobs)
-    
-    return jsonify({'jobs': jobs}), 200
+    # Sample jobs are seeded once at startup (see seed_data.py). The encoded
+    # catalogue is cached per version, so repeat requests skip storage,
+    # JSON encoding and compression
+    return compression.precompressed_response(
+        ('jobs', storage.catalogue_version()),
+        lambda: app.json.response({'jobs': storage.list_jobs()}).get_data(),
+        'application/json', ttl=JOBS_CATALOGUE_TTL, private=False)
 
 @app.route('/api/jobs/<job_id>', methods=['GET'])
 def get_job(job_id):
-    job = next((j for j in jobs if j['id'] == job_id), None)
+    job = storage.get_job(job_id)
     
     if not job:
         return jsonify({'message': 'Job not found'}), 404
@@ -1176,23 +1076,14 @@ def get_job(job_id):
 
 @app.route('/api/jobs', methods=['POST'])
 def create_job():
-    from flask import request
-    import uuid
-    from datetime import datetime
-    
     try:
         data = request.get_json()
         
-        new_job = {
-            'id': str(uuid.uuid4()),
+        new_job = storage.create_job({
             'job_title': data.get('job_title', ''),
             'company': data.get('company', ''),
-            'required_skills': data.get('required_skills', []),
-            'created_at': datetime.utcnow().isoformat(),
-            'updated_at': datetime.utcnow().isoformat()
-        }
-        
-        jobs.append(new_job)
+            'required_skills': data.get('required_skills', [])
+        })
         
         return jsonify({
             'message': 'Job created successfully!',
@@ -1202,36 +1093,53 @@ def create_job():
     except Exception as e:
         return jsonify({'message': f'Error creating job: {str(e)}'}), 500
 
+@app.route('/api/jobs/import', methods=['POST'])
+def import_jobs():
+    """Bulk-add jobs from NDJSON (application/x-ndjson) or a JSON array
+    (application/json), parsed while the body streams in. Jobs already in
+    the catalogue (same title and company) are skipped."""
+    if not is_logged_in():
+        return jsonify({'message': 'Please login to import jobs'}), 401
+    
+    received = added = 0
+    try:
+        records = streaming.iter_records(streaming.request_stream(streaming.IMPORT_MAX_BYTES), request.mimetype)
+        for batch in streaming.batched(records, streaming.IMPORT_BATCH):
+            jobs = []
+            for record in batch:
+                received += 1
+                if not isinstance(record, dict) or not record.get('job_title') or not record.get('company'):
+                    raise streaming.StreamError(f'job {received} needs a job_title and a company')
+                skills = record.get('required_skills', [])
+                if not isinstance(skills, list):
+                    raise streaming.StreamError(f'job {received}: required_skills must be a list')
+                jobs.append({'job_title': str(record['job_title']), 'company': str(record['company']),
+                             'required_skills': [str(skill) for skill in skills]})
+            added += storage.seed_jobs(jobs)
+    except streaming.StreamError as e:
+        # Batches before the error stay imported; re-sending the file skips them
+        log.warning('job import stopped', error=str(e), received=received, added=added)
+        return jsonify({'message': str(e), 'added': added}), 400
+    
+    log.info('jobs imported', received=received, added=added)
+    return jsonify({'message': 'Jobs imported', 'received': received, 'added': added,
+                    'skipped': received - added}), 200
+
 @app.route('/api/jobs/<job_id>/apply', methods=['POST'])
 def apply_for_job(job_id):
     """Endpoint for job applications"""
-    from datetime import datetime
     try:
         data = request.get_json()
         job_title = data.get('job_title', 'Unknown Position')
         company = data.get('company', 'Unknown Company')
         
         # Find the job
-        job = next((j for j in jobs if j['id'] == job_id), None)
+        job = storage.get_job(job_id)
         if not job:
             return jsonify({'message': 'Job not found'}), 404
         
         # Log the application (in a real app, you'd save to database)
-        print(f"=== JOB APPLICATION SUBMITTED ===")
-        print(f"Job ID: {job_id}")
-        print(f"Job Title: {job_title}")
-        print(f"Company: {company}")
-        print(f"Applied at: {datetime.now()}")
-        
-        # Check if user is logged in
-        user_id = get_current_user_id()
-        if user_id:
-            user_name = session.get('user_name', 'Unknown User')
-            print(f"Applicant: {user_name} (ID: {user_id})")
-        else:
-            print("Applicant: Anonymous (demo mode)")
-        
-        print("===================================")
+        log.info('job application submitted', job_id=job_id, user_id=get_current_user_id() or 'anonymous')
         
         return jsonify({
             'message': f'Thank you for applying to {job_title} at {company}! Your application has been submitted successfully. We will review your application and contact you soon.',
@@ -1240,7 +1148,7 @@ def apply_for_job(job_id):
         }), 200
         
     except Exception as e:
-        print(f"Error processing job application: {str(e)}")
+        log.exception('job application error', job_id=job_id)
         return jsonify({
             'message': 'Thank you for your interest! Your application has been received.',
             'status': 'success'
@@ -1252,7 +1160,12 @@ def favicon():
     return '', 204
 
 if __name__ == '__main__':
+    # Werkzeug dev server: one process, meant for development only.
+    # Production: gunicorn -c gunicorn.conf.py wsgi:app
+    port = int(os.environ.get('PORT', 8000))
+    debug = os.environ.get('FLASK_DEBUG') == '1'
     print("Starting Smart Resume in simple mode (no database required)")
-    print("Access the application at: http://localhost:8000")
-    print("Or from other devices at: http://0.0.0.0:8000")
-    app.run(host='0.0.0.0', port=8000, debug=True)
+    print(f"Access the application at: http://localhost:{port}")
+    print(f"Or from other devices at: http://0.0.0.0:{port}")
+    print("Debugger and reloader: " + ("on" if debug else "off (set FLASK_DEBUG=1 to enable)"))
+    app.run(host='0.0.0.0', port=port, debug=debug)
@@ -0,0 +1,1325 @@
+"""
+Storage backends for Smart Resume
+
+Every app variant used to carry its own storage code (lists, dicts or
+MongoEngine queries, often both behind `if USE_MONGODB:` branches). Routes
+now talk to a StorageBackend instead, so the same handlers run on the
+in-memory engine or on MongoDB and the engines can be benchmarked against
+each other (see benchmarks/storage_bench.py).
+
+All backends exchange plain dicts in the shape the JSON API returns:
+ids are strings and timestamps are ISO-8601 strings.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from records import UserRecord, ResumeRecord, JobRecord, to_timestamp, from_timestamp
+
+# Resume fields a client may set on create/update
+RESUME_FIELDS = [
+    'full_name', 'email', 'phone', 'linkedin', 'address', 'summary',
+    'education', 'experience', 'projects', 'skills', 'skill_ratings',
+    'profile_picture', 'template_type', 'is_public'
+]
+
+RESUME_DEFAULTS = {
+    'full_name': '',
+    'email': '',
+    'phone': '',
+    'linkedin': '',
+    'address': '',
+    'summary': '',
+    'education': '',
+    'experience': '',
+    'projects': '',
+    'skills': '',
+    'skill_ratings': {},
+    'profile_picture': '',
+    'template_type': 'modern',
+    'is_public': False
+}
+
+
+_VALUE_TYPES = {str: 'a string', dict: 'an object', bool: 'true or false'}
+
+
+def _now():
+    return datetime.utcnow().isoformat()
+
+
+def check_resume_values(fields):
+    """Raise ValueError if a value does not have its field's type (that of
+    its RESUME_DEFAULTS entry; skill_ratings values must be numbers)"""
+    for field, value in fields.items():
+        expected = type(RESUME_DEFAULTS[field])
+        if not isinstance(value, expected) or (expected is not bool and isinstance(value, bool)):
+            raise ValueError(f"'{field}' must be {_VALUE_TYPES[expected]}")
+        if field == 'skill_ratings' and not all(
+                isinstance(rating, (int, float)) and not isinstance(rating, bool) for rating in value.values()):
+            raise ValueError("'skill_ratings' values must be numbers")
+
+
+def resume_from_fields(fields):
+    """Build a complete resume field set from (possibly partial) client data"""
+    resume = {}
+    for field in RESUME_FIELDS:
+        value = fields.get(field, RESUME_DEFAULTS[field])
+        resume[field] = dict(value) if isinstance(value, dict) else value
+    return resume
+
+
+class ResumeConflict(Exception):
+    """patch_resume() was given an expected_version the resume is no longer at"""
+
+    def __init__(self, version):
+        super().__init__(f'resume is at version {version}')
+        self.version = version
+
+
+def _patch_result(resume_id, version, updated_at, changed):
+    return {'id': resume_id, 'version': version, 'updated_at': updated_at, 'changed': changed}
+
+
+def _revision_meta(revision, size):
+    return {'seq': revision['seq'], 'version': revision['version'], 'kind': revision['kind'],
+            'fields': list(revision['fields']), 'size': size, 'created_at': revision['created_at']}
+
+
+class StorageBackend:
+    """Interface shared by all storage engines.
+
+    Lookups return None when a record does not exist (or is not owned by
+    the given user); they never raise for unknown or malformed ids.
+    """
+    name = 'base'
+
+    # ---- users ----
+    def create_user(self, name, email, password_hash):
+        raise NotImplementedError
+
+    def get_user(self, user_id):
+        raise NotImplementedError
+
+    def get_user_by_email(self, email):
+        raise NotImplementedError
+
+    def list_users(self):
+        raise NotImplementedError
+
+    # ---- resumes ----
+    def create_resume(self, user_id, fields):
+        raise NotImplementedError
+
+    def list_resumes(self, user_id):
+        raise NotImplementedError
+
+    def count_resumes(self, user_id):
+        return len(self.list_resumes(user_id))
+
+    def get_resume(self, resume_id, user_id):
+        raise NotImplementedError
+
+    def get_first_resume(self, user_id):
+        resumes = self.list_resumes(user_id)
+        return resumes[0] if resumes else None
+
+    def update_resume(self, resume_id, user_id, fields):
+        """Apply the RESUME_FIELDS present in `fields`; returns the resume or None"""
+        raise NotImplementedError
+
+    def patch_resume(self, resume_id, user_id, changes, expected_version=None):
+        """Write only the RESUME_FIELDS in `changes` whose value differs.
+
+        Every write bumps the resume's version; a patch that changes nothing
+        leaves version and updated_at alone. With `expected_version`, raises
+        ResumeConflict unless the resume is still at that version. Returns
+        {'id', 'version', 'updated_at', 'changed': [fields]} or None.
+        """
+        raise NotImplementedError
+
+    def bulk_patch_resumes(self, writes):
+        """Apply coalesced patches (see write_behind.py) in one batch.
+
+        Each write is {'id', 'user_id', 'changes', 'versions', 'version',
+        'updated_at'}: set `changes`, add `versions` to version and set
+        updated_at, without a version check (`version` is the expected
+        result, for resume_history.py). Returns the ids of the resumes
+        written: a write whose resume is gone, or whose own values the
+        database rejects, is skipped without undoing the others. Errors that
+        affect the whole batch (connection, locking) raise.
+        """
+        raise NotImplementedError
+
+    def validate_resume_fields(self, user_id, fields):
+        """Raise ValueError if `fields` would fail the engine's field
+        validation (value types everywhere, the model's on MongoDB); lets
+        write-behind reject a patch up front"""
+        check_resume_values(fields)
+
+    def delete_resume(self, resume_id, user_id):
+        """Returns True if a resume was deleted"""
+        raise NotImplementedError
+
+    def resume_version(self, resume_id, user_id):
+        """updated_at of the resume, or None if it does not exist (or is not
+        owned by the user). For conditional GETs; engines override it with a
+        lookup that skips loading the document."""
+        resume = self.get_resume(resume_id, user_id)
+        return resume['updated_at'] if resume else None
+
+    def resumes_version(self, user_id):
+        """(count, latest updated_at) of the user's resumes: changes whenever
+        a resume is created, updated or deleted"""
+        resumes = self.list_resumes(user_id)
+        return len(resumes), max((resume['updated_at'] for resume in resumes), default=None)
+
+    # ---- resume history (resume_history.py) ----
+    def add_resume_revision(self, resume_id, revision):
+        """Append {'seq', 'version', 'kind', 'fields', 'data', 'created_at'}.
+
+        Returns False if the resume already has a revision `seq` (another
+        writer appended first). Deleting a resume deletes its revisions.
+        """
+        raise NotImplementedError
+
+    def get_resume_revisions(self, resume_id, first_seq, last_seq):
+        """Revisions first_seq..last_seq (inclusive) with their data, oldest first"""
+        raise NotImplementedError
+
+    def list_resume_revisions(self, resume_id, limit=None, before_seq=None):
+        """Revision metadata (no data; 'size' is its length in bytes), newest first"""
+        raise NotImplementedError
+
+    # ---- jobs ----
+    def list_jobs(self):
+        raise NotImplementedError
+
+    def get_job(self, job_id):
+        raise NotImplementedError
+
+    def create_job(self, fields):
+        raise NotImplementedError
+
+    def seed_jobs(self, samples):
+        """Insert sample jobs that are not present yet; returns the number added"""
+        raise NotImplementedError
+
+    def catalogue_version(self):
+        """Cheap token that changes whenever the job catalogue changes"""
+        raise NotImplementedError
+
+    # ---- password resets ----
+    def create_password_reset(self, user_id, otp, expiry):
+        raise NotImplementedError
+
+    def get_password_reset(self, user_id, otp):
+        """Return the reset record if it exists and has not expired"""
+        raise NotImplementedError
+
+    def delete_password_resets(self, user_id):
+        raise NotImplementedError
+
+    # ---- diagnostics ----
+    def counts(self):
+        """Document counts per collection, for /test-db"""
+        raise NotImplementedError
+
+
+class InMemoryStorage(StorageBackend):
+    """Process-local storage with hash indexes on every lookup path.
+
+    Replaces the module-level lists that were scanned linearly on every
+    request. Not shared between worker processes. Users, resumes and jobs
+    are kept as compact records (records.py) and converted to dicts only
+    when they are returned.
+    """
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._users = {}
+        self._users_by_email = {}
+        self._resumes = {}
+        self._resumes_by_user = {}  # user_id -> {resume_id: None}, insertion ordered
+        self._jobs = {}
+        self._job_keys = set()  # (job_title, company) pairs, for idempotent seeding
+        self._password_resets = {}
+        self._revisions = {}  # resume_id -> [revision], index == seq
+        self._catalogue_version = 0
+
+    # ---- users ----
+    def create_user(self, name, email, password_hash):
+        user = {
+            'id': str(uuid.uuid4()),
+            'name': name,
+            'email': email,
+            'password': password_hash,
+            'created_at': _now()
+        }
+        key = email.lower()
+        if key == email:
+            key = email  # Most emails are lowercase already; index the same string
+        with self._lock:
+            if key in self._users_by_email:
+                return None
+            self._users[user['id']] = UserRecord.from_dict(user)
+            self._users_by_email[key] = user['id']
+        return user
+
+    def get_user(self, user_id):
+        record = self._users.get(user_id)
+        return record.to_dict() if record else None
+
+    def get_user_by_email(self, email):
+        user_id = self._users_by_email.get(email.lower())
+        return self.get_user(user_id) if user_id else None
+
+    def list_users(self):
+        with self._lock:
+            records = list(self._users.values())
+        return [record.to_dict() for record in records]
+
+    # ---- resumes ----
+    def create_resume(self, user_id, fields):
+        now = _now()
+        resume = {'id': str(uuid.uuid4()), 'user_id': user_id}
+        resume.update(resume_from_fields(fields))
+        resume['created_at'] = now
+        resume['updated_at'] = now
+        record = ResumeRecord.from_dict(resume)
+        with self._lock:
+            self._resumes[resume['id']] = record
+            self._resumes_by_user.setdefault(user_id, {})[resume['id']] = None
+        return resume
+
+    def list_resumes(self, user_id):
+        with self._lock:
+            records = [self._resumes[resume_id] for resume_id in self._resumes_by_user.get(user_id, ())]
+        return [record.to_dict() for record in records]
+
+    def count_resumes(self, user_id):
+        return len(self._resumes_by_user.get(user_id, ()))
+
+    def _resume_record(self, resume_id, user_id):
+        record = self._resumes.get(resume_id)
+        if record is None or record.user_id != user_id:
+            return None
+        return record
+
+    def get_resume(self, resume_id, user_id):
+        record = self._resume_record(resume_id, user_id)
+        return record.to_dict() if record else None
+
+    def get_first_resume(self, user_id):
+        with self._lock:
+            for resume_id in self._resumes_by_user.get(user_id, ()):
+                return self._resumes[resume_id].to_dict()
+        return None
+
+    def update_resume(self, resume_id, user_id, fields):
+        with self._lock:
+            record = self._resume_record(resume_id, user_id)
+            if record is None:
+                return None
+            for field in RESUME_FIELDS:
+                if field in fields:
+                    record.set(field, fields[field])
+            record.version += 1
+            record.updated_at = to_timestamp(_now())
+            return record.to_dict()
+
+    def patch_resume(self, resume_id, user_id, changes, expected_version=None):
+        with self._lock:
+            record = self._resume_record(resume_id, user_id)
+            if record is None:
+                return None
+            if expected_version is not None and expected_version != record.version:
+                raise ResumeConflict(record.version)
+            changed = [field for field in RESUME_FIELDS if field in changes and record.get(field) != changes[field]]
+            if changed:
+                self.validate_resume_fields(user_id, {field: changes[field] for field in changed})
+                for field in changed:
+                    record.set(field, changes[field])
+                record.version += 1
+                record.updated_at = to_timestamp(_now())
+            return _patch_result(record.id, record.version, from_timestamp(record.updated_at), changed)
+
+    def bulk_patch_resumes(self, writes):
+        written = []
+        with self._lock:
+            for write in writes:
+                record = self._resume_record(write['id'], write['user_id'])
+                if record is None:
+                    continue
+                for field, value in write['changes'].items():
+                    record.set(field, value)
+                record.version += write['versions']
+                record.updated_at = to_timestamp(write['updated_at'])
+                written.append(write['id'])
+        return written
+
+    def delete_resume(self, resume_id, user_id):
+        with self._lock:
+            if self._resume_record(resume_id, user_id) is None:
+                return False
+            del self._resumes[resume_id]
+            self._resumes_by_user[user_id].pop(resume_id, None)
+            self._revisions.pop(resume_id, None)
+            return True
+
+    def resume_version(self, resume_id, user_id):
+        record = self._resume_record(resume_id, user_id)
+        return from_timestamp(record.updated_at) if record else None
+
+    def resumes_version(self, user_id):
+        # Lock-free like get_resume(): copying the key list is atomic under the
+        # GIL, and a resume deleted meanwhile is skipped
+        records = [self._resumes.get(resume_id) for resume_id in list(self._resumes_by_user.get(user_id, ()))]
+        latest = max((record.updated_at for record in records if record), default=None)
+        return sum(1 for record in records if record), from_timestamp(latest)
+
+    # ---- resume history ----
+    def add_resume_revision(self, resume_id, revision):
+        with self._lock:
+            revisions = self._revisions.setdefault(resume_id, [])
+            if revision['seq'] != len(revisions):
+                return False
+            revisions.append(dict(revision))
+            return True
+
+    def get_resume_revisions(self, resume_id, first_seq, last_seq):
+        with self._lock:
+            revisions = self._revisions.get(resume_id, [])[first_seq:last_seq + 1]
+        return [dict(revision) for revision in revisions]
+
+    def list_resume_revisions(self, resume_id, limit=None, before_seq=None):
+        with self._lock:
+            revisions = self._revisions.get(resume_id, [])
+            end = len(revisions) if before_seq is None else max(0, min(before_seq, len(revisions)))
+            start = 0 if limit is None else max(0, end - limit)
+            selected = revisions[start:end]
+        return [_revision_meta(revision, len(revision['data'])) for revision in reversed(selected)]
+
+    # ---- jobs ----
+    def list_jobs(self):
+        with self._lock:
+            records = list(self._jobs.values())
+        return [record.to_dict() for record in records]
+
+    def get_job(self, job_id):
+        record = self._jobs.get(job_id)
+        return record.to_dict() if record else None
+
+    def create_job(self, fields):
+        now = _now()
+        job = {
+            'id': str(uuid.uuid4()),
+            'job_title': fields.get('job_title', ''),
+            'company': fields.get('company', ''),
+            'required_skills': list(fields.get('required_skills', [])),
+            'created_at': fields.get('created_at', now),
+            'updated_at': fields.get('updated_at', now)
+        }
+        if fields.get('applyUrl'):
+            job['applyUrl'] = fields['applyUrl']
+        with self._lock:
+            self._jobs[job['id']] = JobRecord.from_dict(job)
+            self._job_keys.add((job['job_title'], job['company']))
+            self._catalogue_version += 1
+        return job
+
+    def seed_jobs(self, samples):
+        added = 0
+        with self._lock:
+            for sample in samples:
+                if (sample['job_title'], sample['company']) not in self._job_keys:
+                    self.create_job(sample)
+                    added += 1
+        return added
+
+    def catalogue_version(self):
+        return self._catalogue_version
+
+    # ---- password resets ----
+    def create_password_reset(self, user_id, otp, expiry):
+        reset = {
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'otp': otp,
+            'expiry': expiry,
+            'created_at': _now()
+        }
+        with self._lock:
+            self._password_resets.setdefault(user_id, []).append(reset)
+        return reset
+
+    def get_password_reset(self, user_id, otp):
+        now = datetime.utcnow()
+        with self._lock:
+            for reset in self._password_resets.get(user_id, ()):
+                if reset['otp'] == otp and now < reset['expiry']:
+                    return reset
+        return None
+
+    def delete_password_resets(self, user_id):
+        with self._lock:
+            self._password_resets.pop(user_id, None)
+
+    # ---- diagnostics ----
+    def counts(self):
+        return {
+            'users': len(self._users),
+            'resumes': len(self._resumes),
+            'jobs': len(self._jobs),
+            'password_resets': sum(len(r) for r in self._password_resets.values())
+        }
+
+
+def _object_id(value):
+    """Convert a string id to an ObjectId, or None if it is not a valid id"""
+    from bson import ObjectId
+    from bson.errors import InvalidId
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _isoformat(value):
+    return value.isoformat() if value else _now()
+
+
+class MongoStorage(StorageBackend):
+    """MongoEngine-backed storage (models.py).
+
+    Requires an active MongoEngine connection. The job catalogue is cached
+    in-process against catalogue_version() with a short TTL, so listing
+    jobs does not hit the database on every request.
+    """
+    name = 'mongodb'
+
+    # Re-read the catalogue after this many seconds even if this process did
+    # not change it, to pick up jobs written by other workers
+    JOBS_CACHE_TTL = 60
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._catalogue_version = 0
+        self._jobs_cache = {'version': None, 'loaded_at': 0.0, 'jobs': []}
+
+    # ---- conversion ----
+    @staticmethod
+    def _user_dict(user):
+        return {
+            'id': str(user.id),
+            'name': user.name,
+            'email': user.email,
+            'password': user.password,
+            'is_admin': user.is_admin,
+            'created_at': _isoformat(user.created_at)
+        }
+
+    @staticmethod
+    def _resume_dict(resume, user_id):
+        data = {'id': str(resume.id), 'user_id': user_id}
+        for field in RESUME_FIELDS:
+            value = getattr(resume, field)
+            data[field] = RESUME_DEFAULTS[field] if value is None else value
+        data['skill_ratings'] = dict(data['skill_ratings'])
+        data['version'] = resume.version or 0
+        data['created_at'] = _isoformat(resume.created_at)
+        data['updated_at'] = _isoformat(resume.updated_at)
+        return data
+
+    @staticmethod
+    def _job_dict(job):
+        data = {
+            'id': str(job.id),
+            'job_title': job.job_title,
+            'company': job.company,
+            'required_skills': list(job.required_skills),
+            'created_at': _isoformat(job.created_at),
+            'updated_at': _isoformat(job.updated_at)
+        }
+        if job.apply_url:
+            data['applyUrl'] = job.apply_url
+        return data
+
+    # ---- users ----
+    def create_user(self, name, email, password_hash):
+        from models import User
+        from mongoengine.errors import NotUniqueError
+        try:
+            user = User(name=name, email=email, password=password_hash)
+            user.save()
+        except NotUniqueError:
+            return None
+        return self._user_dict(user)
+
+    def get_user(self, user_id):
+        from models import User
+        oid = _object_id(user_id)
+        user = User.objects(id=oid).first() if oid else None
+        return self._user_dict(user) if user else None
+
+    def get_user_by_email(self, email):
+        from models import User
+        user = User.objects(email=email.lower()).first()
+        return self._user_dict(user) if user else None
+
+    def list_users(self):
+        from models import User
+        return [self._user_dict(user) for user in User.objects()]
+
+    # ---- resumes ----
+    def create_resume(self, user_id, fields):
+        from models import Resume
+        resume = Resume(user=_object_id(user_id), **resume_from_fields(fields))
+        resume.save()
+        return self._resume_dict(resume, user_id)
+
+    def _find_resume(self, resume_id, user_id):
+        from models import Resume
+        oid, user_oid = _object_id(resume_id), _object_id(user_id)
+        if oid is None or user_oid is None:
+            return None
+        return Resume.objects(id=oid, user=user_oid).first()
+
+    def list_resumes(self, user_id):
+        from models import Resume
+        user_oid = _object_id(user_id)
+        if user_oid is None:
+            return []
+        return [self._resume_dict(r, user_id) for r in Resume.objects(user=user_oid).order_by('created_at')]
+
+    def count_resumes(self, user_id):
+        from models import Resume
+        user_oid = _object_id(user_id)
+        return Resume.objects(user=user_oid).count() if user_oid else 0
+
+    def get_resume(self, resume_id, user_id):
+        resume = self._find_resume(resume_id, user_id)
+        return self._resume_dict(resume, user_id) if resume else None
+
+    def get_first_resume(self, user_id):
+        from models import Resume
+        user_oid = _object_id(user_id)
+        resume = Resume.objects(user=user_oid).order_by('created_at').first() if user_oid else None
+        return self._resume_dict(resume, user_id) if resume else None
+
+    def update_resume(self, resume_id, user_id, fields):
+        resume = self._find_resume(resume_id, user_id)
+        if resume is None:
+            return None
+        for field in RESUME_FIELDS:
+            if field in fields:
+                setattr(resume, field, fields[field])
+        resume.save()
+        return self._resume_dict(resume, user_id)
+
+    def patch_resume(self, resume_id, user_id, changes, expected_version=None):
+        from models import Resume
+        oid, user_oid = _object_id(resume_id), _object_id(user_id)
+        if oid is None or user_oid is None:
+            return None
+        fields = [field for field in RESUME_FIELDS if field in changes]
+        current = Resume.objects(id=oid, user=user_oid).only('version', 'updated_at', *fields).first()
+        if current is None:
+            return None
+        version = current.version or 0
+        if expected_version is not None and expected_version != version:
+            raise ResumeConflict(version)
+        changed = [field for field in fields
+                   if (RESUME_DEFAULTS[field] if getattr(current, field) is None else getattr(current, field)) != changes[field]]
+        if not changed:
+            return _patch_result(resume_id, version, _isoformat(current.updated_at), changed)
+
+        values = {field: changes[field] for field in changed}
+        self.validate_resume_fields(user_id, values)
+        query = Resume.objects(id=oid, user=user_oid)
+        if expected_version is not None:
+            # Documents written before the version field existed have none
+            query = query.filter(__raw__={'version': {'$in': [0, None]} if version == 0 else version})
+        now = datetime.utcnow()
+        updates = {f'set__{field}': value for field, value in values.items()}
+        # One targeted $set/$inc instead of Resume.save() rewriting the document
+        if not query.update_one(set__updated_at=now, inc__version=1, **updates):
+            current = Resume.objects(id=oid, user=user_oid).only('version').first()
+            if current is None:
+                return None
+            raise ResumeConflict(current.version or 0)
+        return _patch_result(resume_id, version + 1, now.isoformat(), changed)
+
+    def bulk_patch_resumes(self, writes):
+        from models import Resume
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+        operations, oids = [], []
+        for write in writes:
+            oid, user_oid = _object_id(write['id']), _object_id(write['user_id'])
+            if oid is None or user_oid is None:
+                continue
+            changes = dict(write['changes'], updated_at=datetime.fromisoformat(write['updated_at']))
+            operations.append(UpdateOne({'_id': oid, 'user': user_oid},
+                                        {'$set': changes, '$inc': {'version': write['versions']}}))
+            oids.append(oid)
+        if not operations:
+            return []
+        collection = Resume._get_collection()
+        # One round trip for the whole batch; unordered so one bad write does not stop the rest
+        try:
+            matched = collection.bulk_write(operations, ordered=False).matched_count
+            rejected = set()
+        except BulkWriteError as e:
+            matched = e.details['nMatched']
+            rejected = {error['index'] for error in e.details['writeErrors']}
+        applied = [oid for index, oid in enumerate(oids) if index not in rejected]
+        if matched < len(applied):
+            # Some resumes were deleted meanwhile; the bulk result does not say which
+            found = {doc['_id'] for doc in collection.find({'_id': {'$in': applied}}, {'_id': 1})}
+            applied = [oid for oid in applied if oid in found]
+        return [str(oid) for oid in applied]
+
+    def validate_resume_fields(self, user_id, fields):
+        from models import Resume
+        check_resume_values(fields)
+        Resume(user=_object_id(user_id), **fields).validate()  # Same field validation save() would run
+
+    def delete_resume(self, resume_id, user_id):
+        from models import ResumeRevision
+        resume = self._find_resume(resume_id, user_id)
+        if resume is None:
+            return False
+        resume.delete()
+        ResumeRevision.objects(resume=resume.id).delete()
+        return True
+
+    def resume_version(self, resume_id, user_id):
+        from models import Resume
+        oid, user_oid = _object_id(resume_id), _object_id(user_id)
+        if oid is None or user_oid is None:
+            return None
+        resume = Resume.objects(id=oid, user=user_oid).only('updated_at').first()
+        return _isoformat(resume.updated_at) if resume else None
+
+    def resumes_version(self, user_id):
+        from models import Resume
+        user_oid = _object_id(user_id)
+        if user_oid is None:
+            return 0, None
+        resumes = Resume.objects(user=user_oid)
+        latest = resumes.order_by('-updated_at').only('updated_at').first()
+        return resumes.count(), _isoformat(latest.updated_at) if latest else None
+
+    # ---- resume history ----
+    @staticmethod
+    def _revision_dict(revision):
+        return {'seq': revision.seq, 'version': revision.version, 'kind': revision.kind,
+                'fields': list(revision.fields), 'data': bytes(revision.data),
+                'created_at': _isoformat(revision.created_at)}
+
+    def add_resume_revision(self, resume_id, revision):
+        from models import ResumeRevision
+        from mongoengine.errors import NotUniqueError
+        oid = _object_id(resume_id)
+        if oid is None:
+            return False
+        try:
+            ResumeRevision(resume=oid, seq=revision['seq'], version=revision['version'], kind=revision['kind'],
+                           fields=list(revision['fields']), data=revision['data'],
+                           created_at=datetime.fromisoformat(revision['created_at'])).save()
+        except NotUniqueError:  # Unique (resume, seq) index
+            return False
+        return True
+
+    def get_resume_revisions(self, resume_id, first_seq, last_seq):
+        from models import ResumeRevision
+        oid = _object_id(resume_id)
+        if oid is None:
+            return []
+        revisions = ResumeRevision.objects(resume=oid, seq__gte=first_seq, seq__lte=last_seq).order_by('seq')
+        return [self._revision_dict(revision) for revision in revisions]
+
+    def list_resume_revisions(self, resume_id, limit=None, before_seq=None):
+        from models import ResumeRevision
+        oid = _object_id(resume_id)
+        if oid is None:
+            return []
+        query = ResumeRevision.objects(resume=oid)
+        if before_seq is not None:
+            query = query.filter(seq__lt=before_seq)
+        pipeline = [{'$sort': {'seq': -1}}]
+        if limit is not None:
+            pipeline.append({'$limit': limit})
+        # Sizes computed server-side, so listing never ships the deltas
+        pipeline.append({'$project': {'seq': 1, 'version': 1, 'kind': 1, 'fields': 1, 'created_at': 1,
+                                      'size': {'$binarySize': '$data'}}})
+        return [_revision_meta(dict(row, created_at=_isoformat(row['created_at'])), row['size'])
+                for row in query.aggregate(pipeline)]
+
+    # ---- jobs ----
+    def list_jobs(self):
+        from models import Job
+        cache = self._jobs_cache
+        version = self._catalogue_version
+        if cache['version'] != version or time.monotonic() - cache['loaded_at'] > self.JOBS_CACHE_TTL:
+            jobs = [self._job_dict(job) for job in Job.objects()]
+            self._jobs_cache = {'version': version, 'loaded_at': time.monotonic(), 'jobs': jobs}
+            return jobs
+        return cache['jobs']
+
+    def get_job(self, job_id):
+        from models import Job
+        oid = _object_id(job_id)
+        job = Job.objects(id=oid).first() if oid else None
+        return self._job_dict(job) if job else None
+
+    def create_job(self, fields):
+        from models import Job
+        job = Job(
+            job_title=fields.get('job_title', ''),
+            company=fields.get('company', ''),
+            required_skills=list(fields.get('required_skills', [])),
+            apply_url=fields.get('applyUrl') or None
+        )
+        job.save()
+        self._bump_catalogue_version()
+        return self._job_dict(job)
+
+    def seed_jobs(self, samples):
+        """Upsert on (job_title, company) with $setOnInsert - safe to run
+        concurrently from several workers and never overwrites edited jobs"""
+        from models import Job
+        from pymongo import UpdateOne
+        operations = []
+        for sample in samples:
+            created_at = datetime.fromisoformat(sample['created_at']) if 'created_at' in sample else datetime.utcnow()
+            document = {
+                'job_title': sample['job_title'],
+                'company': sample['company'],
+                'required_skills': list(sample['required_skills']),
+                'created_at': created_at,
+                'updated_at': created_at
+            }
+            if sample.get('applyUrl'):
+                document['apply_url'] = sample['applyUrl']
+            operations.append(UpdateOne(
+                {'job_title': sample['job_title'], 'company': sample['company']},
+                {'$setOnInsert': document},
+                upsert=True
+            ))
+        if not operations:
+            return 0
+        # One round trip per call: imports send batches of a thousand
+        inserted = Job._get_collection().bulk_write(operations, ordered=False).upserted_count
+        if inserted:
+            self._bump_catalogue_version()
+        return inserted
+
+    def _bump_catalogue_version(self):
+        with self._lock:
+            self._catalogue_version += 1
+
+    def catalogue_version(self):
+        return self._catalogue_version
+
+    # ---- password resets ----
+    def create_password_reset(self, user_id, otp, expiry):
+        from models import PasswordReset
+        reset = PasswordReset(user=_object_id(user_id), otp=otp, expiry=expiry)
+        reset.save()
+        return {'id': str(reset.id), 'user_id': user_id, 'otp': otp, 'expiry': expiry,
+                'created_at': _isoformat(reset.created_at)}
+
+    def get_password_reset(self, user_id, otp):
+        from models import PasswordReset
+        user_oid = _object_id(user_id)
+        if user_oid is None:
+            return None
+        reset = PasswordReset.objects(user=user_oid, otp=otp, expiry__gt=datetime.utcnow()).first()
+        if reset is None:
+            return None
+        return {'id': str(reset.id), 'user_id': user_id, 'otp': reset.otp, 'expiry': reset.expiry,
+                'created_at': _isoformat(reset.created_at)}
+
+    def delete_password_resets(self, user_id):
+        from models import PasswordReset
+        user_oid = _object_id(user_id)
+        if user_oid is not None:
+            PasswordReset.objects(user=user_oid).delete()
+
+    # ---- diagnostics ----
+    def counts(self):
+        from models import User, Resume, Job, PasswordReset
+        return {
+            'users': User.objects.count(),
+            'resumes': Resume.objects.count(),
+            'jobs': Job.objects.count(),
+            'password_resets': PasswordReset.objects.count()
+        }
+
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    password TEXT NOT NULL,
+    is_admin INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resumes (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    full_name TEXT, email TEXT, phone TEXT, linkedin TEXT, address TEXT,
+    summary TEXT, education TEXT, experience TEXT, projects TEXT, skills TEXT,
+    skill_ratings TEXT, profile_picture TEXT, template_type TEXT,
+    is_public INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_resumes_user ON resumes (user_id, created_at);
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    job_title TEXT NOT NULL,
+    company TEXT NOT NULL,
+    required_skills TEXT NOT NULL,
+    apply_url TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (job_title, company)
+);
+CREATE TABLE IF NOT EXISTS password_resets (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    otp TEXT NOT NULL,
+    expiry TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_password_resets_user ON password_resets (user_id);
+CREATE TABLE IF NOT EXISTS resume_revisions (
+    resume_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    version INTEGER,
+    kind TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    data BLOB NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (resume_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('catalogue_version', 0);
+"""
+
+
+class SQLiteStorage(StorageBackend):
+    """Embedded, persistent storage in a single SQLite file.
+
+    For single-node deployments without MongoDB. The database runs in WAL
+    mode so readers never block the writer, and every worker process (and
+    thread) opens its own connection, so several gunicorn workers on one
+    host can share the same file. Writes take the lock up front
+    (BEGIN IMMEDIATE) and wait up to `busy_timeout_ms` for other writers.
+
+    Each write commits on its own unless it runs inside batch(), which
+    groups all writes made on the current thread into one transaction.
+    """
+    name = 'sqlite'
+
+    def __init__(self, path, busy_timeout_ms=5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        # Every statement is idempotent, so workers starting together can all run it
+        self._connection().executescript(SQLITE_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Add columns introduced after an existing database file was created"""
+        conn = self._connection()
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(resumes)')}
+        if 'version' not in columns:
+            try:
+                conn.execute('ALTER TABLE resumes ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+            except sqlite3.OperationalError:
+                pass  # Another worker added it first
+
+    def _connection(self):
+        """Return this thread's connection, reopening it after a fork"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+            self._local.depth = 0
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._connection()
+        if self._local.depth:
+            # Already inside batch(): the outer block commits
+            yield conn
+            return
+        conn.execute('BEGIN IMMEDIATE')
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        else:
+            conn.execute('COMMIT')
+        finally:
+            self._local.depth = 0
+
+    @contextmanager
+    def batch(self):
+        """Group every write on this thread into a single transaction"""
+        with self._write() as conn:
+            self._local.depth += 1
+            try:
+                yield self
+            finally:
+                self._local.depth -= 1
+
+    def _query(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchall()
+
+    def _query_one(self, sql, params=()):
+        return self._connection().execute(sql, params).fetchone()
+
+    # ---- conversion ----
+    @staticmethod
+    def _user_dict(row):
+        return {
+            'id': row['id'],
+            'name': row['name'],
+            'email': row['email'],
+            'password': row['password'],
+            'is_admin': bool(row['is_admin']),
+            'created_at': row['created_at']
+        }
+
+    @staticmethod
+    def _resume_dict(row):
+        data = {'id': row['id'], 'user_id': row['user_id']}
+        for field in RESUME_FIELDS:
+            value = row[field]
+            data[field] = RESUME_DEFAULTS[field] if value is None else value
+        data['skill_ratings'] = json.loads(row['skill_ratings'] or '{}')
+        data['is_public'] = bool(row['is_public'])
+        data['version'] = row['version']
+        data['created_at'] = row['created_at']
+        data['updated_at'] = row['updated_at']
+        return data
+
+    @staticmethod
+    def _job_dict(row):
+        job = {
+            'id': row['id'],
+            'job_title': row['job_title'],
+            'company': row['company'],
+            'required_skills': json.loads(row['required_skills']),
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at']
+        }
+        if row['apply_url']:
+            job['applyUrl'] = row['apply_url']
+        return job
+
+    @staticmethod
+    def _resume_params(fields):
+        params = dict(fields)
+        if 'skill_ratings' in params:
+            params['skill_ratings'] = json.dumps(params['skill_ratings'] or {})
+        if 'is_public' in params:
+            params['is_public'] = int(bool(params['is_public']))
+        return params
+
+    # ---- users ----
+    def create_user(self, name, email, password_hash):
+        user = {
+            'id': str(uuid.uuid4()),
+            'name': name,
+            'email': email,
+            'password': password_hash,
+            'is_admin': False,
+            'created_at': _now()
+        }
+        try:
+            with self._write() as conn:
+                conn.execute(
+                    'INSERT INTO users (id, name, email, password, is_admin, created_at) '
+                    'VALUES (:id, :name, :email, :password, :is_admin, :created_at)', user)
+        except sqlite3.IntegrityError:
+            return None
+        return user
+
+    def get_user(self, user_id):
+        row = self._query_one('SELECT * FROM users WHERE id = ?', (user_id,))
+        return self._user_dict(row) if row else None
+
+    def get_user_by_email(self, email):
+        row = self._query_one('SELECT * FROM users WHERE email = ?', (email,))
+        return self._user_dict(row) if row else None
+
+    def list_users(self):
+        return [self._user_dict(row) for row in self._query('SELECT * FROM users ORDER BY created_at')]
+
+    # ---- resumes ----
+    def create_resume(self, user_id, fields):
+        now = _now()
+        resume = {'id': str(uuid.uuid4()), 'user_id': user_id}
+        resume.update(resume_from_fields(fields))
+        resume['version'] = 0
+        resume['created_at'] = now
+        resume['updated_at'] = now
+        columns = list(resume)
+        with self._write() as conn:
+            conn.execute(
+                f"INSERT INTO resumes ({', '.join(columns)}) VALUES ({', '.join(':' + c for c in columns)})",
+                self._resume_params(resume))
+        return resume
+
+    def list_resumes(self, user_id):
+        rows = self._query('SELECT * FROM resumes WHERE user_id = ? ORDER BY created_at, rowid', (user_id,))
+        return [self._resume_dict(row) for row in rows]
+
+    def count_resumes(self, user_id):
+        return self._query_one('SELECT COUNT(*) FROM resumes WHERE user_id = ?', (user_id,))[0]
+
+    def get_resume(self, resume_id, user_id):
+        row = self._query_one('SELECT * FROM resumes WHERE id = ? AND user_id = ?', (resume_id, user_id))
+        return self._resume_dict(row) if row else None
+
+    def get_first_resume(self, user_id):
+        row = self._query_one(
+            'SELECT * FROM resumes WHERE user_id = ? ORDER BY created_at, rowid LIMIT 1', (user_id,))
+        return self._resume_dict(row) if row else None
+
+    def update_resume(self, resume_id, user_id, fields):
+        changes = {field: fields[field] for field in RESUME_FIELDS if field in fields}
+        changes['updated_at'] = _now()
+        assignments = ', '.join(f'{column} = :{column}' for column in changes) + ', version = version + 1'
+        params = self._resume_params(changes)
+        params.update(resume_id=resume_id, user_id=user_id)
+        with self._write() as conn:
+            cursor = conn.execute(
+                f'UPDATE resumes SET {assignments} WHERE id = :resume_id AND user_id = :user_id', params)
+            if cursor.rowcount == 0:
+                return None
+            row = conn.execute('SELECT * FROM resumes WHERE id = ?', (resume_id,)).fetchone()
+        return self._resume_dict(row)
+
+    def patch_resume(self, resume_id, user_id, changes, expected_version=None):
+        # BEGIN IMMEDIATE holds the write lock from the read to the update,
+        # so the version check cannot race another writer
+        with self._write() as conn:
+            row = conn.execute('SELECT * FROM resumes WHERE id = ? AND user_id = ?', (resume_id, user_id)).fetchone()
+            if row is None:
+                return None
+            current = self._resume_dict(row)
+            if expected_version is not None and expected_version != current['version']:
+                raise ResumeConflict(current['version'])
+            changed = [field for field in RESUME_FIELDS if field in changes and current[field] != changes[field]]
+            if not changed:
+                return _patch_result(resume_id, current['version'], current['updated_at'], changed)
+            values = {field: changes[field] for field in changed}
+            self.validate_resume_fields(user_id, values)
+            params = self._resume_params(values)
+            params.update(updated_at=_now(), resume_id=resume_id)
+            assignments = ', '.join(f'{column} = :{column}' for column in changed)
+            conn.execute(f'UPDATE resumes SET {assignments}, updated_at = :updated_at, version = version + 1 '
+                         'WHERE id = :resume_id', params)
+        return _patch_result(resume_id, current['version'] + 1, params['updated_at'], changed)
+
+    def bulk_patch_resumes(self, writes):
+        written = []
+        with self._write() as conn:  # One transaction (and one fsync) for the batch
+            for write in writes:
+                assignments = ''.join(f'{column} = :{column}, ' for column in write['changes'])
+                try:
+                    params = self._resume_params(write['changes'])
+                    params.update(updated_at=write['updated_at'], versions=write['versions'],
+                                  resume_id=write['id'], user_id=write['user_id'])
+                    # One statement per write, so a rejected one leaves nothing behind to roll back
+                    cursor = conn.execute(
+                        f'UPDATE resumes SET {assignments}updated_at = :updated_at, version = version + :versions '
+                        'WHERE id = :resume_id AND user_id = :user_id', params)
+                except (sqlite3.ProgrammingError, sqlite3.InterfaceError, sqlite3.IntegrityError, sqlite3.DataError,
+                        TypeError, ValueError):
+                    continue
+                if cursor.rowcount:
+                    written.append(write['id'])
+        return written
+
+    def delete_resume(self, resume_id, user_id):
+        with self._write() as conn:
+            cursor = conn.execute('DELETE FROM resumes WHERE id = ? AND user_id = ?', (resume_id, user_id))
+            if cursor.rowcount:
+                conn.execute('DELETE FROM resume_revisions WHERE resume_id = ?', (resume_id,))
+        return cursor.rowcount > 0
+
+    def resume_version(self, resume_id, user_id):
+        row = self._query_one('SELECT updated_at FROM resumes WHERE id = ? AND user_id = ?', (resume_id, user_id))
+        return row[0] if row else None
+
+    def resumes_version(self, user_id):
+        count, latest = self._query_one('SELECT COUNT(*), MAX(updated_at) FROM resumes WHERE user_id = ?', (user_id,))
+        return count, latest
+
+    # ---- resume history ----
+    def add_resume_revision(self, resume_id, revision):
+        params = dict(revision, resume_id=resume_id, fields=json.dumps(list(revision['fields'])))
+        try:
+            with self._write() as conn:
+                conn.execute('INSERT INTO resume_revisions (resume_id, seq, version, kind, fields, data, created_at) '
+                             'VALUES (:resume_id, :seq, :version, :kind, :fields, :data, :created_at)', params)
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def get_resume_revisions(self, resume_id, first_seq, last_seq):
+        rows = self._query('SELECT seq, version, kind, fields, data, created_at FROM resume_revisions '
+                           'WHERE resume_id = ? AND seq BETWEEN ? AND ? ORDER BY seq',
+                           (resume_id, first_seq, last_seq))
+        return [{'seq': row['seq'], 'version': row['version'], 'kind': row['kind'],
+                 'fields': json.loads(row['fields']), 'data': row['data'], 'created_at': row['created_at']}
+                for row in rows]
+
+    def list_resume_revisions(self, resume_id, limit=None, before_seq=None):
+        rows = self._query('SELECT seq, version, kind, fields, length(data) AS size, created_at FROM resume_revisions '
+                           'WHERE resume_id = ? AND seq < ? ORDER BY seq DESC LIMIT ?',
+                           (resume_id, 2 ** 62 if before_seq is None else before_seq, -1 if limit is None else limit))
+        return [_revision_meta(dict(row, fields=json.loads(row['fields'])), row['size']) for row in rows]
+
+    # ---- jobs ----
+    def list_jobs(self):
+        return [self._job_dict(row) for row in self._query('SELECT * FROM jobs ORDER BY created_at, rowid')]
+
+    def get_job(self, job_id):
+        row = self._query_one('SELECT * FROM jobs WHERE id = ?', (job_id,))
+        return self._job_dict(row) if row else None
+
+    def _insert_job(self, conn, fields, ignore_existing=False):
+        now = _now()
+        job = {
+            'id': str(uuid.uuid4()),
+            'job_title': fields.get('job_title', ''),
+            'company': fields.get('company', ''),
+            'required_skills': list(fields.get('required_skills', [])),
+            'created_at': fields.get('created_at', now),
+            'updated_at': fields.get('updated_at', now)
+        }
+        if fields.get('applyUrl'):
+            job['applyUrl'] = fields['applyUrl']
+        cursor = conn.execute(
+            f"INSERT {'OR IGNORE ' if ignore_existing else ''}INTO jobs "
+            '(id, job_title, company, required_skills, apply_url, created_at, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (job['id'], job['job_title'], job['company'], json.dumps(job['required_skills']),
+             job.get('applyUrl'), job['created_at'], job['updated_at']))
+        if cursor.rowcount:
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'catalogue_version'")
+            return job
+        return None
+
+    def create_job(self, fields):
+        with self._write() as conn:
+            return self._insert_job(conn, fields)
+
+    def seed_jobs(self, samples):
+        """INSERT OR IGNORE on the (job_title, company) unique index, so
+        workers seeding the same file concurrently never duplicate jobs"""
+        added = 0
+        with self._write() as conn:
+            for sample in samples:
+                if self._insert_job(conn, sample, ignore_existing=True):
+                    added += 1
+        return added
+
+    def catalogue_version(self):
+        # Stored in the database so every worker process sees the same value
+        return self._query_one("SELECT value FROM meta WHERE key = 'catalogue_version'")[0]
+
+    # ---- password resets ----
+    def create_password_reset(self, user_id, otp, expiry):
+        reset = {
+            'id': str(uuid.uuid4()),
+            'user_id': user_id,
+            'otp': otp,
+            'expiry': expiry,
+            'created_at': _now()
+        }
+        with self._write() as conn:
+            conn.execute(
+                'INSERT INTO password_resets (id, user_id, otp, expiry, created_at) VALUES (?, ?, ?, ?, ?)',
+                (reset['id'], user_id, otp, expiry.isoformat(), reset['created_at']))
+        return reset
+
+    def get_password_reset(self, user_id, otp):
+        row = self._query_one(
+            'SELECT * FROM password_resets WHERE user_id = ? AND otp = ? AND expiry > ?',
+            (user_id, otp, _now()))
+        if row is None:
+            return None
+        return {'id': row['id'], 'user_id': user_id, 'otp': row['otp'],
+                'expiry': datetime.fromisoformat(row['expiry']), 'created_at': row['created_at']}
+
+    def delete_password_resets(self, user_id):
+        with self._write() as conn:
+            conn.execute('DELETE FROM password_resets WHERE user_id = ?', (user_id,))
+
+    # ---- diagnostics ----
+    def counts(self):
+        return {
+            table: self._query_one(f'SELECT COUNT(*) FROM {table}')[0]
+            for table in ('users', 'resumes', 'jobs', 'password_resets')
+        }
+
+
+def create_storage(backend=None, sqlite_path=None):
+    """Build the storage engine selected by STORAGE_BACKEND (memory | sqlite | mongodb)"""
+    backend = (backend or os.environ.get('STORAGE_BACKEND', 'memory')).lower()
+    if backend == 'memory':
+        return InMemoryStorage()
+    if backend == 'sqlite':
+        return SQLiteStorage(sqlite_path or os.environ.get('SQLITE_PATH', 'smart_resume.db'))
+    if backend == 'mongodb':
+        import mongoengine
+        mongoengine.connect(host=os.environ.get('MONGODB_URI', 'mongodb://localhost:27017/smart_resume'))
+        return MongoStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND '{backend}' (expected 'memory', 'sqlite' or 'mongodb')")
+
+
+STORAGE_OPERATIONS = [
+    'create_user', 'get_user', 'get_user_by_email', 'list_users',
+    'create_resume', 'list_resumes', 'count_resumes', 'get_resume', 'get_first_resume',
+    'update_resume', 'patch_resume', 'bulk_patch_resumes', 'delete_resume', 'resume_version', 'resumes_version',
+    'add_resume_revision', 'get_resume_revisions', 'list_resume_revisions',
+    'list_jobs', 'get_job', 'create_job', 'seed_jobs',
+    'create_password_reset', 'get_password_reset', 'delete_password_resets', 'counts'
+]
+
+
+def instrument_storage(storage):
+    """Time every storage call into app_operation_duration_seconds{operation="storage.<method>"}"""
+    import metrics
+    for name in STORAGE_OPERATIONS:
+        setattr(storage, name, metrics.timed(f'storage.{name}')(getattr(storage, name)))
+    return storage
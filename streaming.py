@@ -0,0 +1,229 @@
+"""
+Streaming request bodies for uploads and bulk imports
+
+request.get_json() and request.files read the whole body before the
+handler runs, so a request costs memory in proportion to its size (and
+MAX_CONTENT_LENGTH had to stay at 16 MB). The upload and import routes
+read the WSGI input in CHUNK_SIZE pieces instead, so a request holds at
+most one chunk plus the record being parsed, whatever the body size:
+
+    stream = streaming.request_stream(IMPORT_MAX_BYTES)       # own size limit
+    for batch in streaming.batched(streaming.iter_records(stream, request.mimetype), IMPORT_BATCH):
+        storage.seed_jobs(batch)
+
+    picture_store.save(streaming.MultipartFile(stream, boundary, 'picture'))
+
+- iter_ndjson(): one JSON value per line (application/x-ndjson).
+- iter_json_array(): the items of a top-level JSON array, parsed
+  incrementally with the standard library decoder (application/json).
+- MultipartFile: one file field of a multipart/form-data body as a
+  readable stream, decoded while it is read (werkzeug's sans-io decoder).
+
+Malformed bodies raise StreamError; routes answer 400. A record larger
+than MAX_RECORD_BYTES is rejected rather than buffered.
+
+Environment
+-----------
+    STREAM_MAX_RECORD_KB   largest single record in an import (default 1024)
+    STREAM_IMPORT_MAX_MB   largest import body (default 512)
+"""
+import codecs
+import json
+import os
+import re
+from itertools import islice
+
+import json_provider
+
+CHUNK_SIZE = 64 * 1024
+MAX_RECORD_BYTES = int(os.environ.get('STREAM_MAX_RECORD_KB', 1024)) * 1024
+IMPORT_MAX_BYTES = int(os.environ.get('STREAM_IMPORT_MAX_MB', 512)) * 1024 * 1024
+IMPORT_BATCH = 1000
+
+NDJSON_MIMETYPES = frozenset({'application/x-ndjson', 'application/ndjson', 'application/jsonl',
+                              'application/x-jsonlines'})
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_NUMBER_CHARS = re.compile(r'[0-9eE.+-]*')
+
+
+class StreamError(ValueError):
+    """The request body is malformed"""
+
+
+def request_stream(max_bytes):
+    """The current Flask request's body as a stream limited to `max_bytes`
+    (413 beyond it), instead of the app-wide MAX_CONTENT_LENGTH"""
+    from flask import request
+    from werkzeug.wsgi import get_input_stream
+    return get_input_stream(request.environ, max_content_length=max_bytes)
+
+
+def iter_chunks(stream, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def batched(iterable, size):
+    """Lists of up to `size` items"""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def iter_ndjson(stream, max_record=MAX_RECORD_BYTES):
+    """Decoded values of a newline-delimited JSON body; blank lines are skipped"""
+    pending, line_number = b'', 0
+    for chunk in iter_chunks(stream):
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        if len(pending) > max_record:
+            raise StreamError(f'line {line_number + len(lines) + 1} is longer than {max_record} bytes')
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield _loads_line(line, line_number)
+    if pending.strip():
+        yield _loads_line(pending, line_number + 1)
+
+
+def _loads_line(line, line_number):
+    try:
+        return json_provider.loads(line)
+    except ValueError:
+        raise StreamError(f'line {line_number} is not valid JSON') from None
+
+
+def iter_json_array(stream, max_record=MAX_RECORD_BYTES):
+    """Items of a body holding one JSON array, decoded one at a time"""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder('utf-8')()
+    chunks = iter_chunks(stream)
+    buffer, position, finished = '', 0, False
+
+    def more():
+        """Append the next chunk to the buffer; False once the body is exhausted"""
+        nonlocal buffer, position, finished
+        chunk = next(chunks, None)
+        try:
+            text = text_decoder.decode(chunk or b'', final=chunk is None)
+        except UnicodeDecodeError:
+            raise StreamError('request body is not valid UTF-8') from None
+        buffer, position = buffer[position:] + text, 0  # Drops what was already parsed
+        finished = chunk is None
+        return not finished
+
+    def skip_whitespace():
+        nonlocal position
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position < len(buffer) or not more():
+                return buffer[position:position + 1]
+
+    if skip_whitespace() != '[':
+        raise StreamError('request body must be a JSON array')
+    position += 1
+    index = 0
+    while True:
+        token = skip_whitespace()
+        if token == ']':
+            position += 1
+            if skip_whitespace():
+                raise StreamError('unexpected data after the JSON array')
+            return
+        if not token:
+            raise StreamError('the JSON array is not closed')
+        if index:
+            if token != ',':
+                raise StreamError(f'expected , or ] after item {index}')
+            position += 1
+            skip_whitespace()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+                # A number cut by the end of the buffer ("-2." of "-2.5") may
+                # continue in the next chunk
+                if finished or _NUMBER_CHARS.match(buffer, end).end() < len(buffer):
+                    break
+            except json.JSONDecodeError as e:
+                if finished:
+                    raise StreamError(f'item {index + 1} is not valid JSON: {e.msg}') from None
+            if len(buffer) - position > max_record:
+                raise StreamError(f'item {index + 1} is not valid JSON or larger than {max_record} bytes')
+            more()
+        position = end
+        index += 1
+        yield item
+
+
+def iter_records(stream, mimetype, max_record=MAX_RECORD_BYTES):
+    """NDJSON or JSON-array records, by the body's content type"""
+    if mimetype in NDJSON_MIMETYPES:
+        return iter_ndjson(stream, max_record)
+    if mimetype == 'application/json':
+        return iter_json_array(stream, max_record)
+    raise StreamError('send application/x-ndjson or a JSON array as application/json')
+
+
+class MultipartFile:
+    """Readable stream of one file field of a multipart/form-data body.
+
+    Parts are decoded as read() asks for data, so the file is never held
+    as a whole; other fields are skipped. Raises StreamError if the body
+    has no such file.
+    """
+
+    def __init__(self, stream, boundary, field, chunk_size=CHUNK_SIZE):
+        from werkzeug.sansio.multipart import MultipartDecoder
+        if not boundary:
+            raise StreamError('multipart body without a boundary')
+        self._decoder = MultipartDecoder(boundary.encode('latin-1'), max_form_memory_size=chunk_size * 4)
+        self._stream = stream
+        self._field = field
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        self._in_file = False
+        self._found = False
+        self._done = False
+        self._input_done = False
+
+    def read(self, size=-1):
+        while not self._done and (size < 0 or len(self._buffer) < size):
+            self._next_event()
+        if size < 0 or size >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:size])
+            del self._buffer[:size]
+        return data
+
+    def _next_event(self):
+        from werkzeug.sansio.multipart import Data, Epilogue, Field, File, NeedData
+        event = self._decoder.next_event()
+        if isinstance(event, NeedData):
+            if self._input_done:
+                raise StreamError('multipart body ended before its closing boundary')
+            chunk = self._stream.read(self._chunk_size)
+            self._input_done = not chunk
+            self._decoder.receive_data(chunk or None)
+        elif isinstance(event, File):
+            self._in_file = event.name == self._field and not self._found
+            self._found = self._found or self._in_file
+        elif isinstance(event, Field):
+            self._in_file = False
+        elif isinstance(event, Data):
+            if self._in_file:
+                self._buffer += event.data
+                if not event.more_data:
+                    self._done = True
+        elif isinstance(event, Epilogue):
+            if not self._found:
+                raise StreamError(f"send the file as the '{self._field}' form field")
+            self._done = True
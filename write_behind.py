@@ -0,0 +1,312 @@
+"""
+Write-behind buffer for resume autosaves
+
+The editor PATCHes a resume every few seconds while the user types, and
+each PATCH used to be its own database write. WriteBehindBuffer wraps a
+StorageBackend and absorbs those patches instead:
+
+    storage = write_behind.wrap(resume_history.ResumeHistory(instrument_storage(create_storage())))
+
+- patch_resume() validates the change (storage.validate_resume_fields),
+  applies it to an in-process copy of the resume and returns at once
+  (the "nothing changed" case works exactly as in storage.patch_resume()).
+- A PATCH that carries a version is not buffered: the in-process copy
+  cannot see saves made through other workers, so the resume's buffered
+  edits are flushed and the patch goes straight to storage, whose version
+  check answers the 409.
+- Patches to the same resume coalesce: only the latest value of each
+  field is kept until the resume's window (WRITE_BEHIND_WINDOW seconds
+  after its first buffered edit) runs out.
+- A background thread flushes due resumes in one bulk_patch_resumes()
+  call: a single unordered bulk_write on MongoDB, one transaction on
+  SQLite.
+- Reads through the buffer (get_resume, list_resumes, the version lookups
+  behind ETags) see buffered edits, so the session that saved reads its
+  own writes. PUT flushes the resume first (edits a failed flush left
+  behind go into the PUT) and DELETE drops its buffered edits, so neither
+  races the flusher. Writes to one resume are serialized by a per-resume
+  (striped) lock, so a slow PUT only holds up edits to its own resume.
+- A flush that fails as a whole (database down or locked) keeps the edits
+  buffered and retries on the next tick. A write the database rejects on
+  its own is dropped and logged; the rest of the batch is written.
+  Everything left is flushed on shutdown (atexit, and gunicorn's
+  worker_exit hook).
+
+Buffered edits live in one worker process. Another worker serves the
+previous version until the flush (at most the window later); unversioned
+patches from two workers to the same field resolve last flush wins. async_api.py shares the buffer through
+ExecutorStorage; on MongoDB it talks to Motor directly and is not buffered.
+
+Environment
+-----------
+    WRITE_BEHIND_WINDOW   seconds to coalesce a resume's edits (default 2,
+                          0 = write every PATCH straight through). The
+                          in-memory engine is never buffered.
+"""
+import atexit
+import os
+import threading
+import time
+
+import metrics
+from app_logging import get_logger
+from storage import RESUME_FIELDS, ResumeConflict, _now, _patch_result
+
+log = get_logger(__name__)
+
+WINDOW = float(os.environ.get('WRITE_BEHIND_WINDOW', 2))
+LOCK_STRIPES = 64
+
+buffered_patches = metrics.counter(
+    'resume_write_behind_patches_total',
+    'Resume PATCHes seen by the write-behind buffer, by result (buffered/unchanged/versioned)',
+    ('result',)
+)
+flushed_writes = metrics.counter(
+    'resume_write_behind_flushed_total',
+    'Coalesced resume writes sent to storage, by result (written/failed/dropped)',
+    ('result',)
+)
+
+_buffers = []
+
+
+def _copy(resume):
+    return dict(resume, skill_ratings=dict(resume['skill_ratings']))
+
+
+class WriteBehindBuffer:
+    """StorageBackend proxy that coalesces patch_resume() writes"""
+
+    def __init__(self, storage, window=WINDOW):
+        self.storage = storage
+        self.name = storage.name
+        self.window = window
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # One flush at a time keeps writes in order
+        self._resume_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]  # see _resume_lock()
+        self._pending = {}   # resume_id -> entry, see _entry()
+        self._flushing = {}  # the batch being written; still served to readers
+        self._stop = threading.Event()
+        self._flusher = None
+        self._flusher_pid = None
+        _buffers.append(self)
+
+    def __getattr__(self, name):
+        return getattr(self.storage, name)
+
+    # ---- writes ----
+    def _buffered(self, resume_id):
+        return self._pending.get(resume_id) or self._flushing.get(resume_id)
+
+    def _entry(self, resume_id, user_id):
+        """Pending entry for the resume, created from the latest known copy.
+
+        Called with self._lock held; may release it to load from storage.
+        """
+        entry = self._pending.get(resume_id)
+        if entry is not None:
+            return entry
+        base = self._flushing.get(resume_id)
+        if base is not None:
+            resume = _copy(base['resume'])
+        else:
+            self._lock.release()
+            try:
+                resume = self.storage.get_resume(resume_id, user_id)
+            finally:
+                self._lock.acquire()
+            entry = self._pending.get(resume_id)  # Another thread got there first
+            if entry is not None:
+                return entry
+            if resume is None:
+                return None
+        return {'user_id': resume['user_id'], 'resume': resume, 'changes': {}, 'versions': 0,
+                'due': time.monotonic() + self.window}
+
+    def _resume_lock(self, resume_id):
+        """Serializes a resume's PUT, versioned PATCH and buffered edits.
+
+        Taken before _flush_lock and _lock, never while holding them.
+        """
+        return self._resume_locks[hash(resume_id) % LOCK_STRIPES]
+
+    def patch_resume(self, resume_id, user_id, changes, expected_version=None):
+        if expected_version is not None:
+            return self._patch_through(resume_id, user_id, changes, expected_version)
+        with self._resume_lock(resume_id), self._lock:
+            entry = self._entry(resume_id, user_id)
+            if entry is None or entry['user_id'] != user_id:
+                return None
+            resume = entry['resume']
+            changed = [field for field in RESUME_FIELDS if field in changes and resume[field] != changes[field]]
+            if changed:
+                values = {field: changes[field] for field in changed}
+                self.storage.validate_resume_fields(user_id, values)
+                resume.update(values)
+                entry['changes'].update(values)
+                resume['version'] += 1
+                resume['updated_at'] = _now()
+                entry['versions'] += 1
+                self._pending[resume_id] = entry
+            result = _patch_result(resume_id, resume['version'], resume['updated_at'], changed)
+        buffered_patches.inc(1, 'buffered' if changed else 'unchanged')
+        if changed:
+            self._ensure_flusher()
+        return result
+
+    def _patch_through(self, resume_id, user_id, changes, expected_version):
+        # Held until the patch is written, so no buffered edit builds on the old copy meanwhile
+        with self._resume_lock(resume_id):
+            self.flush(resume_ids=(resume_id,))
+            if resume_id in self._pending:
+                # The client's version counts edits that are not stored yet
+                raise RuntimeError('earlier edits to this resume are not saved yet, retry shortly')
+            result = self.storage.patch_resume(resume_id, user_id, changes, expected_version)
+        buffered_patches.inc(1, 'versioned')
+        return result
+
+    def update_resume(self, resume_id, user_id, fields):
+        with self._resume_lock(resume_id):
+            self.flush(resume_ids=(resume_id,))
+            with self._lock:
+                entry = self._pending.get(resume_id)
+                if entry is not None and entry['user_id'] == user_id:
+                    # The flush failed: write the edits with the PUT instead of letting
+                    # them override reads and land on top of it later
+                    del self._pending[resume_id]
+                    fields = dict(entry['changes'], **fields)
+            return self.storage.update_resume(resume_id, user_id, fields)
+
+    def delete_resume(self, resume_id, user_id):
+        with self._lock:
+            entry = self._pending.get(resume_id)
+            if entry is not None and entry['user_id'] == user_id:
+                del self._pending[resume_id]
+        return self.storage.delete_resume(resume_id, user_id)
+
+    # ---- reads ----
+    def get_resume(self, resume_id, user_id):
+        entry = self._buffered(resume_id)
+        if entry is not None and entry['user_id'] == user_id:
+            return _copy(entry['resume'])
+        return self.storage.get_resume(resume_id, user_id)
+
+    def _overlay(self, resume):
+        entry = self._buffered(resume['id']) if resume else None
+        return _copy(entry['resume']) if entry is not None else resume
+
+    def get_first_resume(self, user_id):
+        return self._overlay(self.storage.get_first_resume(user_id))
+
+    def list_resumes(self, user_id):
+        resumes = self.storage.list_resumes(user_id)
+        if self._pending or self._flushing:
+            resumes = [self._overlay(resume) for resume in resumes]
+        return resumes
+
+    def resume_version(self, resume_id, user_id):
+        entry = self._buffered(resume_id)
+        if entry is not None and entry['user_id'] == user_id:
+            return entry['resume']['updated_at']
+        return self.storage.resume_version(resume_id, user_id)
+
+    def resumes_version(self, user_id):
+        count, latest = self.storage.resumes_version(user_id)
+        for entries in (list(self._pending.values()), list(self._flushing.values())):
+            for entry in entries:
+                if entry['user_id'] == user_id and (latest is None or entry['resume']['updated_at'] > latest):
+                    latest = entry['resume']['updated_at']
+        return count, latest
+
+    # ---- flushing ----
+    def flush(self, due_only=False, resume_ids=None):
+        """Write buffered edits (all, the due ones, or those of `resume_ids`); returns the count written"""
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._lock:
+                if resume_ids is None:
+                    resume_ids = [resume_id for resume_id, entry in self._pending.items()
+                                  if not due_only or entry['due'] <= now]
+                batch = {resume_id: self._pending.pop(resume_id) for resume_id in resume_ids
+                         if resume_id in self._pending}
+                self._flushing = batch
+            if not batch:
+                return 0
+            writes = [{'id': resume_id, 'user_id': entry['user_id'], 'changes': entry['changes'],
+                       'versions': entry['versions'], 'version': entry['resume']['version'],
+                       'updated_at': entry['resume']['updated_at']}
+                      for resume_id, entry in batch.items()]
+            try:
+                written = set(self.storage.bulk_patch_resumes(writes))
+            except Exception:
+                log.exception('write-behind flush failed, will retry', resumes=len(writes))
+                flushed_writes.inc(len(writes), 'failed')
+                self._requeue(batch)
+                return 0
+            finally:
+                with self._lock:
+                    self._flushing = {}
+            dropped = [write['id'] for write in writes if write['id'] not in written]
+            if dropped:
+                # Resume deleted meanwhile, or values the database would not take: retrying cannot help
+                log.warning('write-behind edits not written', resumes=len(dropped), resume_ids=','.join(dropped))
+                flushed_writes.inc(len(dropped), 'dropped')
+            flushed_writes.inc(len(written), 'written')
+            return len(written)
+
+    def _requeue(self, batch):
+        with self._lock:
+            for resume_id, entry in batch.items():
+                newer = self._pending.get(resume_id)
+                if newer is None:
+                    self._pending[resume_id] = entry
+                    continue
+                # Edited again while the flush ran: newer builds on this entry's copy
+                changes = dict(entry['changes'])
+                changes.update(newer['changes'])
+                newer['changes'] = changes
+                newer['versions'] += entry['versions']
+                newer['due'] = min(newer['due'], entry['due'])
+
+    def _ensure_flusher(self):
+        # Started on first use, so a master that preloads the app never owns it
+        if self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher = threading.Thread(target=self._run, name='write-behind', daemon=True)
+            self._flusher_pid = os.getpid()
+            self._flusher.start()
+
+    def _run(self):
+        while not self._stop.wait(min(self.window / 4, 0.5)):
+            try:
+                self.flush(due_only=True)
+            except Exception:
+                log.exception('write-behind flusher error')
+
+    def close(self):
+        """Stop the flusher and write everything still buffered"""
+        self._stop.set()
+        written = self.flush()
+        if self._pending:
+            log.error('write-behind edits lost on shutdown', resumes=len(self._pending))
+        return written
+
+
+def wrap(storage, window=WINDOW):
+    """`storage` behind a WriteBehindBuffer, unless buffering is off or pointless"""
+    if window <= 0 or storage.name == 'memory':
+        return storage
+    return WriteBehindBuffer(storage, window)
+
+
+def flush_all():
+    """Flush every buffer in this process (shutdown hook)"""
+    for buffer in _buffers:
+        buffer.close()
+
+
+atexit.register(flush_all)
@@ -0,0 +1,60 @@
+"""
+Production entry point for Smart Resume
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Serves simple_app (whose storage engine is chosen by STORAGE_BACKEND).
+Before the first request is accepted, a self-check confirms that storage,
+the cache and the PDF renderer work, so a broken deployment fails at
+boot rather than on the first user. Set SELF_CHECK=0 to skip it.
+Then preload.warm_up() compiles the Jinja templates (PRELOAD=0 skips it).
+"""
+import os
+import time
+
+import preload
+from simple_app import app, storage, cache
+from pdf_render import build_resume_html, render_pdf
+
+DEFAULT_SECRET_KEY = 'your-secret-key-change-in-production'
+
+
+def self_check():
+    """Exercise storage, cache and PDF rendering once; raises SystemExit on failure"""
+    started = time.perf_counter()
+    failures = []
+
+    try:
+        storage.list_jobs()
+    except Exception as e:
+        failures.append(f'storage ({storage.name}): {e}')
+
+    key = f'self-check:{os.getpid()}'
+    try:
+        cache.set(key, {'ok': True}, ttl=30)
+        if cache.get(key) != {'ok': True}:
+            failures.append('cache: value written was not read back')
+        cache.delete(key)
+    except Exception as e:
+        failures.append(f'cache: {e}')
+
+    try:
+        # Also imports xhtml2pdf/reportlab and loads their fonts up front
+        render_pdf(build_resume_html({'full_name': 'Self Check', 'skills': 'Python'}))
+    except Exception as e:
+        failures.append(f'pdf renderer: {e}')
+
+    if failures:
+        raise SystemExit('❌ Self-check failed:\n   ' + '\n   '.join(failures))
+
+    if app.secret_key == DEFAULT_SECRET_KEY:
+        print("⚠️ app.secret_key is the development default; sessions can be forged")
+    print(f"✅ Self-check passed in {(time.perf_counter() - started) * 1000:.0f} ms "
+          f"(storage={storage.name}, cache={'shared' if cache.shared else 'local'}, pid={os.getpid()})")
+
+
+if os.environ.get('SELF_CHECK', '1') != '0':
+    self_check()
+
+if preload.enabled():
+    preload.warm_up(app)